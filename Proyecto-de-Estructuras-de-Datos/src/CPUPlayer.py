@@ -4,10 +4,14 @@ EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
 
-import pygame
 import random
 from weather import WEATHER_MULTIPLIERS
-TILE_SIZE = 40
+
+# Resistencia recuperada por segundo quieto (antes 2.5 y 5 por cuadro a 60 FPS)
+RECUPERACION = 150.0
+RECUPERACION_PASIVA = 300.0
+# El timer de movimiento avanza 2.8 s por segundo (antes dt + 0.03 por cuadro a 60 FPS)
+RITMO = 2.8
 
 
 class CPUPlayer:
@@ -16,12 +20,12 @@ class CPUPlayer:
     def __init__(self, start_x=5, start_y=5, image_path="assets/CPUPlayer.png"):
         self.x = start_x
         self.y = start_y
-        self.image = pygame.image.load(image_path).convert_alpha()
-        self.image = pygame.transform.scale(self.image, (TILE_SIZE, TILE_SIZE))
+        self.image_path = image_path
         self.timer = 0.0
         self.move_delay = 1.5  
         self.carrying_order = None 
         self.money = 0
+        self.entregas = 0
         self.reputacion = 70
         self.resistencia = 100
         self.estado = "Normal"
@@ -30,28 +34,28 @@ class CPUPlayer:
 
     def update(self, dt, city, orders, weather=None):
         """Lógica de movimiento simple (aleatorio o básico)."""
-        self.timer += dt+0.03
+        self.timer += dt * RITMO
         self.time_still += dt
 
         if self.estado == "Exhausto":
             self.descansando = True
-            self.recuperar(clima=weather)
+            self.recuperar(dt, clima=weather)
             if self.resistencia >= 100:
                 self._actualizar_estado()
                 self.descansando = False
             return
         
         if self.descansando:
-            self.recuperar(clima=weather)
+            self.recuperar(dt, clima=weather)
             if self.resistencia >= 100:
                 self._actualizar_estado()
                 self.descansando = False
             return
 
-        if not any(o.status == "waiting" for o in orders.orders):
-            if not any(o.status == "picked" for o in orders.orders):
+        if not orders.contar("waiting"):
+            if not orders.contar("picked"):
                 self.descansando = True
-                self.recuperar(pasivo=True, clima=weather)
+                self.recuperar(dt, pasivo=True, clima=weather)
                 return
         
 
@@ -61,32 +65,8 @@ class CPUPlayer:
             self.time_still = 0.0
             self._consumir_resistencia(city,clima=weather)
             self.check_orders(orders)
-        self.recuperar(pasivo=True, clima=weather)
-
-
-    def draw(self, surface):
-        """Dibuja al jugador CPU en pantalla."""
-        surface.blit(self.image,(self.x * TILE_SIZE, self.y * TILE_SIZE))
-
-    def draw_stats(self, surface, offset_y=0):
-        """Dibuja sus estadísticas (resistencia y reputación)."""
-        font = pygame.font.SysFont(None, 22)
-        res_ratio = self.resistencia / 100
-        rep_ratio = self.reputacion / 100
+        self.recuperar(dt, pasivo=True, clima=weather)
 
-        pygame.draw.rect(surface, (150, 150, 150),
-                         (10, offset_y, 200, 10))
-        pygame.draw.rect(surface, (255, 165, 0),
-                         (10, offset_y, 200 * res_ratio, 10))
-        surface.blit(font.render(f"CPU Resistencia: {int(self.resistencia)}",
-                                 True, (255, 255, 255)), (220, offset_y - 5))
-
-        pygame.draw.rect(surface, (150, 150, 150),
-                         (10, offset_y + 25, 200, 10))
-        pygame.draw.rect(surface, (255, 215, 0),
-                         (10, offset_y + 25, 200 * rep_ratio, 10))
-        surface.blit(font.render(f"CPU Reputación: {int(self.reputacion)}",
-                                 True, (255, 255, 255)), (220, offset_y + 20))
 
     def random_move(self, city):
         """Movimiento aleatorio básico."""
@@ -106,22 +86,21 @@ class CPUPlayer:
         if clima and clima in WEATHER_MULTIPLIERS:
             consumo *= 1.0 / WEATHER_MULTIPLIERS[clima]
 
-        symbol = city.tiles[self.y][self.x]
-        surface_weight = city.legend[symbol].get("surface_weight", 1.0)
+        surface_weight = city.surface_weight(self.x, self.y)
         consumo *= 1.0 / surface_weight
 
         self.resistencia -= consumo
         self._actualizar_estado()
 
-    def recuperar(self, pasivo=False, clima=None):
-        """Recupera resistencia si está quieto."""
+    def recuperar(self, dt, pasivo=False, clima=None):
+        """Recupera resistencia si está quieto (por segundo, no por llamada)."""
 
         if self.time_still > 3.0:
             if self.resistencia < 100:
                 if pasivo:
-                    self.resistencia += 5
+                    self.resistencia += RECUPERACION_PASIVA * dt
                 else:
-                    self.resistencia += 2.5
+                    self.resistencia += RECUPERACION * dt
 
                 if self.resistencia > 100:
                     self.resistencia = 100
@@ -140,33 +119,19 @@ class CPUPlayer:
     def check_orders(self, orders):
         """Comprueba si el CPU recoge o entrega pedidos."""
 
-        active_orders = [o for o in orders.orders if o.status in ("waiting", "picked")]
-
-
         if self.carrying_order is None:
-            for order in active_orders:
-                if order.status == "waiting" and (self.x, self.y) == order.pickup:
-                    order.status = "picked"
-                    self.carrying_order = order
-                    print(f"[CPU] Pedido {order.id} recogido.")
-                    break
+            order = orders.tomar_pedido_en(self.x, self.y)
+            if order is not None:
+                self.carrying_order = order
+                print(f"[CPU] Pedido {order.id} recogido.")
 
 
         elif self.carrying_order is not None:
             order = self.carrying_order
             if (self.x, self.y) == order.dropoff:
-                order.status = "delivered"
+                orders.cambiar_estado(order, "delivered")
                 self.money += order.payout
+                self.entregas += 1
                 self.reputacion = min(100, self.reputacion + 3)
                 print(f"[CPU] Pedido {order.id} entregado. Ganó {order.payout} monedas.")
                 self.carrying_order = None
-
-
-        elif self.carrying_order is not None:
-            order = self.carrying_order
-            if (self.x, self.y) == order.dropoff:
-                order.status = "delivered"
-                self.money += order.payout
-                self.reputacion = min(100, self.reputacion + 3)
-                print(f"[CPU] Pedido {order.id} entregado. Ganó {order.payout} monedas.")
-                self.carrying_order = None
\ No newline at end of file
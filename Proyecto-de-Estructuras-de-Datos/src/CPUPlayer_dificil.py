@@ -4,30 +4,52 @@ EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
 
-import pygame
-import heapq
-import math
+from collections import deque
 from weather import WEATHER_MULTIPLIERS
-TILE_SIZE = 40
+from CPUPlayer import RECUPERACION, RECUPERACION_PASIVA
+from dstar_lite import DStarLite
+from rutas import PlanificadorRutas, RECOGER, ENTREGAR, MAX_CANDIDATOS, casilla
+from simulacion import INICIO_JORNADA
+from player import PESO_MAXIMO
+import hpa
+import costos
+
+MAX_PLANNERS = 8
+HPA_MIN_TILES = 100 * 100
+# El timer de movimiento avanza 3.6 s por segundo (antes 0.06 por cuadro a 60 FPS)
+RITMO = 3.6
 
 
 class CPUPlayer_Dificil:
     """Clase que representa al jugador controlado por IA."""
 
-    def __init__(self, start_x=5, start_y=5, image_path="assets/CPUPlayer.png"):
+    def __init__(self, start_x=5, start_y=5, image_path="assets/CPUPlayer.png", planner=None,
+                 capacidad=PESO_MAXIMO):
+        """planner: "dstar", "hpa" o None para usar HPA* solo en mapas grandes.
+        capacidad: peso máximo que carga a la vez (el mismo del jugador)."""
         self.x = start_x
         self.y = start_y
 
-        self.image = pygame.image.load(image_path).convert_alpha()
-        self.image = pygame.transform.scale(self.image, (TILE_SIZE, TILE_SIZE))
-        self.path = []
+        self.image_path = image_path
+        self.planner = planner
+        self.path = deque()
+        self.planners = {}
+        self.goal = None
+        self.changes_seen = 0
 
         self.timer = 0.0
         self.move_delay = 1.5  
 
-        self.carrying_order = None 
+        self.capacidad = capacidad
+        self.cargados = []
+        self.ruta = deque()
+        self.rutas = None
+        self.version_pedidos = None
+        self.tiempo = 0.0
+        self._limites = {}
         self.target=None
         self.money = 0
+        self.entregas = 0
         self.reputacion = 70
         self.resistencia = 100
 
@@ -37,25 +59,26 @@ class CPUPlayer_Dificil:
 
     def update(self, dt, city, orders, weather=None):
         """Actualiza la lógica del jugador IA."""
-        self.timer += 0.06
+        self.timer += dt * RITMO
+        self.tiempo += dt
         self.time_still += dt
 
         if self.estado == "Exhausto":
             self.descansando = True
-            self.recuperar(clima=weather)
+            self.recuperar(dt, clima=weather)
             if self.resistencia >= 100:
                 self.estado = "Normal"
                 self.descansando = False
             return
         
-        if not any(o.status == "waiting" for o in orders.orders):
-            if not any(o.status == "picked" for o in orders.orders):
+        if not orders.contar("waiting"):
+            if not orders.contar("picked"):
                 self.descansando = True
-                self.recuperar(pasivo=True, clima=weather)
+                self.recuperar(dt, pasivo=True, clima=weather)
                 return
         
         if self.descansando:
-            self.recuperar(clima=weather)
+            self.recuperar(dt, clima=weather)
             if self.resistencia >= 100:
                 self.estado = "Normal"
                 self.descansando = False
@@ -67,43 +90,34 @@ class CPUPlayer_Dificil:
             self.move(city, orders, weather)
             self._consumir_resistencia(city,clima=weather)
             self.check_orders(orders)
-        self.recuperar(pasivo=True, clima=weather)
-
-
-    def draw(self, surface):
-        """Dibuja al jugador CPU en pantalla."""
-        surface.blit(self.image,(self.x * TILE_SIZE, self.y * TILE_SIZE))
+        self.recuperar(dt, pasivo=True, clima=weather)
 
-    def draw_stats(self, surface, offset_y=0):
-        """Dibuja sus estadísticas (resistencia y reputación)."""
-        font = pygame.font.SysFont(None, 22)
-        res_ratio = self.resistencia / 100
-        rep_ratio = self.reputacion / 100
 
-        pygame.draw.rect(surface, (150, 150, 150),
-                         (10, offset_y, 200, 10))
-        pygame.draw.rect(surface, (255, 165, 0),
-                         (10, offset_y, 200 * res_ratio, 10))
-        surface.blit(font.render(f"CPU Resistencia: {int(self.resistencia)}",
-                                 True, (255, 255, 255)), (220, offset_y - 5))
-
-        pygame.draw.rect(surface, (150, 150, 150),
-                         (10, offset_y + 25, 200, 10))
-        pygame.draw.rect(surface, (255, 215, 0),
-                         (10, offset_y + 25, 200 * rep_ratio, 10))
-        surface.blit(font.render(f"CPU Reputación: {int(self.reputacion)}",
-                                 True, (255, 255, 255)), (220, offset_y + 20))
+    @property
+    def carrying_order(self):
+        """Primer pedido que lleva (None si no lleva nada)."""
+        return self.cargados[0] if self.cargados else None
 
     def move(self, city, orders, weather=None):
         """Movimiento segun su ruta o busca nueva si no tiene"""
-        if not self.path:
-            self.plan_path(city, orders)
+        if orders.version != self.version_pedidos:
+            self.planear_ruta(city, orders)
+        if not self.path or self.goal != self.siguiente_objetivo(city, orders):
+            self.plan_path(city, orders, weather)
             return 
         
-        next_x, next_y = self.path.pop(0)
-        if not city.is_blocked(next_x, next_y):
-            self.x, self.y = next_x, next_y
-            self._consumir_resistencia(city, clima=weather)
+        if self.changes_seen != len(city.tile_changes):
+            self.replan(city)
+            if not self.path:
+                return
+
+        next_x, next_y = self.path.popleft()
+        if city.is_blocked(next_x, next_y):
+            self.replan(city)
+            return
+
+        self.x, self.y = next_x, next_y
+        self._consumir_resistencia(city, clima=weather)
         
         self.check_orders(orders)
 
@@ -114,22 +128,21 @@ class CPUPlayer_Dificil:
         if clima and clima in WEATHER_MULTIPLIERS:
             consumo *= 1.0 / WEATHER_MULTIPLIERS[clima]
 
-        symbol = city.tiles[self.y][self.x]
-        surface_weight = city.legend[symbol].get("surface_weight", 1.0)
+        surface_weight = city.surface_weight(self.x, self.y)
         consumo *= 1.0 / surface_weight
 
         self.resistencia -= consumo
         self._actualizar_estado()
 
-    def recuperar(self, pasivo=False, clima=None):
-        """Recupera resistencia si está quieto."""
+    def recuperar(self, dt, pasivo=False, clima=None):
+        """Recupera resistencia si está quieto (por segundo, no por llamada)."""
 
         if self.time_still > 3.0:
             if self.resistencia < 100:
                 if pasivo:
-                    self.resistencia += 5
+                    self.resistencia += RECUPERACION_PASIVA * dt
                 else:
-                    self.resistencia += 2.5
+                    self.resistencia += RECUPERACION * dt
 
                 if self.resistencia > 100:
                     self.resistencia = 100
@@ -146,80 +159,122 @@ class CPUPlayer_Dificil:
             self.estado = "Normal"
 
     def check_orders(self, orders):
-        """Comprueba si tiene de recoger o entregar pedidos."""
-
-        if self.carrying_order is None:
-            for order in orders.orders:
-                if order.status == "waiting" and (self.x, self.y) == order.pickup:
-                    order.status = "picked"
-                    self.carrying_order = order
-                    break
-        else:
-            if (self.x, self.y) == self.carrying_order.dropoff:
-                self.carrying_order.status = "delivered"
-                self.money += self.carrying_order.payout
+        """Recoge o entrega según las paradas de la ruta en la casilla actual."""
+        if not self.ruta and not self.cargados:
+            # Sin ruta válida va al pickup más cercano, como respaldo
+            order = orders.tomar_pedido_en(self.x, self.y)
+            if order is not None:
+                self.cargados.append(order)
+                self.ruta.append((ENTREGAR, order))
+            return
+
+        while self.ruta and casilla(self.ruta[0]) == (self.x, self.y):
+            tipo, order = self.ruta.popleft()
+            if tipo == RECOGER:
+                if order.status == "waiting":
+                    orders.cambiar_estado(order, "picked")
+                    self.cargados.append(order)
+                else:
+                    # Otro repartidor se lo llevó
+                    self.ruta = deque(p for p in self.ruta if p[1] is not order)
+                    self.version_pedidos = None
+            else:
+                orders.cambiar_estado(order, "delivered")
+                self.cargados.remove(order)
+                self.money += order.payout
+                self.entregas += 1
                 self.reputacion = min(100, self.reputacion + 3)
-                self.carrying_order = None
 
+    def limite(self, order):
+        """Segundo de simulación del plazo del pedido."""
+        segundos = self._limites.get(order.id)
+        if segundos is None:
+            segundos = (order.deadline - INICIO_JORNADA).total_seconds()
+            self._limites[order.id] = segundos
+        return segundos
+
+    def planear_ruta(self, city, orders):
+        """Reoptimiza qué pedidos llevar y en qué orden (PlanificadorRutas).
+
+        Los candidatos son los MAX_CANDIDATOS pickups en espera más cercanos
+        más los que ya estaban en la ruta; se parte de la ruta anterior.
+        """
+        if self.rutas is None or self.rutas.distancia.city is not city:
+            self.rutas = PlanificadorRutas(city, self.capacidad, self.move_delay, self.limite)
+
+        pos = (self.x, self.y)
+        candidatos = {o.id: o for _, o in orders.cerca_pickups.k_cercanos(pos, MAX_CANDIDATOS)
+                      if orders.es_alcanzable(o, pos)}
+        for tipo, order in self.ruta:
+            if tipo == RECOGER and order.status == "waiting":
+                candidatos[order.id] = order
+
+        ruta, _ = self.rutas.optimizar(pos, self.tiempo, self.cargados,
+                                       candidatos.values(), self.ruta)
+        self.ruta = deque(ruta)
+        self.version_pedidos = orders.version
+
+    def siguiente_objetivo(self, city, orders):
+        """Casilla de la próxima parada, o el pickup más cercano si no hay ruta."""
+        if self.ruta:
+            return casilla(self.ruta[0])
+        if self.cargados:
+            return self.cargados[0].dropoff
+        return self.closest_pickup(city, orders)
+
+    def plan_path(self, city, orders, weather=None):
+        """Calcula una nueva ruta hacia la próxima parada.
+
+        Si la ruta cuesta más resistencia de la que le queda con el clima
+        actual, primero descansa.
+        """
+        goal = self.siguiente_objetivo(city, orders)
+        if goal is None:
+            self.path = deque()
+            return
 
+        self.goal = goal
+        self.replan(city)
 
-    def plan_path(self, city, orders):
-        """Calcula una nueva ruta hacia la entrga o recogida del paquete."""
-        if self.carrying_order:
-            goal=self.carrying_order.dropoff
-        else:
-            waiting = [o for o in orders.orders if o.status == "waiting"]
-            if not waiting:
-                self.path = []
-                return
-            
-            goal=min(waiting, key=lambda o: math.dist((self.x, self.y), o.pickup)).pickup
-
-        self.path = self.a_star_search((self.x, self.y), goal, city)
-
-    
-    def a_star_search(self, start, goal,city):
-        """El algoritmo A*"""
-        open_set = []
-        heapq.heappush(open_set, (0, start))
-        came_from = {}
-        g_score = {start: 0}
-
-        while open_set:
-            _, current = heapq.heappop(open_set)
-
-            if current == goal:
-                return self.reconstruct_path(came_from, current)
-
-            x,y = current
-            for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
-                nx, ny = x + dx, y + dy
-
-                if not (0 <= nx < city.width and 0 <= ny < city.height):
-                    continue
-                if city.is_blocked(nx, ny):
-                    continue
-                
-                tentative_g = g_score[current] + 1
-                neighbor = (nx, ny)
-
-                if tentative_g < g_score.get(neighbor, float('inf')):
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score = tentative_g + self.heuristic(neighbor, goal)
-                    heapq.heappush(open_set, (f_score, neighbor))
-        return []
-
-
-    def heuristic(self, a, b):
-        """Distancia Manhattan."""
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-    
-    def reconstruct_path(self, came_from, current):
-        """Reconstruye el camino desde el nodo objetivo al inicio."""
-        path= []
-        while current in came_from:
-            path.append(current)
-            current = came_from[current]
-        path.reverse()
-        return path
\ No newline at end of file
+        if self.path and self.resistencia < 100:
+            costo = costos.costo_ruta(city, self.path, clima=weather or "clear")
+            if costo > self.resistencia:
+                self.descansando = True
+
+    def replan(self, city):
+        """Pide la ruta al planificador del objetivo actual.
+
+        Con D* Lite cada objetivo guarda su planificador, así volver a un
+        objetivo o encontrar una casilla bloqueada solo repara la búsqueda
+        anterior, y la ruta minimiza la resistencia según el terreno. Con
+        HPA* se usa el grafo de clusters de la ciudad (cuenta casillas).
+        """
+        if not city.connected((self.x, self.y), self.goal):
+            self.path = deque()
+            self.changes_seen = len(city.tile_changes)
+            return
+
+        planner = self.planner
+        if planner is None:
+            planner = "hpa" if city.width * city.height >= HPA_MIN_TILES else "dstar"
+        if planner == "hpa":
+            self.path = deque(hpa.para_ciudad(city).find_path((self.x, self.y), self.goal))
+            self.changes_seen = len(city.tile_changes)
+            return
+
+        planner = self.planners.get(self.goal)
+        if planner is None:
+            if len(self.planners) >= MAX_PLANNERS:
+                self.planners.pop(next(iter(self.planners)))
+            capa = costos.para_ciudad(city)
+            planner = DStarLite(city, (self.x, self.y), self.goal,
+                                costos=capa.base, escala_h=capa.base_minimo())
+            self.planners[self.goal] = planner
+        costos.para_ciudad(city).sincronizar()
+        self.path = planner.path((self.x, self.y))
+        self.changes_seen = len(city.tile_changes)
+
+    def closest_pickup(self, city, orders):
+        """Pickup en espera con menor distancia caminando (None si no hay)."""
+        order, _ = orders.pickup_mas_cercano((self.x, self.y))
+        return order.pickup if order else None
@@ -0,0 +1,165 @@
+"""
+Courier Quest - Jugador controlado por una política entrenada
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Requiere numpy y una política entrenada con src/entorno_vectorial.py.
+"""
+
+import os
+import numpy as np
+from weather import WEATHER_MULTIPLIERS
+from CPUPlayer import RECUPERACION, RECUPERACION_PASIVA
+from entorno_vectorial import (ACCIONES, DESPLAZAMIENTOS, INTERACT, CANALES, PASO_CPU,
+                               POLITICA_FILE, PoliticaLineal, mapa_estatico, vector_estado)
+
+
+class CPUPlayer_Entrenado:
+    """Clase que representa al jugador controlado por una política aprendida."""
+
+    def __init__(self, start_x=5, start_y=5, image_path="assets/CPUPlayer.png",
+                 politica_file=POLITICA_FILE):
+        self.x = start_x
+        self.y = start_y
+
+        self.image_path = image_path
+        self.politica = PoliticaLineal.cargar(politica_file)
+        self.estatico = None
+
+        self.timer = 0.0
+        # El entorno de entrenamiento (cpu=True) decide cada PASO_CPU segundos
+        self.move_delay = PASO_CPU
+        self.tiempo = 0.0
+
+        self.carrying_order = None
+        self.money = 0
+        self.entregas = 0
+        self.reputacion = 70
+        self.resistencia = 100
+
+        self.estado = "Normal"
+        self.time_still = 0.0
+        self.descansando = False
+
+    @staticmethod
+    def disponible(politica_file=POLITICA_FILE):
+        """Indica si hay una política entrenada para cargar."""
+        return os.path.exists(politica_file)
+
+    def update(self, dt, city, orders, weather=None):
+        """Actualiza la lógica del jugador IA."""
+        self.timer += dt
+        self.tiempo += dt
+        self.time_still += dt
+
+        if self.estado == "Exhausto":
+            self.descansando = True
+            self.recuperar(dt, clima=weather)
+            if self.resistencia >= 100:
+                self.estado = "Normal"
+                self.descansando = False
+            return
+
+        if self.descansando:
+            self.recuperar(dt, clima=weather)
+            if self.resistencia >= 100:
+                self.estado = "Normal"
+                self.descansando = False
+            return
+
+        if self.timer >= self.move_delay:
+            self.timer = 0.0
+            accion = self.elegir_accion(city, orders, weather)
+            if accion == INTERACT:
+                self.check_orders(orders)
+            elif ACCIONES[accion] != "stay":
+                self.time_still = 0.0
+                self.move(city, accion, weather)
+        self.recuperar(dt, pasivo=True, clima=weather)
+
+    def observar(self, city, orders, weather):
+        """Observación con el mismo formato que EntornoVectorial.observar (una partida)."""
+        if self.estatico is None:
+            self.estatico = mapa_estatico(city)
+
+        mapa = np.zeros((1, CANALES, city.height, city.width), dtype=np.float32)
+        mapa[0, :2] = self.estatico
+        mapa[0, 2, self.y, self.x] = 1.0
+        for order in orders.con_estado("waiting"):
+            mapa[0, 3, order.pickup[1], order.pickup[0]] += 1.0
+        peso = 0
+        if self.carrying_order:
+            dx, dy = self.carrying_order.dropoff
+            mapa[0, 4, dy, dx] = 1.0
+            peso = self.carrying_order.weight
+
+        estado = vector_estado(self.resistencia, self.reputacion, peso, self.tiempo, weather)
+        return {"mapa": mapa, "estado": estado[None, :]}
+
+    def elegir_accion(self, city, orders, weather):
+        """Consulta la política con la observación actual."""
+        return int(self.politica.actuar(self.observar(city, orders, weather))[0])
+
+    def move(self, city, accion, weather=None):
+        """Aplica la acción de movimiento elegida por la política."""
+        dx, dy = DESPLAZAMIENTOS[accion]
+        new_x = self.x + int(dx)
+        new_y = self.y + int(dy)
+
+        if 0 <= new_x < city.width and 0 <= new_y < city.height:
+            if not city.is_blocked(new_x, new_y):
+                self.x = new_x
+                self.y = new_y
+                self._consumir_resistencia(city, clima=weather)
+
+    def _consumir_resistencia(self, city, clima=None):
+        """Reduce la resistencia por movimiento."""
+        consumo = 0.5
+
+        if clima and clima in WEATHER_MULTIPLIERS:
+            consumo *= 1.0 / WEATHER_MULTIPLIERS[clima]
+
+        surface_weight = city.surface_weight(self.x, self.y)
+        consumo *= 1.0 / surface_weight
+
+        self.resistencia -= consumo
+        self._actualizar_estado()
+
+    def recuperar(self, dt, pasivo=False, clima=None):
+        """Recupera resistencia si está quieto (por segundo, no por llamada)."""
+
+        if self.time_still > 3.0:
+            if self.resistencia < 100:
+                if pasivo:
+                    self.resistencia += RECUPERACION_PASIVA * dt
+                else:
+                    self.resistencia += RECUPERACION * dt
+
+                if self.resistencia > 100:
+                    self.resistencia = 100
+        self._actualizar_estado()
+
+    def _actualizar_estado(self):
+        """Actualiza el estado según la resistencia actual."""
+        if self.resistencia <= 0:
+            self.resistencia = 0
+            self.estado = "Exhausto"
+        elif self.resistencia < 30:
+            self.estado = "Cansado"
+        else:
+            self.estado = "Normal"
+
+    def check_orders(self, orders):
+        """Comprueba si tiene de recoger o entregar pedidos."""
+
+        if self.carrying_order is None:
+            order = orders.tomar_pedido_en(self.x, self.y)
+            if order is not None:
+                self.carrying_order = order
+        else:
+            if (self.x, self.y) == self.carrying_order.dropoff:
+                orders.cambiar_estado(self.carrying_order, "delivered")
+                self.money += self.carrying_order.payout
+                self.entregas += 1
+                self.reputacion = min(100, self.reputacion + 3)
+                self.carrying_order = None
@@ -4,21 +4,59 @@ EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
 
-import pygame
-import math
+import time
 from weather import WEATHER_MULTIPLIERS
-TILE_SIZE = 40
+from CPUPlayer import RECUPERACION, RECUPERACION_PASIVA
+
+MOVIMIENTOS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+# Nodos expandidos por jugada (~4 ms en una máquina promedio); a diferencia de
+# un tope de tiempo da la misma jugada en cualquier máquina y con cualquier carga
+MAX_NODOS = 1000
+MAX_PROFUNDIDAD = 12
+DESCUENTO = 0.95
+
+CLIMAS = ["clear", "clouds", "rain", "storm", "wind", "heat"]
+PESOS_CLIMA = {
+    "clear": [0.6, 0.2, 0.1, 0.05, 0.05, 0.0],
+    "clouds": [0.3, 0.4, 0.2, 0.05, 0.05, 0.0],
+    "rain": [0.2, 0.3, 0.3, 0.1, 0.1, 0.0],
+    "storm": [0.1, 0.2, 0.3, 0.3, 0.1, 0.0],
+    "wind": [0.3, 0.3, 0.2, 0.05, 0.15, 0.0],
+    "heat": [0.2, 0.2, 0.1, 0.05, 0.05, 0.4],
+}
+
+
+def _normalizar(pesos):
+    total = sum(pesos)
+    return tuple((p / total, clima) for p, clima in zip(pesos, CLIMAS) if p > 0)
+
+
+# Matrices de transición ya normalizadas (sin las transiciones imposibles)
+TRANSICIONES = {clima: _normalizar(pesos) for clima, pesos in PESOS_CLIMA.items()}
+TRANSICION_DESCONOCIDA = _normalizar([1.0] * len(CLIMAS))
+
+_PROPIO = object()
+
+
+class _SinTiempo(Exception):
+    """Se acabó el presupuesto de la jugada durante una iteración."""
 
 
 class CPUPlayer_Medium:
-    """Clase que representa al jugador controlado por IA."""
+    """Clase que representa al jugador controlado por IA.
+
+    max_nodos: nodos que puede expandir la búsqueda en cada jugada.
+    presupuesto: tope opcional en segundos además de max_nodos; con él la
+        jugada depende de la velocidad de la máquina, así que las partidas
+        con semilla (Simulacion, torneo) no lo usan.
+    """
 
-    def __init__(self, start_x=5, start_y=5, image_path="assets/CPUPlayer.png"):
+    def __init__(self, start_x=5, start_y=5, image_path="assets/CPUPlayer.png",
+                 max_nodos=MAX_NODOS, presupuesto=None):
         self.x = start_x
         self.y = start_y
 
-        self.image = pygame.image.load(image_path).convert_alpha()
-        self.image = pygame.transform.scale(self.image, (TILE_SIZE, TILE_SIZE))
+        self.image_path = image_path
 
         self.timer = 0.0
         self.move_delay = 1.5  
@@ -26,6 +64,7 @@ class CPUPlayer_Medium:
         self.carrying_order = None 
         self.target=None
         self.money = 0
+        self.entregas = 0
         self.reputacion = 70
         self.resistencia = 100
 
@@ -33,6 +72,15 @@ class CPUPlayer_Medium:
         self.time_still = 0.0
         self.descansando = False
 
+        self.max_nodos = max_nodos
+        self.presupuesto = presupuesto
+        self.profundidad = 0
+        self.tabla = {}
+        self._base = {}
+        self._limite = None
+        self._nodos = 0
+        self._tope_nodos = None
+
     def update(self, dt, city, orders, weather=None):
         """Actualiza la lógica del jugador IA."""
         self.timer += dt
@@ -40,20 +88,20 @@ class CPUPlayer_Medium:
 
         if self.estado == "Exhausto":
             self.descansando = True
-            self.recuperar(clima=weather)
+            self.recuperar(dt, clima=weather)
             if self.resistencia >= 100:
                 self.estado = "Normal"
                 self.descansando = False
             return
         
-        if not any(o.status == "waiting" for o in orders.orders):
-            if not any(o.status == "picked" for o in orders.orders):
+        if not orders.contar("waiting"):
+            if not orders.contar("picked"):
                 self.descansando = True
-                self.recuperar(pasivo=True, clima=weather)
+                self.recuperar(dt, pasivo=True, clima=weather)
                 return
         
         if self.descansando:
-            self.recuperar(clima=weather)
+            self.recuperar(dt, clima=weather)
             if self.resistencia >= 100:
                 self.estado = "Normal"
                 self.descansando = False
@@ -65,54 +113,75 @@ class CPUPlayer_Medium:
             self.move(city, orders, weather)
             self._consumir_resistencia(city,clima=weather)
             self.check_orders(orders)
-        self.recuperar(pasivo=True, clima=weather)
-
-
-    def draw(self, surface):
-        """Dibuja al jugador CPU en pantalla."""
-        surface.blit(self.image,(self.x * TILE_SIZE, self.y * TILE_SIZE))
-
-    def draw_stats(self, surface, offset_y=0):
-        """Dibuja sus estadísticas (resistencia y reputación)."""
-        font = pygame.font.SysFont(None, 22)
-        res_ratio = self.resistencia / 100
-        rep_ratio = self.reputacion / 100
-
-        pygame.draw.rect(surface, (150, 150, 150),
-                         (10, offset_y, 200, 10))
-        pygame.draw.rect(surface, (255, 165, 0),
-                         (10, offset_y, 200 * res_ratio, 10))
-        surface.blit(font.render(f"CPU Resistencia: {int(self.resistencia)}",
-                                 True, (255, 255, 255)), (220, offset_y - 5))
+        self.recuperar(dt, pasivo=True, clima=weather)
 
-        pygame.draw.rect(surface, (150, 150, 150),
-                         (10, offset_y + 25, 200, 10))
-        pygame.draw.rect(surface, (255, 215, 0),
-                         (10, offset_y + 25, 200 * rep_ratio, 10))
-        surface.blit(font.render(f"CPU Reputación: {int(self.reputacion)}",
-                                 True, (255, 255, 255)), (220, offset_y + 20))
 
     def move(self, city, orders, weather=None):
-        """Movimiento segun su ruta o busca nueva si no tiene"""
-        best_values = -float("inf")
+        """Elige el movimiento con expectimax por profundización iterativa.
+
+        Cada iteración busca un nivel más hondo reutilizando la tabla de
+        transposición; cuando se acaba el presupuesto de la jugada se usa el
+        mejor movimiento de la última iteración completa.
+        """
+        self.tabla = {}
+        self._base = {}
+        self._limite = None
+        self._nodos = 0
+        self._tope_nodos = None
         best_move = (0, 0)
+        inicio = time.perf_counter()
+
+        for depth in range(1, MAX_PROFUNDIDAD + 1):
+            try:
+                move = self._mejor_movimiento(city, orders, weather, depth)
+            except _SinTiempo:
+                break
+            if move is None:
+                break
+            best_move = move
+            self.profundidad = depth
+            # La primera iteración siempre termina; las demás se cortan a tiempo
+            self._tope_nodos = self.max_nodos
+            if self._nodos >= self._tope_nodos:
+                break
+            if self.presupuesto is not None:
+                self._limite = inicio + self.presupuesto
+                if time.perf_counter() >= self._limite:
+                    break
 
-        actions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-
-        for dx, dy in actions:
-            new_x = self.x + dx
-            new_y = self.y + dy
-
-            if 0 <= new_x < city.width and 0 <= new_y < city.height:
-                if not city.is_blocked(new_x, new_y):
-                    value = self.evaluate_position((new_x, new_y), city, orders, weather,depth=2)
-                    if value > best_values:
-                        best_values = value
-                        best_move = (dx, dy)
         self.x += best_move[0]
         self.y += best_move[1]
 
-    
+    def _mejor_movimiento(self, city, orders, weather, depth):
+        """Movimiento de la raíz con mayor valor esperado (None si no puede moverse)."""
+        best_value, best_move = -float("inf"), None
+        pos = (self.x, self.y)
+        for move in MOVIMIENTOS:
+            value = self._valor_movimiento(pos, self.carrying_order, move, city, orders,
+                                           weather, depth)
+            if value is not None and value > best_value:
+                best_value, best_move = value, move
+        return best_move
+
+    def _valor_movimiento(self, pos, carrying, move, city, orders, clima, depth):
+        """Ganancia del paso más el valor esperado sobre el clima siguiente."""
+        nx, ny = pos[0] + move[0], pos[1] + move[1]
+        if not (0 <= nx < city.width and 0 <= ny < city.height) or city.is_blocked(nx, ny):
+            return None
+
+        ganancia = 0
+        if carrying is None:
+            carrying = orders.pedido_en_espera(nx, ny)
+        elif carrying.dropoff == (nx, ny):
+            ganancia = carrying.payout
+            carrying = None
+
+        expected_value = 0
+        for prob, next_clima in self.get_chance_events(clima):
+            expected_value += prob * self.evaluate_position((nx, ny), city, orders, next_clima,
+                                                            depth - 1, carrying)
+        return ganancia + DESCUENTO * expected_value
+
     def _consumir_resistencia(self,city, clima=None):
         """Reduce la resistencia por movimiento."""
         consumo = 0.5 
@@ -120,22 +189,21 @@ class CPUPlayer_Medium:
         if clima and clima in WEATHER_MULTIPLIERS:
             consumo *= 1.0 / WEATHER_MULTIPLIERS[clima]
 
-        symbol = city.tiles[self.y][self.x]
-        surface_weight = city.legend[symbol].get("surface_weight", 1.0)
+        surface_weight = city.surface_weight(self.x, self.y)
         consumo *= 1.0 / surface_weight
 
         self.resistencia -= consumo
         self._actualizar_estado()
 
-    def recuperar(self, pasivo=False, clima=None):
-        """Recupera resistencia si está quieto."""
+    def recuperar(self, dt, pasivo=False, clima=None):
+        """Recupera resistencia si está quieto (por segundo, no por llamada)."""
 
         if self.time_still > 3.0:
             if self.resistencia < 100:
                 if pasivo:
-                    self.resistencia += 5
+                    self.resistencia += RECUPERACION_PASIVA * dt
                 else:
-                    self.resistencia += 2.5
+                    self.resistencia += RECUPERACION * dt
 
                 if self.resistencia > 100:
                     self.resistencia = 100
@@ -155,64 +223,79 @@ class CPUPlayer_Medium:
         """Comprueba si tiene de recoger o entregar pedidos."""
 
         if self.carrying_order is None:
-            for order in orders.orders:
-                if order.status == "waiting" and (self.x, self.y) == order.pickup:
-                    order.status = "picked"
-                    self.carrying_order = order
-                    break
+            order = orders.tomar_pedido_en(self.x, self.y)
+            if order is not None:
+                self.carrying_order = order
         else:
             if (self.x, self.y) == self.carrying_order.dropoff:
-                self.carrying_order.status = "delivered"
+                orders.cambiar_estado(self.carrying_order, "delivered")
                 self.money += self.carrying_order.payout
+                self.entregas += 1
                 self.reputacion = min(100, self.reputacion + 3)
                 self.carrying_order = None
 
 
 
-    def evaluate_position(self, pos, city, orders, clima, depth):
-        """Evalua un estado con Expectimax"""
-        if depth == 0:
-            return self.utility(pos, orders, clima)
-    
-        expected_value = 0
+    def evaluate_position(self, pos, city, orders, clima, depth, carrying=_PROPIO):
+        """Valor expectimax de (posición, pedido cargado, clima) a depth pasos.
 
-        for prob, next_clima in self.get_chance_events(clima):
-            value = self.evaluate_position(pos, city, orders, next_clima, depth - 1)
-            expected_value += prob * value
-
-        return expected_value
-    
-    def get_chance_events(self,clima_actual):
-        """Evalua las probabilidades de cambio de clima"""
-        clima_posible = ["clear", "clouds", "rain", "storm", "wind", "heat"]
-        weights = {
-            "clear": [0.6, 0.2, 0.1, 0.05, 0.05, 0.0],
-            "clouds": [0.3, 0.4, 0.2, 0.05, 0.05, 0.0],
-            "rain": [0.2, 0.3, 0.3, 0.1, 0.1, 0.0],
-            "storm": [0.1, 0.2, 0.3, 0.3, 0.1, 0.0],
-            "wind": [0.3, 0.3, 0.2, 0.05, 0.15, 0.0],
-            "heat": [0.2, 0.2, 0.1, 0.05, 0.05, 0.4],
-        }
-        probs = weights.get(clima_actual, [0.5] * len(clima_posible))
-        probs = [p / sum(probs) for p in probs]
-        return list(zip(probs, clima_posible))
-
-    def utility(self, pos, orders, clima):
-        """Evalúa qué tan buena es una posición."""
-        px, py = pos
-
-        if self.carrying_order:
-            tx, ty = self.carrying_order.dropoff
-        else:
-            pickups = [o.pickup for o in orders.orders if o.status == "waiting"]
-            if not pickups:
-                return 0
-            tx, ty = min(pickups, key=lambda p: math.dist((px, py), p))
-
-        dist = math.dist((px, py), (tx, ty))
+        Los nodos de decisión son los cuatro movimientos y los de azar el
+        clima siguiente; los valores quedan en la tabla de transposición de
+        la jugada.
+        """
+        if carrying is _PROPIO:
+            carrying = self.carrying_order
+        if depth == 0:
+            return self.utility(pos, city, orders, clima, carrying)
+
+        key = (pos, carrying.id if carrying else None, clima, depth)
+        value = self.tabla.get(key)
+        if value is not None:
+            return value
+        self._nodos += 1
+        if self._tope_nodos is not None and self._nodos > self._tope_nodos:
+            raise _SinTiempo()
+        if self._limite is not None and time.perf_counter() >= self._limite:
+            raise _SinTiempo()
+
+        value = None
+        for move in MOVIMIENTOS:
+            v = self._valor_movimiento(pos, carrying, move, city, orders, clima, depth)
+            if v is not None and (value is None or v > value):
+                value = v
+        if value is None:
+            value = self.utility(pos, city, orders, clima, carrying)
+        self.tabla[key] = value
+        return value
+
+    def get_chance_events(self, clima_actual):
+        """Probabilidades de cambio de clima (matriz precalculada)."""
+        return TRANSICIONES.get(clima_actual, TRANSICION_DESCONOCIDA)
+
+    def utility(self, pos, city, orders, clima, carrying=_PROPIO):
+        """Evalúa qué tan buena es una posición.
+
+        Es el pago del pedido descontado por los pasos que faltan para
+        entregarlo (si no lleva nada, pasando por el pickup más cercano), así
+        recoger nunca se ve peor que quedarse al lado del pickup.
+        """
+        if carrying is _PROPIO:
+            carrying = self.carrying_order
+        key = (pos, carrying.id if carrying else None)
+        base = self._base.get(key)
+        if base is None:
+            base = 0
+            if carrying:
+                dist = city.walking_distance(pos, carrying.dropoff)
+                if dist is not None:
+                    base = carrying.payout * DESCUENTO ** dist
+            else:
+                best, best_dist = orders.pickup_mas_cercano(pos)
+                if best is not None:
+                    viaje = city.walking_distance(best.pickup, best.dropoff) or 0
+                    base = best.payout * DESCUENTO ** (best_dist + viaje)
+            base *= self.resistencia / 100
+            self._base[key] = base
 
         clima_penalty = WEATHER_MULTIPLIERS.get(clima, 1.0)
-
-        score = (100 - dist * 5) * clima_penalty * (self.resistencia / 100)
-        return max(score,0)
-    
+        return base * clima_penalty
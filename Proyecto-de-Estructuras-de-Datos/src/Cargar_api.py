@@ -2,11 +2,21 @@
 Courier Quest - Carga de datos remotos
 EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Las tres descargas van en paralelo sobre una misma sesión (conexiones
+reutilizadas) y son condicionales: se envían el ETag y el Last-Modified de
+la última respuesta, así si nada cambió el servidor contesta 304 sin
+cuerpo. Un archivo solo se reescribe si su contenido cambió, y se escribe en
+un temporal que luego se renombra, de modo que quien lo lea a la vez ve el
+archivo viejo o el nuevo, nunca uno a medias.
 """
 
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 
 CITY_API_URL = "https://tigerds-api.kindflower-ccaf48b6.eastus.azurecontainerapps.io/GET/city/map"
 ORDERS_API_URL = "https://tigerds-api.kindflower-ccaf48b6.eastus.azurecontainerapps.io/GET/city/jobs"
@@ -16,33 +26,116 @@ DATA_FOLDER = "data"
 CITY_FILE = os.path.join(DATA_FOLDER, "Info_de_ciudad.json")
 ORDERS_FILE = os.path.join(DATA_FOLDER, "Pedidos.json")
 WEATHER_FILE = os.path.join(DATA_FOLDER, "clima.json")
+# ETag y Last-Modified de la última respuesta de cada URL
+VALIDATORS_FILE = os.path.join(DATA_FOLDER, "api_validadores.json")
+
+DESCARGAS = [
+    (CITY_API_URL, CITY_FILE),
+    (ORDERS_API_URL, ORDERS_FILE),
+    (WEATHER_API_URL, WEATHER_FILE),
+]
+TIMEOUT = (3, 10)
+
+
+def crear_sesion():
+    """Sesión con un pool de conexiones para todas las descargas."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(DESCARGAS), pool_maxsize=len(DESCARGAS))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
+def escribir_atomico(local_file, contenido):
+    """Escribe bytes en un temporal y lo renombra sobre local_file."""
+    carpeta = os.path.dirname(local_file)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    temporal = f"{local_file}.{threading.get_ident()}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(contenido)
+    os.replace(temporal, local_file)
 
-def fetch_and_save(url, local_file):
-    """Descarga un archivo JSON desde una API y lo guarda localmente."""
+
+def _leer_validadores():
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        with open(VALIDATORS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
-        data = response.json()
-        os.makedirs(os.path.dirname(local_file), exist_ok=True)
 
-        with open(local_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+def fetch_and_save(url, local_file, session=None, validador=None):
+    """Descarga un archivo JSON desde una API y lo guarda si cambió.
 
-        return True
+    validador: {"etag": ..., "last_modified": ...} de la respuesta anterior.
+    Devuelve (cambió, validador nuevo), o (False, None) si falló la descarga.
+    """
+    session = session or requests
+    headers = {}
+    if validador and os.path.exists(local_file):
+        if validador.get("etag"):
+            headers["If-None-Match"] = validador["etag"]
+        if validador.get("last_modified"):
+            headers["If-Modified-Since"] = validador["last_modified"]
 
-    except requests.RequestException as e:
-        return False
+    try:
+        response = session.get(url, headers=headers, timeout=TIMEOUT)
+        if response.status_code == 304:
+            return False, validador
+        response.raise_for_status()
+        data = response.json()
+    except (requests.RequestException, ValueError):
+        return False, None
+
+    nuevo = {"etag": response.headers.get("ETag"),
+             "last_modified": response.headers.get("Last-Modified")}
+    contenido = json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+    try:
+        with open(local_file, "rb") as f:
+            if f.read() == contenido:
+                return False, nuevo
+    except FileNotFoundError:
+        pass
+    escribir_atomico(local_file, contenido)
+    return True, nuevo
 
 
 def fetch_all_data():
-    """Intenta actualizar ciudad, pedidos y clima desde las APIs."""
+    """Intenta actualizar ciudad, pedidos y clima desde las APIs (en paralelo).
+
+    Devuelve la lista de archivos que cambiaron.
+    """
+    validadores = _leer_validadores()
+    with crear_sesion() as session, ThreadPoolExecutor(len(DESCARGAS)) as pool:
+        futuros = [(url, local_file,
+                    pool.submit(fetch_and_save, url, local_file, session, validadores.get(url)))
+                   for url, local_file in DESCARGAS]
+        resultados = [(url, local_file, futuro.result()) for url, local_file, futuro in futuros]
+
+    cambiados = []
+    nuevos = dict(validadores)
+    for url, local_file, (cambio, validador) in resultados:
+        if cambio:
+            cambiados.append(local_file)
+        if validador is not None:
+            nuevos[url] = validador
+    if nuevos != validadores:
+        escribir_atomico(VALIDATORS_FILE,
+                         json.dumps(nuevos, indent=4, ensure_ascii=False).encode("utf-8"))
+    return cambiados
+
+
+def hay_datos_locales():
+    """Indica si ya están los tres archivos de una descarga anterior."""
+    return all(os.path.exists(local_file) for _, local_file in DESCARGAS)
 
-    fetch_and_save(CITY_API_URL, CITY_FILE)
-    fetch_and_save(ORDERS_API_URL, ORDERS_FILE)
-    fetch_and_save(WEATHER_API_URL, WEATHER_FILE)
 
+def refrescar_en_segundo_plano():
+    """Actualiza los datos en un hilo aparte; el juego sigue con los archivos guardados."""
+    hilo = threading.Thread(target=fetch_all_data, name="refresco-api", daemon=True)
+    hilo.start()
+    return hilo
 
 
 if __name__ == "__main__":
@@ -3,6 +3,13 @@ from game import Game
 from CPUPlayer import CPUPlayer
 from CPUPlayer_medium import CPUPlayer_Medium
 from CPUPlayer_dificil import CPUPlayer_Dificil
+from textos import CacheTextos
+from recursos import REGISTRO
+
+try:
+    from CPUPlayer_entrenado import CPUPlayer_Entrenado
+except ImportError:
+    CPUPlayer_Entrenado = None
 
 TILE_SIZE = 40
 HUD_ESTADISTICAS = 120
@@ -21,8 +28,9 @@ class Selector_De_Dificultad:
         self.running = True
         self.selected_difficulty = None
 
-        self.font_title = pygame.font.SysFont(None, 60)
-        self.font_button = pygame.font.SysFont(None, 40)
+        self.textos = CacheTextos()
+        # Los archivos de las texturas se decodifican mientras se elige la dificultad
+        REGISTRO.precargar()
  
         self.buttons = [
             pygame.Rect(250, 200, 300, 60),
@@ -31,6 +39,10 @@ class Selector_De_Dificultad:
         ]
         self.labels = ["Fácil", "Media", "Difícil"]
 
+        if CPUPlayer_Entrenado is not None and CPUPlayer_Entrenado.disponible():
+            self.buttons.append(pygame.Rect(250, 500, 300, 60))
+            self.labels.append("Entrenada")
+
     def run(self):
         """Bucle principal de la pantalla."""
         while self.running:
@@ -61,7 +73,7 @@ class Selector_De_Dificultad:
         """Dibuja los botones y el título."""
         self.screen.fill((20, 20, 20))
 
-        title = self.font_title.render("Selecciona la dificultad", True, (255, 255, 255))
+        title = self.textos.render(60, "Selecciona la dificultad", (255, 255, 255))
         self.screen.blit(title, (180, 100))
 
         for i, rect in enumerate(self.buttons):
@@ -69,20 +81,20 @@ class Selector_De_Dificultad:
             pygame.draw.rect(self.screen, color, rect, border_radius=10)
             pygame.draw.rect(self.screen, (255, 255, 255), rect, 3, border_radius=10)
 
-            label = self.font_button.render(self.labels[i], True, (255, 255, 255))
+            label = self.textos.render(40, self.labels[i], (255, 255, 255))
             self.screen.blit(label, (rect.x + 110, rect.y + 10))
 
         pygame.display.flip()
 
     def start_game(self):
         """Crea el objeto Game con la CPU seleccionada."""
-        game = Game()
-
         if self.selected_difficulty == "Fácil":
-            game.cpu = CPUPlayer(start_x=1, start_y=1)
+            game = Game(CPUPlayer)
         elif self.selected_difficulty == "Media":
-            game.cpu = CPUPlayer_Medium(start_x=1, start_y=1)
+            game = Game(CPUPlayer_Medium)
         elif self.selected_difficulty == "Difícil":
-            game.cpu = CPUPlayer_Dificil(start_x=1, start_y=1)
+            game = Game(CPUPlayer_Dificil)
+        elif self.selected_difficulty == "Entrenada":
+            game = Game(CPUPlayer_Entrenado)
 
         game.run()
@@ -0,0 +1,17 @@
+"""
+Courier Quest - Microbenchmarks de las rutas calientes
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Mide con ciudades y pedidos sintéticos (con semilla, así dos corridas son
+comparables) las funciones que más pesan en un cuadro: búsquedas de las
+CPU, consultas de OrderManager, Weather.update y Player.mover.
+
+Uso (desde la carpeta del proyecto):
+    PYTHONPATH=src python -m benchmarks --salida resultados/benchmarks.json
+"""
+
+from benchmarks.sinteticos import ciudad, pedidos, rafagas
+from benchmarks.casos import CASOS, medir, resumir
+
+__all__ = ["CASOS", "ciudad", "medir", "pedidos", "rafagas", "resumir"]
@@ -0,0 +1,94 @@
+"""
+Courier Quest - Línea de comandos de los benchmarks
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Uso (desde la carpeta del proyecto):
+    PYTHONPATH=src python -m benchmarks --ciudades 20x15 100x100 --pedidos 10 1000
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from benchmarks.casos import CASOS, Contexto, medir, resumir
+from benchmarks.sinteticos import ciudad
+
+
+def tamano(texto):
+    """'ANCHOxALTO' -> (ancho, alto)."""
+    try:
+        width, height = (int(v) for v in texto.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamaño inválido: {texto} (se espera ANCHOxALTO)")
+    return width, height
+
+
+def correr(casos, ciudades, n_pedidos, repeticiones, segundos, seed):
+    """Mide cada caso en cada combinación que le importa; devuelve la lista de filas."""
+    resultados = []
+    weather_listo = False
+    for width, height in ciudades:
+        inicio = time.perf_counter()
+        city = ciudad(width, height, seed)
+        print(f"Ciudad {width}x{height} en {time.perf_counter() - inicio:.2f}s")
+        for i, n in enumerate(n_pedidos):
+            ctx = Contexto(city, n, seed)
+            for nombre in casos:
+                caso, depende = CASOS[nombre]
+                # Lo que no depende de los pedidos (o de nada) se mide una vez
+                if depende == "ciudad" and i > 0:
+                    continue
+                if depende is None:
+                    if weather_listo:
+                        continue
+                    weather_listo = True
+                muestras = medir(caso, ctx, repeticiones, segundos, seed)
+                fila = {"caso": nombre,
+                        "ciudad": f"{width}x{height}" if depende else None,
+                        "pedidos": n if depende == "pedidos" else None}
+                fila.update(resumir(muestras))
+                resultados.append(fila)
+                print(f"  {nombre:<26} {fila['ciudad'] or '-':>10} {fila['pedidos'] or '-':>7}"
+                      f"  p50 {fila['p50_us']:>11.1f}us  p99 {fila['p99_us']:>11.1f}us"
+                      f"  (n={fila['n']})")
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks de Courier Quest.")
+    parser.add_argument("--ciudades", nargs="+", type=tamano,
+                        default=[(20, 15), (100, 100), (1000, 1000)])
+    parser.add_argument("--pedidos", nargs="+", type=int, default=[10, 1000, 100000])
+    parser.add_argument("--casos", nargs="+", default=list(CASOS), choices=list(CASOS))
+    parser.add_argument("--repeticiones", type=int, default=200,
+                        help="muestras máximas por caso")
+    parser.add_argument("--segundos", type=float, default=3.0,
+                        help="tiempo máximo por caso (siempre hay al menos una muestra)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="resultados/benchmarks.json")
+    args = parser.parse_args(argv)
+
+    resultados = correr(args.casos, args.ciudades, args.pedidos,
+                        args.repeticiones, args.segundos, args.semilla)
+
+    carpeta = os.path.dirname(args.salida)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump({
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "semilla": args.semilla,
+            "repeticiones": args.repeticiones,
+            "resultados": resultados,
+        }, f, indent=4, ensure_ascii=False)
+    print(f"{len(resultados)} mediciones -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Courier Quest - Casos de benchmark y medición de tiempos
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import random
+import time
+from CPUPlayer_dificil import CPUPlayer_Dificil
+from dstar_lite import DStarLite
+import costos
+import hpa
+from CPUPlayer_medium import CPUPlayer_Medium, CLIMAS
+from order import OrderManager
+from player import Player
+from weather import Weather
+from benchmarks.sinteticos import casillas_libres, pedidos, rafagas
+
+PROFUNDIDAD_EVALUAR = 2
+RAFAGAS = 50
+DT = 1 / 60
+
+
+class Contexto:
+    """Ciudad y pedidos de una combinación de tamaños, compartidos por los casos."""
+
+    def __init__(self, city, n_pedidos, seed):
+        self.city = city
+        self.n_pedidos = n_pedidos
+        self.seed = seed
+        self.libres = casillas_libres(city)
+        self.datos = pedidos(city, n_pedidos, seed, self.libres) if n_pedidos else []
+
+    def orders(self):
+        """OrderManager nuevo (los casos que cambian estados necesitan uno propio)."""
+        return OrderManager(city=self.city, data=self.datos)
+
+    def vaciar_campos(self):
+        """Descarta los campos de distancias para medir en frío."""
+        for target in list(self.city._distance_fields):
+            self.city.evict_distance_field(target)
+
+
+# Cada caso recibe (contexto, rng) y devuelve una función de preparación:
+# cada llamada elige las entradas de una muestra (sin medir) y devuelve la
+# función sin argumentos que se mide.
+
+def _par(ctx, rng):
+    """Origen y destino al azar; con la misma semilla los tres casos de rutas usan los mismos."""
+    return rng.choice(ctx.libres), rng.choice(ctx.libres)
+
+
+def dificil_replan(ctx, rng):
+    def preparar():
+        # CPU nueva por muestra: sin planificadores guardados para ese objetivo
+        a, b = _par(ctx, rng)
+        cpu = CPUPlayer_Dificil(*a)
+        cpu.goal = b
+        return lambda: cpu.replan(ctx.city)
+    return preparar
+
+
+def dstar_path(ctx, rng):
+    capa = costos.para_ciudad(ctx.city)
+
+    def preparar():
+        a, b = _par(ctx, rng)
+        planner = DStarLite(ctx.city, a, b, costos=capa.base, escala_h=capa.base_minimo())
+        return lambda: planner.path(a)
+    return preparar
+
+
+def hpa_find_path(ctx, rng):
+    # El grafo de clusters se arma una vez por ciudad, fuera de la medición
+    pathfinder = hpa.para_ciudad(ctx.city)
+
+    def preparar():
+        a, b = _par(ctx, rng)
+        return lambda: pathfinder.find_path(a, b)
+    return preparar
+
+
+def medium_utility(ctx, rng):
+    cpu = CPUPlayer_Medium()
+    orders = ctx.orders()
+
+    def preparar():
+        pos, clima = rng.choice(ctx.libres), rng.choice(CLIMAS)
+        cpu._base.clear()
+        ctx.vaciar_campos()
+        return lambda: cpu.utility(pos, ctx.city, orders, clima)
+    return preparar
+
+
+def medium_evaluate_position(ctx, rng):
+    cpu = CPUPlayer_Medium()
+    orders = ctx.orders()
+
+    def preparar():
+        pos, clima = rng.choice(ctx.libres), rng.choice(CLIMAS)
+        cpu.tabla.clear()
+        cpu._base.clear()
+        ctx.vaciar_campos()
+        return lambda: cpu.evaluate_position(pos, ctx.city, orders, clima, PROFUNDIDAD_EVALUAR)
+    return preparar
+
+
+def orders_get_order_at(ctx, rng):
+    orders = ctx.orders()
+
+    def preparar():
+        # La mitad de las consultas caen en un pickup, como al caminar sobre uno
+        if rng.random() < 0.5:
+            x, y = rng.choice(orders.orders).pickup
+        else:
+            x, y = rng.choice(ctx.libres)
+        return lambda: orders.get_order_at(x, y)
+    return preparar
+
+
+def _pedidos_barajados(ctx, rng):
+    """OrderManager nuevo y los ids de sus pedidos en orden al azar."""
+    orders = ctx.orders()
+    ids = [o.id for o in orders.orders]
+    rng.shuffle(ids)
+    return {"orders": orders, "ids": ids}
+
+
+def orders_accept_order(ctx, rng):
+    estado = _pedidos_barajados(ctx, rng)
+
+    def preparar():
+        if not estado["ids"]:
+            estado.update(_pedidos_barajados(ctx, rng))
+        orders, order_id = estado["orders"], estado["ids"].pop()
+        return lambda: orders.accept_order(order_id)
+    return preparar
+
+
+def orders_deliver_order(ctx, rng):
+    estado = _pedidos_barajados(ctx, rng)
+
+    def preparar():
+        if not estado["ids"]:
+            estado.update(_pedidos_barajados(ctx, rng))
+        orders, order_id = estado["orders"], estado["ids"].pop()
+        orders.accept_order(order_id)
+        return lambda: orders.deliver_order(order_id)
+    return preparar
+
+
+def weather_update(ctx, rng):
+    weather = Weather(bursts=rafagas(RAFAGAS, ctx.seed))
+    reloj = {"t": 0.0}
+
+    def preparar():
+        reloj["t"] += DT
+        t = reloj["t"]
+        return lambda: weather.update(t)
+    return preparar
+
+
+def player_mover(ctx, rng):
+    player = Player(*rng.choice(ctx.libres))
+
+    def preparar():
+        dx, dy = rng.choice(((-1, 0), (1, 0), (0, -1), (0, 1)))
+        clima = rng.choice(CLIMAS)
+        # Sin agotarse, así cada muestra llega hasta el movimiento
+        player.resistencia = 100
+        player.estado = "Normal"
+        return lambda: player.mover(dx, dy, ctx.city, clima)
+    return preparar
+
+
+# nombre -> (caso, de qué depende: "pedidos", "ciudad" o None)
+CASOS = {
+    "dificil.replan": (dificil_replan, "ciudad"),
+    "dstar.path": (dstar_path, "ciudad"),
+    "hpa.find_path": (hpa_find_path, "ciudad"),
+    "medium.utility": (medium_utility, "pedidos"),
+    "medium.evaluate_position": (medium_evaluate_position, "pedidos"),
+    "orders.get_order_at": (orders_get_order_at, "pedidos"),
+    "orders.accept_order": (orders_accept_order, "pedidos"),
+    "orders.deliver_order": (orders_deliver_order, "pedidos"),
+    "weather.update": (weather_update, None),
+    "player.mover": (player_mover, "ciudad"),
+}
+
+
+def medir(caso, ctx, repeticiones, segundos, seed=0):
+    """Tiempos en segundos de hasta repeticiones muestras (corta a los segundos dados)."""
+    rng = random.Random(seed)
+    preparar = caso(ctx, rng)
+    muestras = []
+    fin = time.perf_counter() + segundos
+    while len(muestras) < repeticiones:
+        funcion = preparar()
+        inicio = time.perf_counter()
+        funcion()
+        muestras.append(time.perf_counter() - inicio)
+        if time.perf_counter() >= fin:
+            break
+    return muestras
+
+
+def percentil(ordenadas, p):
+    """Percentil p (0-100) por rango más cercano de una lista ya ordenada."""
+    i = max(0, min(len(ordenadas) - 1, round(p / 100 * len(ordenadas)) - 1))
+    return ordenadas[i]
+
+
+def resumir(muestras):
+    """Estadísticas en microsegundos de una lista de tiempos."""
+    ordenadas = sorted(muestras)
+    us = 1e6
+    return {
+        "n": len(ordenadas),
+        "min_us": ordenadas[0] * us,
+        "p50_us": percentil(ordenadas, 50) * us,
+        "p90_us": percentil(ordenadas, 90) * us,
+        "p99_us": percentil(ordenadas, 99) * us,
+        "max_us": ordenadas[-1] * us,
+        "media_us": sum(ordenadas) / len(ordenadas) * us,
+    }
@@ -0,0 +1,77 @@
+"""
+Courier Quest - Ciudades, pedidos y clima sintéticos para los benchmarks
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import random
+from datetime import timedelta
+from city import City
+from simulacion import INICIO_JORNADA
+
+LEYENDA = {
+    "C": {"name": "calle", "surface_weight": 1.0},
+    "B": {"name": "edificio", "blocked": True},
+    "P": {"name": "parque", "surface_weight": 0.95},
+}
+CLIMAS = ["clear", "clouds", "rain", "storm", "wind", "heat"]
+
+
+def ciudad(width, height, seed=0, edificios=0.3, parques=0.1):
+    """Ciudad de width x height con calles cada 3 casillas.
+
+    Las filas y columnas múltiplos de 3 son calle; el resto de casillas es
+    edificio, parque o calle al azar. Como cada manzana es de 2x2, toda
+    casilla libre toca una calle y la ciudad queda conectada.
+    """
+    rng = random.Random(seed)
+    tiles = []
+    for y in range(height):
+        fila = []
+        for x in range(width):
+            if x % 3 == 0 or y % 3 == 0:
+                fila.append("C")
+                continue
+            r = rng.random()
+            if r < edificios:
+                fila.append("B")
+            elif r < edificios + parques:
+                fila.append("P")
+            else:
+                fila.append("C")
+        tiles.append(fila)
+    return City(data={"version": "1.0", "width": width, "height": height,
+                      "tiles": tiles, "legend": LEYENDA, "goal": 3000})
+
+
+def casillas_libres(city):
+    """Lista de casillas no bloqueadas."""
+    return [(x, y) for y in range(city.height) for x in range(city.width)
+            if not city.is_blocked(x, y)]
+
+
+def pedidos(city, n, seed=0, libres=None):
+    """n pedidos con el formato de data/Pedidos.json entre casillas libres."""
+    rng = random.Random(seed)
+    libres = libres or casillas_libres(city)
+    resultado = []
+    for i in range(n):
+        plazo = INICIO_JORNADA + timedelta(seconds=rng.randint(120, 900))
+        resultado.append({
+            "id": f"SIN-{i:06d}",
+            "pickup": list(rng.choice(libres)),
+            "dropoff": list(rng.choice(libres)),
+            "payout": rng.randint(50, 400),
+            "deadline": plazo.isoformat(),
+            "weight": rng.randint(1, 3),
+            "priority": rng.randint(0, 2),
+            "release_time": 0,
+        })
+    return resultado
+
+
+def rafagas(n, seed=0):
+    """n ráfagas de clima con el formato de data/clima.json."""
+    rng = random.Random(seed)
+    return [{"duration_sec": rng.randint(30, 120), "condition": rng.choice(CLIMAS),
+             "intensity": round(rng.random(), 2)} for _ in range(n)]
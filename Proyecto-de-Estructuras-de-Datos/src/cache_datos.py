@@ -0,0 +1,141 @@
+"""
+Courier Quest - Caché binaria de los datos ya compilados
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Guarda junto a los datos (en data/cache/) lo que cuesta armar al cargar:
+los arreglos de la ciudad (un mapa binario no pasa por aquí, los códigos se
+leen del archivo), los pedidos ya leídos (con sus deadline convertidos) y
+las ráfagas de clima.
+
+Cada entrada guarda el tamaño y la fecha de modificación del archivo
+fuente y el hash de su contenido. Si tamaño y fecha coinciden se usa sin
+leer la fuente; si no, se calcula el hash leyendo la fuente por bloques y
+la entrada sirve solo si el contenido es el mismo (un checkout o una copia
+cambian la fecha sin cambiar los datos). Un archivo modificado no coincide
+y se compila de nuevo.
+
+Uso (desde la carpeta del proyecto), para compilar antes de jugar:
+    python src/cache_datos.py
+"""
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+CARPETA = "cache"
+# Subirla cuando cambie lo que se guarda: las entradas viejas dejan de coincidir
+VERSION = 3
+BLOQUE_HASH = 1 << 20
+
+
+def hash_archivo(path):
+    """Hash del contenido de path, leído por bloques (no carga el archivo entero)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(BLOQUE_HASH), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+class Entrada:
+    """Entrada de la caché para un archivo fuente y un tipo de dato.
+
+    Al crearla solo se consulta el tamaño y la fecha del archivo; el
+    contenido se lee (por bloques, para el hash) únicamente si la fecha no
+    coincide con la de la entrada guardada, y entero solo en json().
+
+    El archivo de la entrada tiene dos pickles seguidos: la firma
+    ((tamaño, fecha), hash) y el dato, así se revisa la firma sin cargar el
+    dato.
+    """
+
+    def __init__(self, path, tipo):
+        self.path = path
+        self.tipo = tipo
+        estado = os.stat(path)
+        self.firma = (estado.st_size, estado.st_mtime_ns)
+        self._hash = None
+        self.carpeta = os.path.join(os.path.dirname(path), CARPETA)
+        self.prefijo = f"{os.path.basename(path)}.{self.tipo}.v"
+        self.archivo = os.path.join(self.carpeta, f"{self.prefijo}{VERSION}.bin")
+
+    @property
+    def hash(self):
+        """Hash del contenido de la fuente (se calcula la primera vez que se pide)."""
+        if self._hash is None:
+            self._hash = hash_archivo(self.path)
+        return self._hash
+
+    def json(self):
+        """Contenido del archivo fuente como JSON.
+
+        El hash sale de los mismos bytes, así lo guardado corresponde a lo
+        que se compiló aunque otro hilo reemplace el archivo mientras tanto.
+        """
+        with open(self.path, "rb") as f:
+            contenido = f.read()
+        self._hash = hashlib.blake2b(contenido, digest_size=16).hexdigest()
+        return json.loads(contenido.decode("utf-8"))
+
+    def leer(self):
+        """Dato compilado guardado, o None si no hay, es de otro contenido o está dañado.
+
+        Si el contenido es el mismo pero cambió la fecha, la entrada se
+        vuelve a guardar con la fecha nueva.
+        """
+        try:
+            with open(self.archivo, "rb") as f:
+                firma, hash_fuente = pickle.load(f)
+                if firma != self.firma and (firma[0] != self.firma[0] or
+                                            hash_fuente != self.hash):
+                    return None
+                dato = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError,
+                TypeError):
+            return None
+        if firma != self.firma:
+            self.guardar(dato)
+        return dato
+
+    def guardar(self, dato):
+        """Guarda el dato compilado y borra las entradas de versiones anteriores.
+
+        Si no se puede escribir (carpeta de solo lectura) se sigue sin caché.
+        """
+        try:
+            os.makedirs(self.carpeta, exist_ok=True)
+            temporal = f"{self.archivo}.{os.getpid()}.tmp"
+            with open(temporal, "wb") as f:
+                pickle.dump((self.firma, self.hash), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(dato, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self.archivo)
+            for viejo in glob.glob(os.path.join(glob.escape(self.carpeta),
+                                                glob.escape(self.prefijo) + "*.bin")):
+                if viejo != self.archivo:
+                    os.remove(viejo)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    # Importados aquí porque esos módulos usan esta caché al cargar
+    from city import City
+    from order import OrderManager
+    from weather import Weather
+
+    argv = sys.argv[1:] if argv is None else argv
+    city_file, orders_file, weather_file = (argv + [None] * 3)[:3]
+    city = City(city_file or "data/Info_de_ciudad.json")
+    OrderManager(orders_file or "data/Pedidos.json", city=city)
+    Weather(weather_file or "data/clima.json")
+    print("Caché de datos al día.")
+
+
+if __name__ == "__main__":
+    main()
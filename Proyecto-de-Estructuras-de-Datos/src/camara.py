@@ -0,0 +1,122 @@
+"""
+Courier Quest - Cámara que sigue al jugador y texturas por nivel de zoom
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import pygame
+
+ZOOMS = (0.5, 0.75, 1.0, 1.5, 2.0)
+ZOOM_INICIAL = ZOOMS.index(1.0)
+
+
+class TexturasPorZoom:
+    """Imágenes originales y sus copias escaladas, una vez por tamaño de casilla.
+
+    Cambiar de zoom no vuelve a llamar pygame.transform.scale: el juego de
+    texturas de cada tamaño se arma la primera vez que se pide y se guarda.
+    Las copias van empacadas en dos atlas por tamaño (uno opaco y otro con
+    transparencia) y cada textura es una subsuperficie de su atlas.
+    """
+
+    def __init__(self, originales):
+        """originales: nombre -> Surface sin escalar (ya convertida)."""
+        self.originales = originales
+        self.escaladas = {}
+        self.atlas = {}
+
+    def tamano(self, tile_size):
+        """nombre -> Surface escalada a tile_size x tile_size."""
+        juego = self.escaladas.get(tile_size)
+        if juego is None:
+            juego = self._empacar(tile_size)
+            self.escaladas[tile_size] = juego
+        return juego
+
+    def _empacar(self, tile_size):
+        """Escala las imágenes y las copia en fila a los atlas de ese tamaño."""
+        size = (tile_size, tile_size)
+        grupos = {False: [], True: []}
+        for nombre, image in self.originales.items():
+            grupos[bool(image.get_flags() & pygame.SRCALPHA)].append(nombre)
+
+        juego, atlas_tamano = {}, []
+        for alpha, nombres in grupos.items():
+            if not nombres:
+                continue
+            ancho = tile_size * len(nombres)
+            if alpha:
+                atlas = pygame.Surface((ancho, tile_size), pygame.SRCALPHA).convert_alpha()
+            else:
+                atlas = pygame.Surface((ancho, tile_size)).convert()
+            for i, nombre in enumerate(nombres):
+                image = pygame.transform.scale(self.originales[nombre], size)
+                # Sobre el atlas vacío (todo en cero) MAX copia los píxeles tal cual
+                atlas.blit(image, (i * tile_size, 0),
+                           special_flags=pygame.BLEND_RGBA_MAX if alpha else 0)
+                juego[nombre] = atlas.subsurface((i * tile_size, 0, tile_size, tile_size))
+            atlas_tamano.append(atlas)
+        self.atlas[tile_size] = atlas_tamano
+        return juego
+
+
+class Camara:
+    """Parte visible del mapa, en casillas, centrada en quien sigue.
+
+    La vista mide ancho x alto píxeles; con el zoom actual caben
+    ancho // tile_size casillas completas y a lo sumo una parcial por lado.
+    La cámara se mueve de casilla en casilla y no se sale del mapa (si el
+    mapa es más chico que la vista queda pegada a la esquina superior).
+    """
+
+    def __init__(self, city, ancho, alto, tile_size, zoom=ZOOM_INICIAL):
+        self.city = city
+        self.ancho = ancho
+        self.alto = alto
+        self.tile_base = tile_size
+        self.zoom = zoom
+        self.x = 0
+        self.y = 0
+
+    @property
+    def tile_size(self):
+        return round(self.tile_base * ZOOMS[self.zoom])
+
+    @property
+    def area(self):
+        """Rectángulo de la vista en pantalla."""
+        return pygame.Rect(0, 0, self.ancho, self.alto)
+
+    def completas(self):
+        """Casillas completas que caben a lo ancho y a lo alto."""
+        return self.ancho // self.tile_size, self.alto // self.tile_size
+
+    def cambiar_zoom(self, paso):
+        """Sube o baja un nivel de zoom; devuelve True si cambió."""
+        zoom = max(0, min(len(ZOOMS) - 1, self.zoom + paso))
+        if zoom == self.zoom:
+            return False
+        self.zoom = zoom
+        return True
+
+    def seguir(self, x, y):
+        """Centra la cámara en la casilla (x, y) sin salirse del mapa."""
+        cols, filas = self.completas()
+        self.x = max(0, min(x - cols // 2, self.city.width - cols))
+        self.y = max(0, min(y - filas // 2, self.city.height - filas))
+
+    def visibles(self):
+        """(x0, y0, x1, y1): casillas visibles del mapa, x1 e y1 exclusivos."""
+        ts = self.tile_size
+        x1 = min(self.city.width, self.x + -(-self.ancho // ts))
+        y1 = min(self.city.height, self.y + -(-self.alto // ts))
+        return self.x, self.y, x1, y1
+
+    def es_visible(self, x, y):
+        x0, y0, x1, y1 = self.visibles()
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def rect(self, x, y):
+        """Rectángulo en pantalla de la casilla (x, y) del mapa."""
+        ts = self.tile_size
+        return pygame.Rect((x - self.x) * ts, (y - self.y) * ts, ts, ts)
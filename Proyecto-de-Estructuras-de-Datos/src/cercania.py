@@ -0,0 +1,162 @@
+"""
+Courier Quest - Índice de cercanía por cubetas para pickups y dropoffs
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import heapq
+
+TAM_CUBETA = 8
+
+
+class IndiceCercania:
+    """Elementos ubicados en casillas, repartidos en cubetas de TAM_CUBETA x TAM_CUBETA.
+
+    Las consultas recorren anillos de cubetas alrededor del origen y
+    devuelven los elementos en orden de distancia Manhattan, que es una cota
+    inferior de la distancia caminando: quien necesita la distancia real
+    puede dejar de pedir candidatos cuando la cota ya supera al mejor.
+
+    Cada elemento se agrega con una llave única y ordenable (por ejemplo el
+    orden de carga del pedido) que desempata las distancias iguales.
+    """
+
+    def __init__(self, tam_cubeta=TAM_CUBETA):
+        self.tam_cubeta = tam_cubeta
+        self.cubetas = {}
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    def _cubeta(self, tile):
+        return (tile[0] // self.tam_cubeta, tile[1] // self.tam_cubeta)
+
+    def agregar(self, llave, tile, item):
+        self.cubetas.setdefault(self._cubeta(tile), {})[llave] = (tile, item)
+        self.total += 1
+
+    def quitar(self, llave, tile):
+        cubeta = self._cubeta(tile)
+        elementos = self.cubetas.get(cubeta)
+        if elementos is None or llave not in elementos:
+            return
+        del elementos[llave]
+        self.total -= 1
+        if not elementos:
+            del self.cubetas[cubeta]
+
+    def _anillo(self, centro, r):
+        """Cubetas a distancia de Chebyshev r (en cubetas) del centro."""
+        cx, cy = centro
+        if r == 0:
+            yield centro
+            return
+        for dx in range(-r, r + 1):
+            yield (cx + dx, cy - r)
+            yield (cx + dx, cy + r)
+        for dy in range(-r + 1, r):
+            yield (cx - r, cy + dy)
+            yield (cx + r, cy + dy)
+
+    def _por_anillos(self, centro):
+        """Genera (cota, elementos) anillo por anillo alrededor de la cubeta centro.
+
+        elementos son los pares (llave, (tile, item)) del anillo; todo lo que
+        queda en anillos siguientes está a distancia cota o más de cualquier
+        casilla de la cubeta centro.
+        """
+        vistos = 0
+        r = 0
+        while vistos < self.total:
+            elementos = [par for cubeta in self._anillo(centro, r)
+                         for par in self.cubetas.get(cubeta, {}).items()]
+            vistos += len(elementos)
+            yield r * self.tam_cubeta + 1, elementos
+            r += 1
+
+    def recorrer(self, origin):
+        """Genera (distancia Manhattan, item) en orden creciente (empates por llave)."""
+        ox, oy = origin
+        heap = []
+        for cota, elementos in self._por_anillos(self._cubeta(origin)):
+            for llave, (tile, item) in elementos:
+                heapq.heappush(heap, (abs(tile[0] - ox) + abs(tile[1] - oy), llave, item))
+            while heap and heap[0][0] < cota:
+                dist, _, item = heapq.heappop(heap)
+                yield dist, item
+        while heap:
+            dist, _, item = heapq.heappop(heap)
+            yield dist, item
+
+    def k_cercanos(self, origin, k):
+        """Los k elementos más cercanos como lista de (distancia, item)."""
+        resultado = []
+        for par in self.recorrer(origin):
+            if len(resultado) >= k:
+                break
+            resultado.append(par)
+        return resultado
+
+    def en_radio(self, origin, radio):
+        """Elementos a distancia Manhattan <= radio, del más cercano al más lejano."""
+        resultado = []
+        for dist, item in self.recorrer(origin):
+            if dist > radio:
+                break
+            resultado.append((dist, item))
+        return resultado
+
+    def _agrupar(self, origins):
+        """Índices de origins agrupados por cubeta."""
+        grupos = {}
+        for i, origin in enumerate(origins):
+            grupos.setdefault(self._cubeta(origin), []).append(i)
+        return grupos
+
+    def k_cercanos_lote(self, origins, k):
+        """k_cercanos para varias casillas a la vez (una lista por origen).
+
+        Los orígenes de una misma cubeta comparten el recorrido: cada anillo
+        se lee una vez por grupo y sus elementos se miden contra todos los
+        orígenes que todavía no tienen sus k más cercanos asegurados.
+        """
+        origins = list(origins)
+        resultados = [[] for _ in origins]
+        for centro, pendientes in self._agrupar(origins).items():
+            candidatos = {i: [] for i in pendientes}
+            for cota, elementos in self._por_anillos(centro):
+                for i in pendientes:
+                    ox, oy = origins[i]
+                    candidatos[i].extend((abs(tile[0] - ox) + abs(tile[1] - oy), llave, item)
+                                         for llave, (tile, item) in elementos)
+                pendientes = [i for i in pendientes
+                              if sum(1 for c in candidatos[i] if c[0] < cota) < k]
+                if not pendientes:
+                    break
+            for i, lista in candidatos.items():
+                resultados[i] = [(dist, item) for dist, _, item in heapq.nsmallest(k, lista)]
+        return resultados
+
+    def en_radio_lote(self, origins, radio):
+        """en_radio para varias casillas a la vez (una lista por origen).
+
+        Como en k_cercanos_lote, cada grupo de orígenes de una cubeta lee los
+        anillos una sola vez, hasta el primero que ya queda fuera del radio.
+        """
+        origins = list(origins)
+        resultados = [[] for _ in origins]
+        for centro, grupo in self._agrupar(origins).items():
+            candidatos = {i: [] for i in grupo}
+            for cota, elementos in self._por_anillos(centro):
+                for i in grupo:
+                    ox, oy = origins[i]
+                    for llave, (tile, item) in elementos:
+                        dist = abs(tile[0] - ox) + abs(tile[1] - oy)
+                        if dist <= radio:
+                            candidatos[i].append((dist, llave, item))
+                if cota > radio:
+                    break
+            for i, lista in candidatos.items():
+                resultados[i] = [(dist, item) for dist, _, item in sorted(lista)]
+        return resultados
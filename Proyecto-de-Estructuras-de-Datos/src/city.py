@@ -4,85 +4,280 @@ EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
 
-import json
-import pygame
+from array import array
+from collections import deque
+import mapa_binario
+import cache_datos
+from zonas import Zonas
 
-TILE_SIZE = 40
+VECINOS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
 
 
 class City:
-    """Clase que maneja el mapa de la ciudad."""
+    """Clase que maneja el mapa de la ciudad.
 
-    def __init__(self, json_file="data/Info_de_ciudad.json"):
-        pygame.init()
-        pygame.display.set_mode((1, 1))
+    Al cargar, el mapa se compila en arreglos planos indexados con
+    y * width + x:
+        codes: bytearray con el código de cada casilla (índice en symbols).
+        blocked: bytearray, 1 si la casilla está bloqueada.
+    En los mapas binarios (mapa_binario) codes y blocked son CapaPorChunks
+    sobre el archivo abierto por mmap: solo se leen los chunks que se usan.
+        surface_by_code: surface_weight de cada código; surface_weight(x, y)
+            lo busca sin pasar por los diccionarios de legend.
+    Las zonas conectadas (connected) se etiquetan por chunks a medida que se
+    consultan (ver zonas.Zonas), abrir el mapa no lo recorre entero.
+    """
+
+    def __init__(self, json_file="data/Info_de_ciudad.json", data=None):
+        """data: diccionario con el mismo formato del JSON (mapas generados)."""
         self.width = 0
         self.height = 0
-        self.tiles = []
         self.legend = {}
         self.goal = 0
 
-        self._load_map(json_file)
-
-        self.textures= {
-            "calle": pygame.image.load("assets/Calle.png").convert(),
-            "edificio": pygame.image.load("assets/Ciudad.png").convert(),
-            "parque": pygame.image.load("assets/Parque.png").convert(),
-        }
+        self.symbols = []
+        self.codes = bytearray()
+        self.blocked = bytearray()
+        self.surface_by_code = []
+        self._code_of = {}
+        self._mapa = None
 
-        for key in self.textures:
-            self.textures[key] = pygame.transform.scale(
-                self.textures[key], (TILE_SIZE, TILE_SIZE)
-            )
+        self._distance_fields = {}
+        self.tile_changes = []
 
-        self.background = self._generate_background()
+        self.zonas = None
 
+        if data is None:
+            self._load_map(json_file)
+        else:
+            self._load_data(data)
 
     def _load_map(self, json_file):
-        """Carga el mapa desde un archivo JSON."""
+        """Carga el mapa desde un archivo JSON o binario (se detecta por el contenido).
+
+        Los arreglos compilados de un mapa JSON quedan en cache_datos; si el
+        archivo no cambió desde la última vez se restauran de ahí. Un mapa
+        binario se lee directo del archivo.
+        """
         try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(json_file, "rb") as f:
+                binario = f.read(len(mapa_binario.MAGIA)) == mapa_binario.MAGIA
         except FileNotFoundError:
             raise FileNotFoundError(f"No se encontró el archivo: {json_file}")
+        if binario:
+            self._load_binary(json_file)
+            return
+
+        entrada = cache_datos.Entrada(json_file, "ciudad")
+        compilado = entrada.leer()
+        if compilado is not None:
+            self._restaurar(compilado)
+            return
+        self._load_data(entrada.json())
+        entrada.guardar(self._compilado())
 
+    def _load_binary(self, path):
+        """Abre un mapa en formato binario (mapa_binario) sin pasar por JSON.
+
+        El archivo queda abierto: codes y blocked leen de él los chunks a
+        medida que se usan, también al etiquetar las zonas conectadas.
+        """
+        mapa = mapa_binario.MapaBinario(path)
+        try:
+            self.width = mapa.width
+            self.height = mapa.height
+            self.legend = mapa.legend
+            self.goal = mapa.goal
+            self._compile_legend()
+            self._compile_codes(mapa.capa())
+        except ValueError:
+            mapa.cerrar()
+            raise
+        self._mapa = mapa
+
+    def _load_data(self, data):
+        """Compila el diccionario del mapa (width, height, tiles, legend, goal)."""
         self.width = data["width"]
         self.height = data["height"]
-        self.tiles = data["tiles"]
         self.legend = data["legend"]
         self.goal = data.get("goal", 0)
+        self._compile(data["tiles"])
+
+    def _compile(self, tiles):
+        """Pasa la matriz de símbolos a los arreglos planos."""
+        self._compile_legend()
+        code_of = self._code_of
+        self._compile_codes(bytearray(code_of[symbol] for row in tiles for symbol in row))
+
+    def _compile_legend(self):
+        """Asigna un código a cada símbolo de legend, en el orden de legend."""
+        if len(self.legend) > 256:
+            raise ValueError("La leyenda tiene más de 256 tipos de casilla.")
+        self.symbols = list(self.legend)
+        self._code_of = {symbol: code for code, symbol in enumerate(self.symbols)}
+        self.surface_by_code = [self.legend[s].get("surface_weight", 1.0) for s in self.symbols]
+
+    def _compile_codes(self, codes):
+        """Guarda codes y arma blocked (y sus zonas) a partir de él."""
+        if len(codes) != self.width * self.height:
+            raise ValueError(f"El mapa debería tener {self.width * self.height} casillas "
+                             f"y tiene {len(codes)}.")
+        blocked_by_code = bytes(1 if self.legend[s].get("blocked", False) else 0
+                                for s in self.symbols)
+        self.codes = codes
+        self.blocked = codes.translate(blocked_by_code.ljust(256, b"\0"))
+        self.zonas = Zonas(self.blocked, self.width, self.height)
+
+    def _compilado(self):
+        """Lo que guarda cache_datos de un mapa JSON: todo lo que sale de compilarlo."""
+        return {"width": self.width, "height": self.height, "legend": self.legend,
+                "goal": self.goal, "codes": self.codes}
+
+    def _restaurar(self, compilado):
+        """Carga un mapa ya compilado (ver _compilado)."""
+        self.width = compilado["width"]
+        self.height = compilado["height"]
+        self.legend = compilado["legend"]
+        self.goal = compilado["goal"]
+        self._compile_legend()
+        self._compile_codes(compilado["codes"])
+
+    @property
+    def tiles(self):
+        """Matriz de símbolos armada a partir de codes (solo para exportar el mapa)."""
+        symbols, width = self.symbols, self.width
+        return [[symbols[c] for c in self.codes[y * width:(y + 1) * width]]
+                for y in range(self.height)]
 
     def is_blocked(self, x, y):
         """Vefica si es un edificio"""
-        symbol = self.tiles[y][x]
-        return self.legend[symbol].get("blocked", False)
-
-    def draw(self, surface):
-        """Dibuja la ciudad."""        
-        for y in range(self.height):
-            for x in range(self.width):
-                symbol = self.tiles[y][x]
-                tile_type = self.legend[symbol]["name"]
-                image = self.textures.get(tile_type)
-
-                if image:
-                    surface.blit(image, (x * TILE_SIZE, y * TILE_SIZE))
-                else:
-                    pygame.draw.rect(surface, (255, 0, 255),
-                             (x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
-
-    def _generate_background(self):
-        """Genera un fondo de base donde se colocarán las texturas."""
-        # Creamos una superficie con el tamaño del mapa completo
-        background = pygame.Surface((self.width * TILE_SIZE,
-                                     self.height * TILE_SIZE))
-
-        # Pintamos el fondo con un color base (ej. pasto claro)
-        background.fill((130, 200, 130))
-
-        # Podés dibujar patrones simples para hacerlo más "natural"
-        for y in range(0, self.height * TILE_SIZE, TILE_SIZE):
-            for x in range(0, self.width * TILE_SIZE, TILE_SIZE):
-                if (x + y) // TILE_SIZE % 2 == 0:
-                    pygame.draw.rect(background, (120, 190, 120),
-                                     (x, y, TILE_SIZE, TILE_SIZE))
+        return self.blocked[y * self.width + x]
+
+    def symbol_at(self, x, y):
+        """Símbolo de la leyenda en (x, y)."""
+        return self.symbols[self.codes[y * self.width + x]]
+
+    def tile_name(self, x, y):
+        """Nombre del tipo de casilla en (x, y) (calle, edificio, parque...)."""
+        return self.legend[self.symbol_at(x, y)]["name"]
+
+    def surface_weight(self, x, y):
+        """surface_weight de la casilla (x, y), 1.0 si la leyenda no lo define."""
+        return self.surface_by_code[self.codes[y * self.width + x]]
+
+    def set_tile(self, x, y, symbol):
+        """Cambia una casilla del mapa (por ejemplo una calle que se cierra).
+
+        Los campos de distancias guardados dejan de servir y se descartan;
+        los planificadores incrementales leen tile_changes para reparar solo
+        lo afectado.
+        """
+        i = y * self.width + x
+        code = self._code_of[symbol]
+        if self.codes[i] == code:
+            return
+        self.codes[i] = code
+        was_blocked = self.blocked[i]
+        self.blocked[i] = 1 if self.legend[symbol].get("blocked", False) else 0
+        if self.blocked[i] != was_blocked:
+            self.zonas.cambio(x, y)
+        self._distance_fields.clear()
+        self.tile_changes.append((x, y))
+
+    def component(self, x, y):
+        """Zona de calles conectadas de (x, y), -1 si está bloqueada o fuera del mapa."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        return self.zonas.component(x, y)
+
+    def connected(self, a, b):
+        """Indica si se puede caminar de a hasta b.
+
+        Solo lee los chunks que hay entre las dos casillas, y lo que revisa
+        sirve para las consultas siguientes (zonas.Zonas).
+        """
+        for x, y in (a, b):
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                return False
+        return self.zonas.connected(a, b)
+
+    def distance_field(self, target):
+        """Distancia caminando de cada casilla hasta target (-1 si no se llega).
+
+        Se calcula con un BFS desde target la primera vez que se pide y queda
+        guardado hasta que se llama evict_distance_field. Es un array plano,
+        la casilla (x, y) está en y * width + x.
+        """
+        field = self._distance_fields.get(target)
+        if field is None:
+            field = self._build_distance_field(target)
+            self._distance_fields[target] = field
+        return field
+
+    def _build_distance_field(self, target):
+        """BFS inverso desde target sobre las casillas transitables."""
+        width = self.width
+        size = width * self.height
+        field = array("i", [-1]) * size
+
+        tx, ty = target
+        if not (0 <= tx < width and 0 <= ty < self.height) or self.is_blocked(tx, ty):
+            return field
+
+        blocked = self.blocked
+        start = ty * width + tx
+        field[start] = 0
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            d = field[i] + 1
+            x = i % width
+            if x > 0 and field[i - 1] == -1 and not blocked[i - 1]:
+                field[i - 1] = d
+                queue.append(i - 1)
+            if x < width - 1 and field[i + 1] == -1 and not blocked[i + 1]:
+                field[i + 1] = d
+                queue.append(i + 1)
+            if i >= width and field[i - width] == -1 and not blocked[i - width]:
+                field[i - width] = d
+                queue.append(i - width)
+            if i + width < size and field[i + width] == -1 and not blocked[i + width]:
+                field[i + width] = d
+                queue.append(i + width)
+        return field
+
+    def evict_distance_field(self, target):
+        """Descarta el campo de distancias de target (pedido entregado o vencido)."""
+        self._distance_fields.pop(target, None)
+
+    def walking_distance(self, origin, target):
+        """Pasos caminando de origin a target, o None si no hay camino."""
+        if not self.connected(origin, target):
+            return None
+        d = self.distance_field(target)[origin[1] * self.width + origin[0]]
+        return None if d < 0 else d
+
+    def next_step(self, origin, target):
+        """Siguiente casilla bajando por el campo de distancias, o None."""
+        if not self.connected(origin, target):
+            return None
+        field = self.distance_field(target)
+        x, y = origin
+        d = field[y * self.width + x]
+        if d <= 0:
+            return None
+        for dx, dy in VECINOS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                if field[ny * self.width + nx] == d - 1:
+                    return (nx, ny)
+        return None
+
+    def path_to(self, origin, target):
+        """Camino más corto de origin a target (sin incluir origin)."""
+        path = []
+        step = self.next_step(origin, target)
+        while step is not None:
+            path.append(step)
+            step = self.next_step(step, target)
+        return path
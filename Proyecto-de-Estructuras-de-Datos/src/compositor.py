@@ -0,0 +1,181 @@
+"""
+Courier Quest - Compositor de capas para dibujar el mapa
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import pygame
+
+COLOR_SIN_TEXTURA = (255, 0, 255)
+COLOR_FUERA_MAPA = (0, 0, 0)
+
+
+class Compositor:
+    """Dibuja la parte visible de la ciudad por capas y solo actualiza lo que cambió.
+
+    Las capas miden lo mismo que la vista de la cámara, no la ciudad, así
+    el costo de un cuadro depende del tamaño de la pantalla. De abajo hacia
+    arriba:
+        fondo: las casillas visibles. Cuando la cámara avanza, la capa se
+            desplaza con Surface.scroll y solo se dibujan las casillas que
+            entran a la vista; al cambiar el zoom se dibuja de nuevo.
+        escena: el fondo con los marcadores de pickup/dropoff de las
+            casillas visibles; se revisan solo cuando cambia
+            OrderManager.version o entran casillas nuevas a la vista.
+        sprites: jugador y CPU, se borran copiando la escena en su rectángulo
+            anterior y se dibujan encima cada cuadro.
+
+    Las imágenes se piden por nombre a TexturasPorZoom con el tamaño de
+    casilla del zoom actual. dibujar() devuelve los rectángulos sucios para
+    pygame.display.update.
+    """
+
+    def __init__(self, city, texturas, camara):
+        self.city = city
+        self.texturas = texturas
+        self.camara = camara
+
+        size = (camara.ancho, camara.alto)
+        self.fondo = pygame.Surface(size).convert()
+        self.escena = pygame.Surface(size).convert()
+        self.changes_seen = len(city.tile_changes)
+
+        self.imagenes = None
+        self.vista = None
+        self.marcadores = {}
+        self.version_pedidos = None
+        self.sprites = []
+        self.completo = True
+
+    def invalidar(self):
+        """El próximo cuadro redibuja toda la pantalla (al empezar o tras otra vista)."""
+        self.completo = True
+
+    def _dibujar_casilla(self, x, y):
+        """Dibuja la textura de la casilla en el fondo."""
+        r = self.camara.rect(x, y)
+        if not (0 <= x < self.city.width and 0 <= y < self.city.height):
+            self.fondo.fill(COLOR_FUERA_MAPA, r)
+            return
+        image = self.imagenes.get(self.city.tile_name(x, y))
+        if image:
+            self.fondo.blit(image, r)
+        else:
+            pygame.draw.rect(self.fondo, COLOR_SIN_TEXTURA, r)
+
+    def _marcador(self, orders, x, y):
+        """Nombre del marcador de la casilla (el dropoff tapa al pickup), o None."""
+        marcador = None
+        for order in orders.por_casilla.get((x, y), ()):
+            if order.status == "picked" and order.dropoff == (x, y):
+                return "dropoff"
+            if order.status == "waiting" and order.pickup == (x, y):
+                marcador = "pickup"
+        return marcador
+
+    def _pintar(self, tiles):
+        """Copia las casillas del fondo a la escena con su marcador encima."""
+        for tile in tiles:
+            r = self.camara.rect(*tile)
+            self.escena.blit(self.fondo, r, r)
+            marcador = self.marcadores.get(tile)
+            if marcador:
+                self.escena.blit(self.imagenes[marcador], r)
+
+    def _rango(self, vista):
+        """Casillas de la vista (x, y, tile_size) que caen en pantalla."""
+        x, y, ts = vista
+        return [(tx, ty)
+                for ty in range(y, y + -(-self.camara.alto // ts))
+                for tx in range(x, x + -(-self.camara.ancho // ts))]
+
+    def _mover_vista(self, orders):
+        """Lleva las capas a la vista actual; devuelve las casillas que hay que pintar."""
+        camara = self.camara
+        vista = (camara.x, camara.y, camara.tile_size)
+        if vista == self.vista:
+            return set()
+
+        nuevas = self._rango(vista)
+        anterior = self.vista
+        self.vista = vista
+        self.completo = True
+        if anterior is None or anterior[2] != vista[2]:
+            self.imagenes = self.texturas.tamano(vista[2])
+            conservadas = set()
+        else:
+            ts = vista[2]
+            dx, dy = vista[0] - anterior[0], vista[1] - anterior[1]
+            self.fondo.scroll(-dx * ts, -dy * ts)
+            self.escena.scroll(-dx * ts, -dy * ts)
+            # Solo se conservan las casillas que antes se veían completas
+            cols, filas = camara.ancho // ts, camara.alto // ts
+            conservadas = {(x, y) for x, y in nuevas
+                           if anterior[0] <= x < anterior[0] + cols
+                           and anterior[1] <= y < anterior[1] + filas}
+
+        entran = [tile for tile in nuevas if tile not in conservadas]
+        for tile in entran:
+            self._dibujar_casilla(*tile)
+        self.marcadores = {tile: m for tile, m in self.marcadores.items() if tile in conservadas}
+        for x, y in entran:
+            marcador = self._marcador(orders, x, y)
+            if marcador:
+                self.marcadores[(x, y)] = marcador
+        return set(entran)
+
+    def _actualizar_escena(self, orders):
+        """Corrige en la escena las casillas cambiadas; devuelve sus rectángulos."""
+        tiles = self._mover_vista(orders)
+        camara = self.camara
+
+        changes = self.city.tile_changes
+        for x, y in changes[self.changes_seen:]:
+            if camara.es_visible(x, y):
+                self._dibujar_casilla(x, y)
+                tiles.add((x, y))
+        self.changes_seen = len(changes)
+
+        if orders.version != self.version_pedidos:
+            for tile in self._rango(self.vista):
+                marcador = self._marcador(orders, *tile)
+                if self.marcadores.get(tile) != marcador:
+                    tiles.add(tile)
+                    if marcador:
+                        self.marcadores[tile] = marcador
+                    else:
+                        self.marcadores.pop(tile, None)
+            self.version_pedidos = orders.version
+
+        self._pintar(tiles)
+        area = camara.area
+        return [camara.rect(*tile).clip(area) for tile in tiles]
+
+    def dibujar(self, screen, orders, sprites):
+        """Compone la vista en screen. sprites: lista de (nombre, (x, y)) en casillas."""
+        dirty = self._actualizar_escena(orders)
+        area = self.camara.area
+        screen.set_clip(area)
+
+        if self.completo:
+            screen.blit(self.escena, (0, 0))
+            dirty = [area]
+        else:
+            for r in dirty:
+                screen.blit(self.escena, r, r)
+            for r in self.sprites:
+                screen.blit(self.escena, r, r)
+                dirty.append(r)
+
+        self.sprites = []
+        for nombre, (x, y) in sprites:
+            if not self.camara.es_visible(x, y):
+                continue
+            r = self.camara.rect(x, y).clip(area)
+            screen.blit(self.imagenes[nombre], self.camara.rect(x, y))
+            self.sprites.append(r)
+            dirty.append(r)
+
+        screen.set_clip(None)
+        self.completo = False
+        return dirty
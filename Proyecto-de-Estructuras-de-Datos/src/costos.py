@@ -0,0 +1,133 @@
+"""
+Courier Quest - Capa de costos de viaje según terreno, clima y peso
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import weakref
+from array import array
+from weather import WEATHER_MULTIPLIERS
+from player import PESO_MAXIMO
+
+INF = float("inf")
+MAX_BUCKET = PESO_MAXIMO
+
+_por_ciudad = weakref.WeakKeyDictionary()
+
+
+def para_ciudad(city):
+    """Devuelve la CapaCostos de la ciudad, construyéndola la primera vez que se pide.
+
+    Solo la piden los planificadores que pesan casillas (D* Lite); el resto
+    del juego usa las funciones sueltas de este módulo, que no la arman.
+    """
+    capa = _por_ciudad.get(city)
+    if capa is None:
+        capa = CapaCostos(city)
+        _por_ciudad[city] = capa
+    return capa
+
+
+def cambiar_clima(city, clima):
+    """Avisa el cambio de ráfaga a la capa de la ciudad, si ya existe."""
+    capa = _por_ciudad.get(city)
+    if capa is not None:
+        capa.cambiar_clima(clima)
+
+
+def bucket(peso):
+    """Peso cargado redondeado; hasta 3 no cambia el consumo (Player._consumir_resistencia)
+    y nadie carga más de PESO_MAXIMO."""
+    return max(3, min(int(peso), MAX_BUCKET))
+
+
+def factor(clima, peso_bucket):
+    """Escala de la cuadrícula para un clima y un peso."""
+    mult = WEATHER_MULTIPLIERS.get(clima, 1.0)
+    consumo = 0.5
+    if peso_bucket > 3:
+        consumo += 0.2 * (peso_bucket - 3)
+    return consumo / mult
+
+
+def costo_ruta(city, path, clima="clear", peso=0):
+    """Suma de costos de las casillas de una ruta (sin la casilla inicial).
+
+    Lee el terreno de cada casilla de la ruta, no necesita la capa.
+    """
+    return factor(clima, bucket(peso)) * sum(1.0 / city.surface_weight(x, y) for x, y in path)
+
+
+class CapaCostos:
+    """Costo de entrar a cada casilla, una cuadrícula plana por clima y peso.
+
+    base guarda solo el costo del terreno (1 / surface_weight) y se corrige en
+    el lugar cuando cambian casillas, los planificadores pueden usarla directo.
+    El costo es lo que descuenta _consumir_resistencia al pisar la casilla.
+
+    Las cuadrículas se arman a partir de base y WEATHER_MULTIPLIERS la
+    primera vez que se piden y se descartan cuando Weather.update cambia de
+    ráfaga (cambiar_clima). Con las reglas actuales el clima y el peso solo
+    escalan toda la cuadrícula, así que la forma de la ruta depende del
+    terreno y el clima cambia cuánto cuesta recorrerla. Todas son array("d"),
+    8 bytes por casilla.
+    """
+
+    def __init__(self, city):
+        self.city = city
+        por_codigo = [INF if city.legend[s].get("blocked", False) else 1.0 / peso
+                      for s, peso in zip(city.symbols, city.surface_by_code)]
+        self.base = array("d", (por_codigo[c] for c in city.codes))
+        self.grids = {}
+        self.clima = "clear"
+        self.changes_seen = len(city.tile_changes)
+        self._min_base = None
+
+    def _costo_base(self, x, y):
+        if self.city.is_blocked(x, y):
+            return INF
+        return 1.0 / self.city.surface_weight(x, y)
+
+    def grid(self, clima, peso=0):
+        """Cuadrícula plana (y * width + x) de costos; INF en casillas bloqueadas."""
+        self.sincronizar()
+        key = (clima, bucket(peso))
+        grid = self.grids.get(key)
+        if grid is None:
+            f = factor(*key)
+            grid = array("d", (f * b for b in self.base))
+            self.grids[key] = grid
+        return grid
+
+    def actual(self, peso=0):
+        """Cuadrícula del clima vigente."""
+        return self.grid(self.clima, peso)
+
+    def base_minimo(self):
+        """Menor costo de terreno de una casilla transitable."""
+        self.sincronizar()
+        if self._min_base is None:
+            self._min_base = min((b for b in self.base if b != INF), default=1.0)
+        return self._min_base
+
+    def costo_minimo(self, clima, peso=0):
+        """Menor costo de una casilla transitable (escala de la heurística)."""
+        return factor(clima, bucket(peso)) * self.base_minimo()
+
+    def cambiar_clima(self, clima):
+        """Weather.update cambió de ráfaga: las cuadrículas viejas se descartan."""
+        if clima == self.clima:
+            return
+        self.clima = clima
+        self.grids = {}
+
+    def sincronizar(self):
+        """Actualiza las casillas cambiadas con City.set_tile en todas las cuadrículas."""
+        changes = self.city.tile_changes
+        for x, y in changes[self.changes_seen:]:
+            i = y * self.city.width + x
+            self.base[i] = self._costo_base(x, y)
+            for (clima, peso_bucket), grid in self.grids.items():
+                grid[i] = factor(clima, peso_bucket) * self.base[i]
+            self._min_base = None
+        self.changes_seen = len(changes)
@@ -0,0 +1,148 @@
+"""
+Courier Quest - Planificador incremental D* Lite
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import heapq
+from collections import deque
+
+INF = float("inf")
+VECINOS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+class DStarLite:
+    """D* Lite (Koenig y Likhachev) sobre la cuadrícula de la ciudad.
+
+    Busca desde el objetivo hacia el repartidor y guarda g/rhs entre
+    llamadas: cuando el repartidor avanza o cambian casillas de la ciudad
+    (City.set_tile) solo se reparan los nodos afectados en lugar de buscar
+    todo de nuevo. Cada instancia sirve para un objetivo fijo.
+    """
+
+    def __init__(self, city, start, goal, costos=None, escala_h=1):
+        """costos: cuadrícula plana de CapaCostos (None = cada paso cuesta 1);
+        escala_h: menor costo de esa cuadrícula, para que la heurística no sobrestime."""
+        self.city = city
+        self.costos = costos
+        self.escala_h = escala_h
+        self.start = start
+        self.goal = goal
+        self.last = start
+        self.km = 0
+
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.open = []
+        self.open_keys = {}
+        self.changes_seen = len(city.tile_changes)
+
+        self._push(goal, self.calculate_key(goal))
+
+    def heuristic(self, a, b):
+        """Distancia Manhattan por el menor costo de casilla."""
+        return (abs(a[0] - b[0]) + abs(a[1] - b[1])) * self.escala_h
+
+    def calculate_key(self, s):
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self.heuristic(self.start, s) + self.km, m)
+
+    def _push(self, s, key):
+        self.open_keys[s] = key
+        heapq.heappush(self.open, (key, s))
+
+    def _top(self):
+        """Primer nodo vigente de la cola (descarta entradas viejas)."""
+        while self.open:
+            key, s = self.open[0]
+            if self.open_keys.get(s) == key:
+                return key, s
+            heapq.heappop(self.open)
+        return (INF, INF), None
+
+    def neighbors(self, s):
+        x, y = s
+        for dx, dy in VECINOS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.city.width and 0 <= ny < self.city.height:
+                yield (nx, ny)
+
+    def cost(self, a, b):
+        """Costo de entrar a b desde a, o infinito si alguna casilla está bloqueada."""
+        if self.city.is_blocked(a[0], a[1]) or self.city.is_blocked(b[0], b[1]):
+            return INF
+        if self.costos is None:
+            return 1
+        return self.costos[b[1] * self.city.width + b[0]]
+
+    def update_vertex(self, u):
+        if u != self.goal:
+            self.rhs[u] = min((self.cost(u, s) + self.g.get(s, INF) for s in self.neighbors(u)),
+                              default=INF)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u, self.calculate_key(u))
+        else:
+            self.open_keys.pop(u, None)
+
+    def compute_shortest_path(self):
+        """Expande nodos hasta que el inicio quede consistente."""
+        while True:
+            k_old, u = self._top()
+            if u is None:
+                return
+            start_rhs = self.rhs.get(self.start, INF)
+            if not (k_old < self.calculate_key(self.start) or start_rhs != self.g.get(self.start, INF)):
+                return
+
+            heapq.heappop(self.open)
+            k_new = self.calculate_key(u)
+            if k_old < k_new:
+                self._push(u, k_new)
+            elif self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                del self.open_keys[u]
+                for s in self.neighbors(u):
+                    self.update_vertex(s)
+            else:
+                self.g[u] = INF
+                self.update_vertex(u)
+                for s in self.neighbors(u):
+                    self.update_vertex(s)
+
+    def _apply_changes(self):
+        """Repara los nodos alrededor de las casillas que cambiaron en la ciudad."""
+        changes = self.city.tile_changes
+        for tile in changes[self.changes_seen:]:
+            self.update_vertex(tile)
+            for s in self.neighbors(tile):
+                self.update_vertex(s)
+        self.changes_seen = len(changes)
+
+    def path(self, start):
+        """Camino desde start hasta el objetivo (sin incluir start), [] si no hay."""
+        if start != self.start:
+            self.km += self.heuristic(self.last, start)
+            self.last = start
+            self.start = start
+
+        self._apply_changes()
+        self.compute_shortest_path()
+
+        path = deque()
+        current = start
+        if self.g.get(current, INF) == INF and current != self.goal:
+            return path
+
+        seen = {current}
+        while current != self.goal:
+            best, best_cost = None, INF
+            for s in self.neighbors(current):
+                c = self.cost(current, s) + self.g.get(s, INF)
+                if c < best_cost:
+                    best, best_cost = s, c
+            if best is None or best in seen:
+                return deque()
+            seen.add(best)
+            path.append(best)
+            current = best
+        return path
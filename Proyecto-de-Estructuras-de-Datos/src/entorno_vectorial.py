@@ -0,0 +1,389 @@
+"""
+Courier Quest - Entorno vectorial para entrenar repartidores
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Requiere numpy ("pip install numpy").
+
+Uso (desde la carpeta del proyecto), entrena una política y la guarda
+en data/politica.npz para la dificultad "Entrenada":
+    python src/entorno_vectorial.py --entornos 64 --iteraciones 200
+"""
+
+import argparse
+import numpy as np
+from city import City
+from order import OrderManager
+from weather import Weather, WEATHER_MULTIPLIERS
+from simulacion import DURATION, INICIO_JORNADA
+from CPUPlayer import RECUPERACION, RECUPERACION_PASIVA
+from player import PESO_MAXIMO
+
+ACCIONES = ("stay", "up", "down", "left", "right", "interact")
+DESPLAZAMIENTOS = np.array([(0, 0), (0, -1), (0, 1), (-1, 0), (1, 0), (0, 0)], dtype=np.int64)
+INTERACT = 5
+
+WAITING, PICKED, DELIVERED, EXPIRED, PENDING = 0, 1, 2, 3, 4
+
+CONDICIONES = tuple(WEATHER_MULTIPLIERS)
+
+# Canales del mapa: bloqueado, peso de superficie, repartidor, pickups en espera, dropoffs propios
+CANALES = 5
+# Estado: resistencia, reputación, peso, tiempo, multiplicador de clima y el clima en one-hot
+ESTADO = 5 + len(CONDICIONES)
+
+POLITICA_FILE = "data/politica.npz"
+# Segundos entre decisiones de CPUPlayer_Entrenado: un step del entorno con reglas de CPU
+PASO_CPU = 1.5
+
+
+def mapa_estatico(city):
+    """Canales que no cambian durante la partida: bloqueado y peso de superficie."""
+    mapa = np.zeros((2, city.height, city.width), dtype=np.float32)
+    forma = (city.height, city.width)
+    codes = np.frombuffer(bytes(city.codes), dtype=np.uint8).reshape(forma)
+    mapa[0] = np.frombuffer(bytes(city.blocked), dtype=np.uint8).reshape(forma)
+    mapa[1] = np.array(city.surface_by_code, dtype=np.float32)[codes]
+    return mapa
+
+
+def vector_estado(resistencia, reputacion, peso, tiempo, condicion):
+    """Arma el vector de estado de un repartidor (mismo orden que el entorno)."""
+    estado = np.zeros(ESTADO, dtype=np.float32)
+    estado[0] = resistencia / 100
+    estado[1] = reputacion / 100
+    estado[2] = peso / 10
+    estado[3] = tiempo / DURATION
+    estado[4] = WEATHER_MULTIPLIERS.get(condicion, 1.0)
+    if condicion in CONDICIONES:
+        estado[5 + CONDICIONES.index(condicion)] = 1.0
+    return estado
+
+
+class EntornoVectorial:
+    """N partidas independientes del repartidor avanzando en un solo step.
+
+    Todo el estado vive en arreglos de numpy con la partida como primer eje.
+    Las reglas son las de Simulacion para el jugador (sin CPU rival): cada
+    step aplica una acción de ACCIONES y avanza dt segundos. Las partidas
+    que terminan se reinician solas y su resultado queda en info.
+
+    Con cpu=True las reglas son las de CPUPlayer_Entrenado, la que usa la
+    política entrenada: un step es una decisión (PASO_CPU segundos), el peso
+    no cambia el consumo, se recupera con RECUPERACION_PASIVA por segundo
+    quieto pasados 3 s y al agotarse descansa (con RECUPERACION) hasta
+    llegar a 100 sin hacer caso a las acciones.
+    """
+
+    def __init__(self, num_envs, dt=0.5, max_pedidos=None, inicio_aleatorio=False, cpu=False,
+                 city_file="data/Info_de_ciudad.json",
+                 orders_file="data/Pedidos.json",
+                 weather_file="data/clima.json"):
+        self.num_envs = num_envs
+        self.cpu = cpu
+        self.dt = PASO_CPU if cpu else dt
+        self.max_pedidos = max_pedidos
+        self.inicio_aleatorio = inicio_aleatorio
+
+        city = City(city_file)
+        self.width = city.width
+        self.height = city.height
+        self.goal = city.goal
+        self.estatico = mapa_estatico(city)
+        self.bloqueado = self.estatico[0] > 0
+        self.superficie = self.estatico[1]
+        self.libres = np.argwhere(~self.bloqueado)[:, ::-1]
+
+        orders = OrderManager(orders_file).orders
+        self.order_ids = [o.id for o in orders]
+        self.pickup = np.array([o.pickup for o in orders], dtype=np.int64).reshape(-1, 2)
+        self.dropoff = np.array([o.dropoff for o in orders], dtype=np.int64).reshape(-1, 2)
+        self.payout = np.array([o.payout for o in orders], dtype=np.float64)
+        self.peso_pedido = np.array([o.weight for o in orders], dtype=np.float64)
+        self.deadline = np.array([(o.deadline - INICIO_JORNADA).total_seconds() for o in orders],
+                                 dtype=np.float64)
+        self.release = np.array([o.release_time for o in orders], dtype=np.float64)
+
+        bursts = Weather(weather_file).bursts
+        self.burst_duracion = np.array([b["duration_sec"] for b in bursts], dtype=np.float64)
+        self.burst_mult = np.array([WEATHER_MULTIPLIERS.get(b["condition"], 1.0) for b in bursts],
+                                   dtype=np.float64)
+        self.burst_cond = np.array([CONDICIONES.index(b["condition"])
+                                    if b["condition"] in CONDICIONES else -1 for b in bursts],
+                                   dtype=np.int64)
+
+        n, m = num_envs, len(orders)
+        self.pos = np.zeros((n, 2), dtype=np.int64)
+        self.resistencia = np.zeros(n)
+        self.reputacion = np.zeros(n)
+        self.peso = np.zeros(n)
+        self.money = np.zeros(n)
+        self.time = np.zeros(n)
+        self.time_still = np.zeros(n)
+        self.descansando = np.zeros(n, dtype=bool)
+        self.entregas = np.zeros(n, dtype=np.int64)
+        self.vencidos = np.zeros(n, dtype=np.int64)
+        self.burst_index = np.zeros(n, dtype=np.int64)
+        self.burst_start = np.zeros(n)
+        self.status = np.zeros((n, m), dtype=np.int8)
+
+        self.rng = np.random.default_rng()
+
+    def reset(self, seed=None):
+        """Reinicia todas las partidas y devuelve la observación inicial."""
+        self.rng = np.random.default_rng(seed)
+        self._reiniciar(np.ones(self.num_envs, dtype=bool))
+        return self.observar()
+
+    def _reiniciar(self, mask):
+        """Vuelve al estado inicial las partidas marcadas en mask."""
+        if self.inicio_aleatorio:
+            elegidos = self.rng.integers(len(self.libres), size=int(mask.sum()))
+            self.pos[mask] = self.libres[elegidos]
+        else:
+            self.pos[mask] = (1, 1)
+        self.resistencia[mask] = 100
+        self.reputacion[mask] = 70
+        self.peso[mask] = 0
+        self.money[mask] = 0
+        self.time[mask] = 0
+        self.time_still[mask] = 0
+        self.descansando[mask] = False
+        self.entregas[mask] = 0
+        self.vencidos[mask] = 0
+        self.burst_index[mask] = 0
+        self.burst_start[mask] = 0
+        self.status[mask] = np.where(self.release > 0, PENDING, WAITING)
+
+    def step(self, actions):
+        """Aplica una acción por partida.
+
+        Devuelve (observaciones, recompensas, terminadas, info); la recompensa
+        es el dinero ganado en el step.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        recompensa = np.zeros(self.num_envs)
+
+        moving = (actions >= 1) & (actions <= 4)
+        if self.cpu:
+            # Descansando no actúa; una acción de movimiento cuenta aunque choque
+            moving &= ~self.descansando
+            self.time_still[moving] = 0.0
+            self._mover(moving, DESPLAZAMIENTOS[actions])
+            recompensa += self._interactuar((actions == INTERACT) & ~self.descansando)
+        else:
+            self._mover(moving & (self.resistencia > 0), DESPLAZAMIENTOS[actions])
+            recompensa += self._interactuar(actions == INTERACT)
+
+        por_tiempo = self.time >= DURATION
+        despedido = ~por_tiempo & (self.reputacion <= 20)
+        victoria = ~por_tiempo & ~despedido & (self.money >= self.goal)
+        terminadas = por_tiempo | despedido | victoria
+
+        activas = ~terminadas
+        self._avanzar(activas, moving)
+
+        info = {
+            "money": self.money.copy(),
+            "entregas": self.entregas.copy(),
+            "vencidos": self.vencidos.copy(),
+            "victoria": victoria,
+            "score": np.where(victoria,
+                              self.money + np.maximum(0, DURATION - self.time.astype(np.int64)), 0),
+        }
+        if terminadas.any():
+            self._reiniciar(terminadas)
+
+        return self.observar(), recompensa, terminadas, info
+
+    def _mover(self, mask, delta):
+        """Movimiento de Player.mover para las partidas marcadas."""
+        nuevo = self.pos + delta
+        x, y = nuevo[:, 0], nuevo[:, 1]
+        dentro = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        libre = ~self.bloqueado[np.clip(y, 0, self.height - 1), np.clip(x, 0, self.width - 1)]
+        ok = mask & dentro & libre
+
+        self.pos[ok] = nuevo[ok]
+        if self.cpu:
+            consumo = np.full(self.num_envs, 0.5)
+        else:
+            consumo = 0.5 + 0.2 * np.maximum(self.peso - 3, 0)
+        consumo /= self.burst_mult[self.burst_index]
+        consumo /= self.superficie[self.pos[:, 1], self.pos[:, 0]]
+        self.resistencia[ok] -= consumo[ok]
+        np.maximum(self.resistencia, 0, out=self.resistencia)
+        self.time_still[ok] = 0.0
+        if self.cpu:
+            self.descansando |= self.resistencia <= 0
+
+    def _interactuar(self, mask):
+        """Recoge o entrega el primer pedido de la casilla, como get_order_at."""
+        en_pickup = (self.status == WAITING) & np.all(
+            self.pickup[None, :, :] == self.pos[:, None, :], axis=2)
+        en_dropoff = (self.status == PICKED) & np.all(
+            self.dropoff[None, :, :] == self.pos[:, None, :], axis=2)
+        aqui = en_pickup | en_dropoff
+        mask = mask & aqui.any(axis=1)
+        recompensa = np.zeros(self.num_envs)
+        if not mask.any():
+            return recompensa
+
+        envs = np.nonzero(mask)[0]
+        primero = aqui[envs].argmax(axis=1)
+        recoger = en_pickup[envs, primero]
+        recoger &= self.peso[envs] + self.peso_pedido[primero] <= PESO_MAXIMO
+        if self.max_pedidos is not None:
+            llevados = (self.status[envs] == PICKED).sum(axis=1)
+            recoger &= llevados < self.max_pedidos
+
+        e, o = envs[recoger], primero[recoger]
+        self.status[e, o] = PICKED
+        self.peso[e] += self.peso_pedido[o]
+
+        entregar = ~en_pickup[envs, primero]
+        e, o = envs[entregar], primero[entregar]
+        self.status[e, o] = DELIVERED
+        self.peso[e] -= self.peso_pedido[o]
+        self.reputacion[e] = np.minimum(self.reputacion[e] + 3, 100)
+        self.money[e] += self.payout[o]
+        self.entregas[e] += 1
+        recompensa[e] = self.payout[o]
+        return recompensa
+
+    def _avanzar(self, mask, moving):
+        """Tiempo, recuperación, clima, liberaciones y vencimientos (Simulacion.update)."""
+        self.time[mask] += self.dt
+
+        if self.cpu:
+            self._recuperar_cpu(mask)
+        else:
+            quietos = mask & ~moving
+            self.time_still[quietos] += self.dt
+            recupera = quietos & (self.time_still >= 3.0) & (self.resistencia < 100)
+            self.resistencia[recupera] += 5 * self.dt
+            np.minimum(self.resistencia, 100, out=self.resistencia)
+
+        cambia = mask & (self.time - self.burst_start >= self.burst_duracion[self.burst_index])
+        self.burst_index[cambia] = (self.burst_index[cambia] + 1) % len(self.burst_duracion)
+        self.burst_start[cambia] = self.time[cambia]
+
+        libera = mask[:, None] & (self.status == PENDING) & (self.time[:, None] >= self.release[None, :])
+        self.status[libera] = WAITING
+
+        segundos = self.time.astype(np.int64)[:, None]
+        vence = mask[:, None] & (self.status == PICKED) & (segundos > self.deadline[None, :])
+        if vence.any():
+            self.status[vence] = EXPIRED
+            cuantos = vence.sum(axis=1)
+            self.vencidos += cuantos
+            self.reputacion = np.maximum(self.reputacion - 6 * cuantos, 0)
+
+    def _recuperar_cpu(self, mask):
+        """CPUPlayer_Entrenado.recuperar en el step: cuentan los segundos quieto pasados los 3."""
+        antes = self.time_still[mask]
+        self.time_still[mask] += self.dt
+        segundos = np.maximum(self.time_still[mask] - np.maximum(antes, 3.0), 0)
+        ritmo = np.where(self.descansando[mask], RECUPERACION, RECUPERACION_PASIVA)
+        self.resistencia[mask] = np.minimum(self.resistencia[mask] + ritmo * segundos, 100)
+        self.descansando &= self.resistencia < 100
+
+    def observar(self):
+        """Observación batched: {"mapa": (N, CANALES, H, W), "estado": (N, ESTADO)}."""
+        n = self.num_envs
+        mapa = np.zeros((n, CANALES, self.height, self.width), dtype=np.float32)
+        mapa[:, :2] = self.estatico
+        envs = np.arange(n)
+        mapa[envs, 2, self.pos[:, 1], self.pos[:, 0]] = 1.0
+
+        e, o = np.nonzero(self.status == WAITING)
+        np.add.at(mapa, (e, 3, self.pickup[o, 1], self.pickup[o, 0]), 1.0)
+        e, o = np.nonzero(self.status == PICKED)
+        np.add.at(mapa, (e, 4, self.dropoff[o, 1], self.dropoff[o, 0]), 1.0)
+
+        estado = np.zeros((n, ESTADO), dtype=np.float32)
+        estado[:, 0] = self.resistencia / 100
+        estado[:, 1] = self.reputacion / 100
+        estado[:, 2] = self.peso / 10
+        estado[:, 3] = self.time / DURATION
+        estado[:, 4] = self.burst_mult[self.burst_index]
+        cond = self.burst_cond[self.burst_index]
+        conocidas = cond >= 0
+        estado[envs[conocidas], 5 + cond[conocidas]] = 1.0
+
+        return {"mapa": mapa, "estado": estado}
+
+
+class PoliticaLineal:
+    """Política lineal sobre la observación aplanada; elige la acción de mayor puntaje."""
+
+    def __init__(self, pesos, sesgo):
+        self.pesos = pesos
+        self.sesgo = sesgo
+
+    @classmethod
+    def nueva(cls, width, height, rng=None):
+        """Política inicial con pesos pequeños al azar."""
+        rng = rng or np.random.default_rng()
+        dim = CANALES * width * height + ESTADO
+        return cls(rng.normal(0, 0.01, (dim, len(ACCIONES))), np.zeros(len(ACCIONES)))
+
+    @classmethod
+    def cargar(cls, path=POLITICA_FILE):
+        with np.load(path) as data:
+            return cls(data["pesos"], data["sesgo"])
+
+    def guardar(self, path=POLITICA_FILE):
+        np.savez(path, pesos=self.pesos, sesgo=self.sesgo)
+
+    def actuar(self, obs):
+        """Acción por partida para una observación batched."""
+        n = obs["estado"].shape[0]
+        x = np.concatenate([obs["mapa"].reshape(n, -1), obs["estado"]], axis=1)
+        return (x @ self.pesos + self.sesgo).argmax(axis=1)
+
+
+def evaluar(politica, entorno, pasos, seed=None):
+    """Dinero promedio por partida terminada (o en curso al final) durante pasos steps."""
+    obs = entorno.reset(seed)
+    ganado = []
+    for _ in range(pasos):
+        obs, _, terminadas, info = entorno.step(politica.actuar(obs))
+        ganado.extend(info["money"][terminadas])
+    if not ganado:
+        ganado = entorno.money
+    return float(np.mean(ganado))
+
+
+def entrenar(entorno, iteraciones, pasos, sigma=0.02, seed=None):
+    """Búsqueda aleatoria (hill climbing) sobre los pesos de una PoliticaLineal."""
+    rng = np.random.default_rng(seed)
+    mejor = PoliticaLineal.nueva(entorno.width, entorno.height, rng)
+    mejor_valor = evaluar(mejor, entorno, pasos, seed)
+    for i in range(iteraciones):
+        candidata = PoliticaLineal(mejor.pesos + rng.normal(0, sigma, mejor.pesos.shape),
+                                   mejor.sesgo + rng.normal(0, sigma, mejor.sesgo.shape))
+        valor = evaluar(candidata, entorno, pasos, seed)
+        if valor >= mejor_valor:
+            mejor, mejor_valor = candidata, valor
+        print(f"iteración {i + 1}: {valor:.1f} (mejor {mejor_valor:.1f})")
+    return mejor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrena la política de la dificultad Entrenada.")
+    parser.add_argument("--entornos", type=int, default=64)
+    parser.add_argument("--iteraciones", type=int, default=100)
+    parser.add_argument("--pasos", type=int, default=round(DURATION / PASO_CPU))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--salida", default=POLITICA_FILE)
+    args = parser.parse_args(argv)
+
+    # Se entrena con las reglas de la CPU que usa la política (un pedido a la vez).
+    entorno = EntornoVectorial(args.entornos, max_pedidos=1, inicio_aleatorio=True, cpu=True)
+    politica = entrenar(entorno, args.iteraciones, args.pasos, seed=args.seed)
+    politica.guardar(args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Courier Quest - Línea de tiempo de eventos de pedidos
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import heapq
+
+LIBERAR = "release"
+VENCER = "deadline"
+
+
+class Cronograma:
+    """Eventos de pedidos ordenados en un min-heap por segundo de simulación.
+
+    Simulacion.update saca solo los eventos que ya ocurrieron, así un cuadro
+    sin eventos cuesta O(1) sin importar cuántos pedidos haya, y cada evento
+    cuesta O(log n).
+    """
+
+    def __init__(self):
+        self.heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def agregar(self, segundos, tipo, order):
+        """Programa un evento; a igual segundo salen en el orden en que se agregaron."""
+        heapq.heappush(self.heap, (segundos, self._seq, tipo, order))
+        self._seq += 1
+
+    def proximo(self):
+        """Segundo del siguiente evento, o None si no quedan."""
+        return self.heap[0][0] if self.heap else None
+
+    def instantanea(self):
+        """Copia de los eventos pendientes, para volver a este punto con restaurar."""
+        return list(self.heap), self._seq
+
+    def restaurar(self, instantanea):
+        """Vuelve a los eventos de instantanea() reusando la misma lista."""
+        heap, self._seq = instantanea
+        self.heap[:] = heap
+
+    def descartar_hasta(self, ahora):
+        """Saca sin devolver los eventos con segundo <= ahora (ya ocurridos)."""
+        for _ in self.ocurridos(ahora):
+            pass
+
+    def ocurridos(self, ahora):
+        """Saca y devuelve (tipo, pedido) de los eventos con segundo <= ahora."""
+        heap = self.heap
+        while heap and heap[0][0] <= ahora:
+            _, _, tipo, order = heapq.heappop(heap)
+            yield tipo, order
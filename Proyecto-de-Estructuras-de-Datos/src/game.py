@@ -5,68 +5,123 @@ Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
 
 import pygame
-from city import City
-from player import Player
-from order import OrderManager
-from weather import Weather
-from datetime import datetime, timedelta
+from datetime import datetime
 from CPUPlayer import CPUPlayer
-from CPUPlayer_medium import CPUPlayer_Medium
-from CPUPlayer_dificil import CPUPlayer_Dificil
+from simulacion import Simulacion
+from compositor import Compositor
+from camara import Camara
+from recursos import REGISTRO
+import partida_guardada
+from textos import CacheTextos
 import json
 import os
+import time
 TILE_SIZE = 40
 FPS = 60
+# La simulación avanza siempre en pasos fijos, sin importar los cuadros por segundo
+PASO = 1 / FPS
+# Tiempo real máximo que se recupera en un cuadro (p. ej. tras arrastrar la ventana)
+MAX_CUADRO = 0.25
+# Velocidades normales ([ y ]) y de turbo (T); en turbo se dibuja un cuadro cada varios pasos
+ESCALAS = (0.25, 0.5, 1.0, 2.0, 4.0)
+TURBOS = (10, 25, 50, 100)
 HUD_ESTADISTICAS = 120   
-DURATION= 15 * 60
+# Tamaño máximo de la vista del mapa; los mapas más grandes se recorren con la cámara
+ANCHO_VISTA_MAX = 800
+ALTO_VISTA_MAX = 600
+PARTIDA_FILE = "data/partida.sav"
+# Segundos reales entre guardados automáticos (en turbo pasan muchos segundos de juego)
+AUTOGUARDADO = 5.0
 
 
 class Game:
     """Clase que maneja el bucle principal del juego."""
 
-    def __init__(self):
+    def __init__(self, cpu_class=CPUPlayer):
         pygame.init()
 
-        self.city = City()  
+        self.sim = Simulacion(cpu_class)
+        self.city = self.sim.city
 
+        self.ancho_vista = min(self.city.width * TILE_SIZE, ANCHO_VISTA_MAX)
+        self.alto_vista = min(self.city.height * TILE_SIZE, ALTO_VISTA_MAX)
         self.screen = pygame.display.set_mode(
-            (self.city.width * TILE_SIZE, self.city.height * TILE_SIZE + HUD_ESTADISTICAS)
+            (self.ancho_vista, self.alto_vista + HUD_ESTADISTICAS)
         )
         pygame.display.set_caption("Courier Quest")
 
-        self.time=0.0
-        self.start_time = datetime(2025,9,1,6,0,0)
-
         self.clock = pygame.time.Clock()
         self.running = True
-
-        self.player = Player(start_x=1, start_y=1)
-
-        self.orders = OrderManager()
-
-        self.money = 0
-
-        self.weather = Weather("data/clima.json")
+        self.escala = ESCALAS.index(1.0)
+        self.turbo = None
+        self.acumulado = 0.0
 
         self.fin= False
 
-        self.score = 0
-
-        self.cpu = CPUPlayer(start_x=1, start_y=1)
+        self.acciones = []
+        self.guardado = None
+        self.ultimo_guardado = time.monotonic()
 
+        # Compartidas entre partidas; el selector ya las precargó
+        self.texturas = REGISTRO.texturas(self.sim.cpu.image_path)
 
+        self.textos = CacheTextos()
+        self.camara = Camara(self.city, self.ancho_vista, self.alto_vista, TILE_SIZE)
+        self.compositor = Compositor(self.city, self.texturas, self.camara)
 
     def run(self):
-        """Ejecuta el bucle principal del juego."""
+        """Ejecuta el bucle principal del juego.
+
+        Cada cuadro suma al acumulado el tiempo real transcurrido por la
+        velocidad actual y la simulación avanza en pasos de PASO segundos
+        hasta gastarlo; después se dibuja una vez el último estado. Así la
+        partida es la misma con 30 o con 144 cuadros por segundo.
+        """
         while self.running:
-            dt = self.clock.get_time() / 1000.0
+            real = self.clock.tick(FPS) / 1000.0
             self.handle_events()
+            self.avanzar(min(real, MAX_CUADRO))
             self.render()
-            self.update(dt)
-            self.clock.tick(FPS)
 
         pygame.quit()
 
+    def velocidad(self):
+        """Segundos de simulación por segundo real."""
+        return self.turbo if self.turbo is not None else ESCALAS[self.escala]
+
+    def avanzar(self, real):
+        """Corre los pasos fijos que tocan por real segundos; devuelve cuántos.
+
+        Si los pasos no caben en un cuadro (turbo en una máquina lenta) se
+        descarta lo que falta en vez de arrastrarlo: la partida va más lenta
+        pero cada paso sigue siendo de PASO segundos.
+        """
+        self.acumulado += real * self.velocidad()
+        limite = time.perf_counter() + 1 / FPS
+        pasos = 0
+        while self.acumulado >= PASO and not self.fin:
+            self.update(PASO)
+            self.acumulado -= PASO
+            pasos += 1
+            if time.perf_counter() >= limite:
+                self.acumulado = min(self.acumulado, PASO)
+                break
+        if self.fin:
+            self.acumulado = 0.0
+        return pasos
+
+    def cambiar_velocidad(self, escala=None, turbo=False):
+        """Sube/baja la velocidad normal (escala = +1/-1) o pasa al siguiente turbo."""
+        if turbo:
+            siguiente = TURBOS.index(self.turbo) + 1 if self.turbo is not None else 0
+            self.turbo = TURBOS[siguiente] if siguiente < len(TURBOS) else None
+        else:
+            self.turbo = None
+            self.escala = max(0, min(len(ESCALAS) - 1, self.escala + escala))
+        velocidad = self.velocidad()
+        titulo = "Courier Quest" if velocidad == 1.0 else f"Courier Quest (x{velocidad:g})"
+        pygame.display.set_caption(titulo)
+
     def handle_events(self):
         """Procesa eventos de teclado y salida."""
         for event in pygame.event.get():
@@ -76,7 +131,7 @@ class Game:
             if self.fin:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN:
-                        self.__init__()
+                        self.reset()
                     elif event.key == pygame.K_ESCAPE:
                         self.running = False
                 return
@@ -85,143 +140,161 @@ class Game:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
-                    self.player.mover(0, -1, self.city, clima = self.weather.get_current_condition())
+                    self.acciones.append("up")
                 elif event.key == pygame.K_DOWN:
-                    self.player.mover(0, 1, self.city, clima = self.weather.get_current_condition())
+                    self.acciones.append("down")
                 elif event.key == pygame.K_LEFT:
-                    self.player.mover(-1, 0, self.city, clima = self.weather.get_current_condition())
+                    self.acciones.append("left")
                 elif event.key == pygame.K_RIGHT:
-                    self.player.mover(1, 0, self.city, clima = self.weather.get_current_condition())
+                    self.acciones.append("right")
                 elif event.key == pygame.K_e:
-                    self.interact()
-
-    def interact(self):
-        """Interacción del jugador con pickups o dropoffs."""
-        order = self.orders.get_order_at(self.player.x, self.player.y)
-        if not order:
+                    self.acciones.append("interact")
+                elif event.key == pygame.K_F5:
+                    self.guardar_partida()
+                elif event.key == pygame.K_F9:
+                    self.cargar_partida()
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self.camara.cambiar_zoom(1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.camara.cambiar_zoom(-1)
+                elif event.key == pygame.K_RIGHTBRACKET:
+                    self.cambiar_velocidad(1)
+                elif event.key == pygame.K_LEFTBRACKET:
+                    self.cambiar_velocidad(-1)
+                elif event.key == pygame.K_t:
+                    self.cambiar_velocidad(turbo=True)
+
+    def reset(self):
+        """Empieza otra partida sin recargar nada.
+
+        La simulación restaura su estado inicial en el lugar y se reusan la
+        ventana, las texturas, la cámara y las capas del compositor.
+        """
+        self.sim.reset()
+        self.fin = False
+        self.acciones = []
+        self.acumulado = 0.0
+        self.ultimo_guardado = time.monotonic()
+        self.compositor.invalidar()
+
+    def guardar_partida(self):
+        """Guarda la partida en PARTIDA_FILE; la escritura va en otro hilo."""
+        self.guardado = partida_guardada.guardar_en_segundo_plano(
+            self.sim, PARTIDA_FILE, self.guardado)
+        self.ultimo_guardado = time.monotonic()
+
+    def cargar_partida(self):
+        """Reanuda la partida de PARTIDA_FILE (si existe y es de esta dificultad)."""
+        if self.guardado is not None:
+            self.guardado.join()
+        try:
+            partida_guardada.cargar(self.sim, PARTIDA_FILE)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"[Partida] No se pudo cargar: {e}")
             return
-
-        if order.status == "waiting":
-            accepted = self.orders.accept_order(order.id)
-            if accepted:
-                self.player.peso_total += order.weight
-
-        elif order.status == "picked":
-            delivered = self.orders.deliver_order(order.id)
-            if delivered:
-                self.player.peso_total -= order.weight
-                self.player.reputacion += 3
-                if self.player.reputacion > 100:
-                    self.player.reputacion = 100
-                self.money += order.payout
+        self.ultimo_guardado = time.monotonic()
+        self.acciones = []
+        self.compositor.invalidar()
 
     def render(self):
-        """Dibuja la escena en pantalla."""
-        self.screen.fill((0, 0, 0))
+        """Dibuja la escena y actualiza solo las partes de la pantalla que cambiaron."""
         if self.fin:
-            self.draw_fin()
-        else:
-            self.city.draw(self.screen)
-
-            self.orders.draw_orders(self.screen)
-
-            self.player.draw(self.screen)
-
-            self.draw_hud()
+            # La pantalla final se dibuja una vez en trigger_fin
+            return
 
-        self.cpu.draw(self.screen)
-        pygame.display.flip()
+        player = self.sim.player
+        self.camara.seguir(player.x, player.y)
+        sprites = [
+            ("jugador", (player.x, player.y)),
+            ("cpu", (self.sim.cpu.x, self.sim.cpu.y)),
+        ]
+        dirty = self.compositor.dibujar(self.screen, self.sim.orders, sprites)
+        dirty.append(self.draw_hud())
+        pygame.display.update(dirty)
 
     def draw_hud(self):
-        """Dibuja el HUD en la parte inferior de la pantalla."""
-        hud_y = self.city.height * TILE_SIZE + 10
-        pygame.draw.rect(self.screen, (50, 50, 50),
-                         (0, self.city.height * TILE_SIZE,
-                          self.city.width * TILE_SIZE, HUD_ESTADISTICAS))
+        """Dibuja el HUD en la parte inferior de la pantalla y devuelve su rectángulo."""
+        hud_y = self.alto_vista + 10
+        hud_rect = pygame.Rect(0, self.alto_vista, self.ancho_vista, HUD_ESTADISTICAS)
+        pygame.draw.rect(self.screen, (50, 50, 50), hud_rect)
 
-        self.player.draw_stats(self.screen, offset_y=hud_y)
+        self.draw_player_stats(offset_y=hud_y)
 
-        font = pygame.font.SysFont(None, 28)
-        money_text = font.render(f"Ingresos: {self.money}", True, (255, 255, 0))
+        money_text = self.textos.render(28, f"Ingresos: {self.sim.money}", (255, 255, 0))
         self.screen.blit(money_text, (250, hud_y))
 
-        goal_text = font.render(f"Meta: {self.city.goal}", True, (0, 255, 255))
+        goal_text = self.textos.render(28, f"Meta: {self.city.goal}", (0, 255, 255))
         self.screen.blit(goal_text, (250, hud_y + 30))
 
 
-        font_small = pygame.font.SysFont(None, 22)
         inv_x = 500  
         inv_y = hud_y + 5
-        inv_text = font_small.render("Inventario:", True, (255, 255, 255))
+        inv_text = self.textos.render(22, "Inventario:", (255, 255, 255))
         self.screen.blit(inv_text, (inv_x, inv_y))
 
-        max_width = self.city.width * TILE_SIZE - inv_x - 20
+        max_width = self.ancho_vista - inv_x - 20
 
-        for i, order in enumerate(self.orders.list_inventory()[:3]):
+        for i, order in enumerate(self.sim.orders.list_inventory()[:3]):
             txt = f"{order.id} Ubicacion: {order.dropoff} (peso {order.weight})"
-            text_surface = font_small.render(txt, True, (200, 200, 200))
-
-            
-            if text_surface.get_width() > max_width:
-                while text_surface.get_width() > max_width and len(txt) > 5:
-                    txt = txt[:-1]
-                    text_surface = font_small.render(txt + "...", True, (200, 200, 200))
-
+            text_surface = self.textos.truncar(22, txt, (200, 200, 200), max_width)
             self.screen.blit(text_surface, (inv_x, inv_y + 20 + i * 20))
 
-        current_time = self.start_time + timedelta(seconds=int(self.time))
-        time_text=font.render(f"Hora: {current_time.strftime('%H:%M:%S')}", True, (255, 255, 255))
+        current_time = self.sim.reloj()
+        time_text=self.textos.render(28, f"Hora: {current_time.strftime('%H:%M:%S')}", (255, 255, 255))
         self.screen.blit(time_text,(250,hud_y+60))
 
-        clima_text = font.render(f"Clima: {self.weather.get_current_condition()}",
-                                 True, (200, 200, 255))
+        clima_text = self.textos.render(28, f"Clima: {self.sim.weather.get_current_condition()}",
+                                 (200, 200, 255))
         self.screen.blit(clima_text, (500, hud_y + 70))
+        return hud_rect
+
+    def draw_player_stats(self, offset_y=0):
+        """Dibuja barras de resistencia y reputación en el HUD."""
+        player = self.sim.player
+
+        res_bar_width = 200
+        res_ratio = player.resistencia / 100
+        pygame.draw.rect(self.screen, (150, 150, 150),
+            (10, offset_y, res_bar_width, 20))
+        pygame.draw.rect(self.screen, (0, 200, 0),
+            (10, offset_y, res_bar_width * res_ratio, 20))
+        res_text = self.textos.render(24, f"Resistencia: {int(player.resistencia)}",
+            (255, 255, 255))
+        self.screen.blit(res_text, (10, offset_y + 25))
+
+
+        rep_bar_width = 200
+        rep_ratio = player.reputacion / 100
+        pygame.draw.rect(self.screen, (150, 150, 150),
+            (10, offset_y + 60, rep_bar_width, 20))
+        pygame.draw.rect(self.screen, (0, 0, 200),
+            (10, offset_y + 60, rep_bar_width * rep_ratio, 20))
+        rep_text = self.textos.render(24, f"Reputación: {int(player.reputacion)}",
+            (255, 255, 255))
+        self.screen.blit(rep_text, (10, offset_y + 85))
 
     def update(self, dt):
-        """Actualiza la lógica del juego."""
-        if self.time >= DURATION:
-            self.trigger_fin("Tiempo agotado. No alcanzaste la meta.", victory=False)
-            return
-
-
-        if self.player.reputacion <= 20:
-            self.trigger_fin("Tu reputación cayó demasiado. ¡Has sido despedido!", victory=False)
-            return
-
-        if self.money >= self.city.goal:
-            self.trigger_fin("¡Has alcanzado la meta de ingresos!", victory=True)
+        """Avanza la simulación con las acciones acumuladas del teclado."""
+        if self.fin:
             return
-
-        self.time += dt
-
-        current_time = self.start_time + timedelta(seconds=int(self.time))
-
         keys = pygame.key.get_pressed()
-        if not (keys[pygame.K_UP] or keys[pygame.K_DOWN] or
+        if (keys[pygame.K_UP] or keys[pygame.K_DOWN] or
                 keys[pygame.K_LEFT] or keys[pygame.K_RIGHT]):
-            self.player.recuperar(dt)
+            self.acciones.append("hold")
 
-        self.weather.update(self.time)
+        self.sim.step(self.acciones, dt)
+        self.acciones = []
 
-        for order in list(self.orders.inventory):
-            if order.status == "picked" and current_time > order.deadline:
-                order.status = "expired"
-                self.orders.inventory.remove(order)
-                self.player.reputacion -= 6
-                if self.player.reputacion < 0:
-                    self.player.reputacion = 0
-
-        self.cpu.update(dt,self.city, self.orders, self.weather.get_current_condition())
+        if self.sim.fin:
+            self.trigger_fin(self.sim.motivo, self.sim.victoria)
+        elif time.monotonic() - self.ultimo_guardado >= AUTOGUARDADO:
+            self.guardar_partida()
 
     def trigger_fin(self, reason, victory=False):
         """Detiene el juego y muestra la pantalla de Game Over o Victoria."""
         self.fin = True
-        self.running = False
-
 
         if victory:
-            tiempo_bonus = max(0, DURATION - int (self.time))
-            self.score = self.money + tiempo_bonus
             self.save_score()
 
         self.draw_fin(reason, victory)
@@ -229,22 +302,19 @@ class Game:
     def draw_fin(self, reason, victory=False):
         """Muestra la pantalla final (Game Over o Victoria) con el top 5 de puntajes."""
         self.screen.fill((0, 0, 0))
-        font_big = pygame.font.SysFont(None, 60)
-        font_small = pygame.font.SysFont(None, 30)
-        font_score = pygame.font.SysFont(None, 26)
 
         if victory:
-            title_text = font_big.render("¡Victoria!", True, (0, 255, 0))
-            score_text = font_small.render(
-                f"Tu puntuación final: {self.score}", True, (255, 255, 255))
+            title_text = self.textos.render(60, "¡Victoria!", (0, 255, 0))
+            score_text = self.textos.render(30,
+                f"Tu puntuación final: {self.sim.score}", (255, 255, 255))
         else:
-            title_text = font_big.render("Game Over", True, (255, 0, 0))
-            score_text = font_small.render(reason, True, (255, 255, 255))
+            title_text = self.textos.render(60, "Game Over", (255, 0, 0))
+            score_text = self.textos.render(30, reason, (255, 255, 255))
 
-        self.screen.blit(title_text, (self.city.width * TILE_SIZE // 2 - 120,
-                                  self.city.height * TILE_SIZE // 2 - 150))
-        self.screen.blit(score_text, (self.city.width * TILE_SIZE // 2 - 150,
-                                  self.city.height * TILE_SIZE // 2 - 100))
+        self.screen.blit(title_text, (self.ancho_vista // 2 - 120,
+                                  self.alto_vista // 2 - 150))
+        self.screen.blit(score_text, (self.ancho_vista // 2 - 150,
+                                  self.alto_vista // 2 - 100))
 
         try:
             with open("data/scores.json", "r", encoding="utf-8") as f:
@@ -252,33 +322,26 @@ class Game:
         except (FileNotFoundError, json.JSONDecodeError):
             scores = []
 
-        rank_title = font_small.render("Mejores 5 Puntajes", True, (255, 215, 0))
-        self.screen.blit(rank_title, (self.city.width * TILE_SIZE // 2 - 130,
-                                  self.city.height * TILE_SIZE // 2 - 50))
+        rank_title = self.textos.render(30, "Mejores 5 Puntajes", (255, 215, 0))
+        self.screen.blit(rank_title, (self.ancho_vista // 2 - 130,
+                                  self.alto_vista // 2 - 50))
 
-        y_offset = self.city.height * TILE_SIZE // 2 - 20
+        y_offset = self.alto_vista // 2 - 20
 
         for i, s in enumerate(scores[:5]):
             text = f"{i+1}. {s['player']} — {s['score']} pts ({s['money']}, {s['time_left']}s)"
             color = (255, 255, 255) if i > 0 else (0, 255, 255)  
-            score_line = font_score.render(text, True, color)
-            self.screen.blit(score_line, (self.city.width * TILE_SIZE // 2 - 180, y_offset))
+            score_line = self.textos.render(26, text, color)
+            self.screen.blit(score_line, (self.ancho_vista // 2 - 180, y_offset))
             y_offset += 30
 
 
-        instr_text = font_small.render("Presiona ESC para salir", True, (200, 200, 200))
-        self.screen.blit(instr_text, (self.city.width * TILE_SIZE // 2 - 120, y_offset + 40))
+        instr_text = self.textos.render(30, "ENTER para jugar otra vez, ESC para salir",
+                                        (200, 200, 200))
+        self.screen.blit(instr_text, (self.ancho_vista // 2 - 220, y_offset + 40))
 
         pygame.display.flip()
 
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    waiting = False
-                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    waiting = False
-
     def save_score(self):
         """Guarda el puntaje en un archivo local y mantiene el ranking ordenado."""
         file_path = "data/scores.json"
@@ -295,14 +358,11 @@ class Game:
         else:
             scores = []
 
-        tiempo_total_seg = DURATION
-        tiempo_sobrante = max(0, tiempo_total_seg - int(self.time))
-
         new_score = {
             "player": "Jugador1",
-            "score": self.score,
-            "money": self.money,
-            "time_left": tiempo_sobrante,
+            "score": self.sim.score,
+            "money": self.sim.money,
+            "time_left": self.sim.tiempo_sobrante(),
             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
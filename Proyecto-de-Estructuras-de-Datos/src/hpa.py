@@ -0,0 +1,245 @@
+"""
+Courier Quest - Búsqueda jerárquica de rutas (HPA*) para mapas grandes
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import heapq
+import weakref
+from collections import deque
+
+VECINOS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+ENTRADA_LARGA = 6
+
+_por_ciudad = weakref.WeakKeyDictionary()
+
+
+def para_ciudad(city, cluster_size=10, exacto=False):
+    """Devuelve el HierarchicalPathfinder de la ciudad, construyéndolo una sola vez."""
+    pathfinders = _por_ciudad.setdefault(city, {})
+    key = (cluster_size, exacto)
+    if key not in pathfinders:
+        pathfinders[key] = HierarchicalPathfinder(city, cluster_size, exacto)
+    return pathfinders[key]
+
+
+class HierarchicalPathfinder:
+    """HPA* (Botea, Müller y Schaeffer) sobre la cuadrícula de la ciudad.
+
+    La ciudad se corta en clusters de cluster_size x cluster_size. Al crear
+    el objeto se calculan las entradas entre clusters vecinos y la distancia
+    entre las entradas de cada cluster; una consulta larga hace A* sobre ese
+    grafo abstracto y luego refina cada tramo con un BFS dentro del cluster.
+
+    Cotas del costo de la ruta:
+        exacto=True: cada casilla libre del borde es una entrada y la ruta
+            cuesta lo mismo que la más corta (BFS sobre la cuadrícula).
+        exacto=False: una entrada en el centro de cada tramo libre de borde
+            y dos en los extremos de los tramos de ENTRADA_LARGA o más
+            casillas. El grafo es mucho más chico; la ruta cuesta como
+            máximo la óptima + (cluster_size - 1) por cada borde de cluster
+            que cruza la ruta óptima (cluster_size >= 5), porque cruzar por
+            la entrada más cercana del mismo tramo solo agrega la ida y
+            vuelta a lo largo del tramo.
+    """
+
+    def __init__(self, city, cluster_size=10, exacto=False):
+        self.city = city
+        self.cluster_size = cluster_size
+        self.exacto = exacto
+        self.cols = (city.width + cluster_size - 1) // cluster_size
+        self.rows = (city.height + cluster_size - 1) // cluster_size
+
+        self.borders = {}
+        self.inter = {}
+        self.intra = {}
+        self.changes_seen = len(city.tile_changes)
+
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                if cx + 1 < self.cols:
+                    self._build_border((cx, cy), (cx + 1, cy))
+                if cy + 1 < self.rows:
+                    self._build_border((cx, cy), (cx, cy + 1))
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                self._build_cluster((cx, cy))
+
+    def cluster_of(self, tile):
+        return (tile[0] // self.cluster_size, tile[1] // self.cluster_size)
+
+    def _bounds(self, cluster):
+        """Rectángulo (x0, y0, x1, y1) del cluster, x1/y1 exclusivos."""
+        x0 = cluster[0] * self.cluster_size
+        y0 = cluster[1] * self.cluster_size
+        return (x0, y0, min(x0 + self.cluster_size, self.city.width),
+                min(y0 + self.cluster_size, self.city.height))
+
+    def _build_border(self, c1, c2):
+        """Calcula las transiciones (a en c1, b en c2) del borde entre dos clusters."""
+        for a, b in self.borders.get((c1, c2), []):
+            self.inter[a].discard(b)
+            self.inter[b].discard(a)
+
+        x0, y0, x1, y1 = self._bounds(c1)
+        if c2[0] != c1[0]:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+        blocked = self.city.is_blocked
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and not blocked(*a) and not blocked(*b):
+                run.append((a, b))
+                continue
+            if run:
+                if self.exacto:
+                    transitions.extend(run)
+                elif len(run) < ENTRADA_LARGA:
+                    transitions.append(run[len(run) // 2])
+                else:
+                    transitions.append(run[0])
+                    transitions.append(run[-1])
+                run = []
+
+        self.borders[(c1, c2)] = transitions
+        for a, b in transitions:
+            self.inter.setdefault(a, set()).add(b)
+            self.inter.setdefault(b, set()).add(a)
+
+    def _entrances(self, cluster):
+        """Casillas de entrada que pertenecen al cluster."""
+        cx, cy = cluster
+        entrances = set()
+        for key in (((cx - 1, cy), cluster), (cluster, (cx + 1, cy)),
+                    ((cx, cy - 1), cluster), (cluster, (cx, cy + 1))):
+            for a, b in self.borders.get(key, []):
+                entrances.add(a if self.cluster_of(a) == cluster else b)
+        return entrances
+
+    def _build_cluster(self, cluster):
+        """Distancias entre todas las entradas del cluster (BFS local)."""
+        entrances = self._entrances(cluster)
+        edges = {}
+        for e in entrances:
+            dist, _ = self._local_bfs(e, cluster)
+            edges[e] = {o: dist[o] for o in entrances if o != e and o in dist}
+        self.intra[cluster] = edges
+
+    def _local_bfs(self, start, cluster, goal=None):
+        """BFS sin salir del cluster; devuelve distancias y padres."""
+        x0, y0, x1, y1 = self._bounds(cluster)
+        blocked = self.city.is_blocked
+        dist = {start: 0}
+        parent = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                break
+            x, y = current
+            for dx, dy in VECINOS:
+                nx, ny = x + dx, y + dy
+                if x0 <= nx < x1 and y0 <= ny < y1 and (nx, ny) not in dist and not blocked(nx, ny):
+                    dist[(nx, ny)] = dist[current] + 1
+                    parent[(nx, ny)] = current
+                    queue.append((nx, ny))
+        return dist, parent
+
+    def _local_path(self, start, goal, cluster):
+        """Camino dentro del cluster (sin incluir start)."""
+        _, parent = self._local_bfs(start, cluster, goal)
+        path = []
+        current = goal
+        while current != start:
+            path.append(current)
+            current = parent[current]
+        path.reverse()
+        return path
+
+    def _apply_changes(self):
+        """Reconstruye los bordes y clusters que tocan las casillas cambiadas."""
+        changes = self.city.tile_changes
+        dirty = set()
+        for tile in changes[self.changes_seen:]:
+            cx, cy = self.cluster_of(tile)
+            dirty.add((cx, cy))
+            for n in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+                if 0 <= n[0] < self.cols and 0 <= n[1] < self.rows:
+                    c1, c2 = min(n, (cx, cy)), max(n, (cx, cy))
+                    self._build_border(c1, c2)
+                    dirty.add(n)
+        for cluster in dirty:
+            self._build_cluster(cluster)
+        self.changes_seen = len(changes)
+
+    def _neighbors(self, node):
+        for other, cost in self.intra[self.cluster_of(node)].get(node, {}).items():
+            yield other, cost
+        for other in self.inter.get(node, ()):
+            yield other, 1
+
+    def find_path(self, start, goal):
+        """Ruta de start a goal (sin incluir start), [] si no hay; mismo formato que A*."""
+        self._apply_changes()
+        if start == goal or self.city.is_blocked(*start) or self.city.is_blocked(*goal):
+            return []
+
+        cs, cg = self.cluster_of(start), self.cluster_of(goal)
+        start_dist, _ = self._local_bfs(start, cs)
+        goal_dist, _ = self._local_bfs(goal, cg)
+        start_edges = {e: start_dist[e] for e in self._entrances(cs) if e in start_dist}
+        goal_edges = {e: goal_dist[e] for e in self._entrances(cg) if e in goal_dist}
+
+        direct = start_dist.get(goal) if cs == cg else None
+        nodes = self._abstract_search(start, goal, start_edges, goal_edges, direct)
+        if nodes is None:
+            return []
+
+        path = []
+        for u, v in zip(nodes, nodes[1:]):
+            if self.cluster_of(u) == self.cluster_of(v):
+                path.extend(self._local_path(u, v, self.cluster_of(u)))
+            else:
+                path.append(v)
+        return path
+
+    def _abstract_search(self, start, goal, start_edges, goal_edges, direct):
+        """A* sobre el grafo de entradas con start y goal insertados."""
+        def h(n):
+            return abs(n[0] - goal[0]) + abs(n[1] - goal[1])
+
+        g_score = {start: 0}
+        came_from = {}
+        open_set = [(h(start), start)]
+        while open_set:
+            f, current = heapq.heappop(open_set)
+            if current == goal:
+                break
+            if f - h(current) > g_score[current]:
+                continue
+
+            edges = list(self._neighbors(current))
+            if current == start:
+                edges.extend(start_edges.items())
+                if direct is not None:
+                    edges.append((goal, direct))
+            if current in goal_edges:
+                edges.append((goal, goal_edges[current]))
+
+            for neighbor, cost in edges:
+                tentative = g_score[current] + cost
+                if tentative < g_score.get(neighbor, float("inf")):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (tentative + h(neighbor), neighbor))
+
+        if goal not in g_score:
+            return None
+        nodes = [goal]
+        while nodes[-1] != start:
+            nodes.append(came_from[nodes[-1]])
+        nodes.reverse()
+        return nodes
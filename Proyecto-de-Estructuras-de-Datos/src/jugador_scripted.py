@@ -0,0 +1,85 @@
+"""
+Courier Quest - Jugador con guion fijo para pruebas y torneos
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+from collections import deque
+
+DIRECCIONES = {
+    (0, -1): "up",
+    (0, 1): "down",
+    (-1, 0): "left",
+    (1, 0): "right",
+}
+
+
+class JugadorScripted:
+    """Controla el espacio del jugador humano con una regla simple.
+
+    Entrega lo que lleva en el inventario y si no lleva nada va al pedido
+    en espera más cercano caminando por las calles.
+    """
+
+    def __init__(self, move_delay=0.5):
+        self.move_delay = move_delay
+        self.timer = 0.0
+        self.goal = None
+        self.path = deque()
+        self.descansando = False
+
+    def acciones(self, sim, dt):
+        """Devuelve la lista de acciones para el siguiente step de la simulación."""
+        player = sim.player
+        self.timer += dt
+
+        # Solo sirve interactuar si el pedido está libre (y cabe) o lo lleva el
+        # jugador; en el dropoff de un pedido que lleva la CPU se sigue de largo
+        order = sim.orders.get_order_at(player.x, player.y)
+        if order and ((order.status == "waiting" and player.puede_cargar(order)) or
+                      sim.orders.en_inventario(order)):
+            return ["interact"]
+
+        if player.resistencia <= 10:
+            self.descansando = True
+        if self.descansando:
+            if player.resistencia >= 60:
+                self.descansando = False
+            return []
+
+        if self.timer < self.move_delay:
+            return []
+        self.timer = 0.0
+
+        goal = self.elegir_objetivo(sim)
+        if goal is None:
+            return []
+        if goal != self.goal or not self.path:
+            self.goal = goal
+            self.path = deque(sim.city.path_to((player.x, player.y), goal))
+            if not self.path:
+                return []
+
+        next_x, next_y = self.path.popleft()
+        direction = DIRECCIONES.get((next_x - player.x, next_y - player.y))
+        if direction is None:
+            self.path.clear()
+            return []
+        return [direction]
+
+    def elegir_objetivo(self, sim):
+        """Dropoff del inventario o pickup en espera más cercano caminando."""
+        origin = (sim.player.x, sim.player.y)
+        inventory = sim.orders.list_inventory()
+        if not inventory:
+            order, _ = sim.orders.pickup_mas_cercano(origin)
+            return order.pickup if order else None
+
+        targets = [o.dropoff for o in inventory]
+
+        best, best_dist = None, None
+        for target in targets:
+            dist = sim.city.walking_distance(origin, target)
+            if dist is not None and (best_dist is None or dist < best_dist):
+                best, best_dist = target, dist
+        return best
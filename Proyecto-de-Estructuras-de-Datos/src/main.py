@@ -3,12 +3,16 @@ Courier Quest - Juego de entregas
 EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
-from Cargar_api import fetch_all_data
+from Cargar_api import fetch_all_data, hay_datos_locales, refrescar_en_segundo_plano
 from Selector_de_dificultad import Selector_De_Dificultad
 
 def main():
     """Punto de entrada del juego."""
-    fetch_all_data()
+    # Con datos guardados el juego arranca ya y la descarga corre de fondo
+    if hay_datos_locales():
+        refrescar_en_segundo_plano()
+    else:
+        fetch_all_data()
     
     selector = Selector_De_Dificultad()
     selector.run()
@@ -0,0 +1,238 @@
+"""
+Courier Quest - Formato binario por bloques para mapas grandes
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Estructura del archivo (enteros little-endian):
+    cabecera: MAGIA, versión, tam_chunk, width, height y largo de meta
+    meta: JSON en UTF-8 con legend (en orden de códigos), goal y version
+    relleno hasta ALINEACION bytes
+    chunks: tam_chunk x tam_chunk códigos (un byte por casilla, índice en
+        legend), fila por fila; los chunks van de izquierda a derecha y de
+        arriba hacia abajo y los del borde se rellenan con ceros.
+
+Con tam_chunk = 64 cada chunk ocupa exactamente una página de 4 KiB, así al
+leer por mmap el sistema solo trae a memoria los chunks que se tocan. City
+usa el mapa a través de CapaPorChunks, que copia cada chunk la primera vez
+que se pide una de sus casillas.
+
+Uso (desde la carpeta del proyecto):
+    python src/mapa_binario.py data/Info_de_ciudad.json data/Info_de_ciudad.cqm
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+
+MAGIA = b"CQMB"
+VERSION = 1
+TAM_CHUNK = 64
+ALINEACION = 4096
+CABECERA = struct.Struct("<4sHHIII")
+
+
+def _inicio_chunks(largo_meta):
+    return -(-(CABECERA.size + largo_meta) // ALINEACION) * ALINEACION
+
+
+def escribir(path, width, height, legend, codes, goal=0, version="1.0", tam_chunk=TAM_CHUNK):
+    """Escribe el mapa; codes es el arreglo plano y * width + x de códigos.
+
+    Se escribe en un temporal y se renombra, así un lector nunca ve un
+    archivo a medias.
+    """
+    if len(legend) > 256:
+        raise ValueError("La leyenda tiene más de 256 tipos de casilla.")
+    if len(codes) != width * height:
+        raise ValueError(f"Se esperaban {width * height} casillas y hay {len(codes)}.")
+    meta = json.dumps({"legend": legend, "goal": goal, "version": version},
+                      ensure_ascii=False).encode("utf-8")
+    inicio = _inicio_chunks(len(meta))
+    relleno = bytes(tam_chunk)
+
+    temporal = path + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(CABECERA.pack(MAGIA, VERSION, tam_chunk, width, height, len(meta)))
+        f.write(meta)
+        f.write(bytes(inicio - CABECERA.size - len(meta)))
+        for y0 in range(0, height, tam_chunk):
+            for x0 in range(0, width, tam_chunk):
+                x1 = min(x0 + tam_chunk, width)
+                for y in range(y0, y0 + tam_chunk):
+                    if y < height:
+                        f.write(bytes(codes[y * width + x0:y * width + x1]).ljust(tam_chunk, b"\0"))
+                    else:
+                        f.write(relleno)
+    os.replace(temporal, path)
+
+
+def guardar(city, path, tam_chunk=TAM_CHUNK):
+    """Guarda una City ya cargada en formato binario."""
+    escribir(path, city.width, city.height, city.legend, city.codes, city.goal,
+             tam_chunk=tam_chunk)
+
+
+def convertir(json_file, path, tam_chunk=TAM_CHUNK):
+    """Convierte un mapa JSON (formato de Info_de_ciudad.json) a binario."""
+    with open(json_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    legend = data["legend"]
+    code_of = {symbol: code for code, symbol in enumerate(legend)}
+    codes = bytearray(code_of[symbol] for row in data["tiles"] for symbol in row)
+    escribir(path, data["width"], data["height"], legend, codes, data.get("goal", 0),
+             data.get("version", "1.0"), tam_chunk)
+
+
+class CapaPorChunks:
+    """Arreglo plano (y * width + x) de un byte por casilla, cargado por chunks.
+
+    cargar(cx, cy) devuelve los bytes del chunk (tam_chunk x tam_chunk, fila
+    por fila); se llama la primera vez que se toca una casilla del chunk y
+    desde ahí el chunk vive en un bytearray propio que se puede modificar.
+    Los chunks que nunca se tocan no se leen. Se usa como el bytearray de
+    City.codes y City.blocked (índices, len, iteración, bytes() y translate).
+    """
+
+    def __init__(self, width, height, tam_chunk, cargar):
+        self.width = width
+        self.height = height
+        self.tam_chunk = tam_chunk
+        self.cargar = cargar
+        self.chunks_x = -(-width // tam_chunk)
+        self.chunks = [None] * (self.chunks_x * -(-height // tam_chunk))
+
+    def chunk(self, cx, cy):
+        """bytearray del chunk (cx, cy), leído la primera vez que se pide."""
+        n = cy * self.chunks_x + cx
+        chunk = self.chunks[n]
+        if chunk is None:
+            chunk = bytearray(self.cargar(cx, cy))
+            self.chunks[n] = chunk
+        return chunk
+
+    def cargados(self):
+        """Cantidad de chunks leídos hasta ahora."""
+        return sum(1 for chunk in self.chunks if chunk is not None)
+
+    def _ubicar(self, i):
+        y, x = divmod(i, self.width)
+        c = self.tam_chunk
+        cy, fy = divmod(y, c)
+        cx, fx = divmod(x, c)
+        return self.chunk(cx, cy), fy * c + fx
+
+    def __len__(self):
+        return self.width * self.height
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return bytes(self[j] for j in range(*i.indices(len(self))))
+        if i < 0:
+            i += len(self)
+        chunk, j = self._ubicar(i)
+        return chunk[j]
+
+    def __setitem__(self, i, valor):
+        chunk, j = self._ubicar(i)
+        chunk[j] = valor
+
+    def __iter__(self):
+        c, width = self.tam_chunk, self.width
+        for y in range(self.height):
+            cy, fy = divmod(y, c)
+            for cx in range(self.chunks_x):
+                inicio = fy * c
+                yield from self.chunk(cx, cy)[inicio:inicio + min(c, width - cx * c)]
+
+    def __bytes__(self):
+        return bytes(bytearray(iter(self)))
+
+    def translate(self, tabla):
+        """Otra capa con cada byte pasado por tabla, chunk por chunk y también perezosa."""
+        return CapaPorChunks(self.width, self.height, self.tam_chunk,
+                             lambda cx, cy: self.chunk(cx, cy).translate(tabla))
+
+
+class MapaBinario:
+    """Mapa binario abierto con mmap de solo lectura.
+
+    chunk() y codigo() solo tocan las páginas de los chunks pedidos;
+    capa() da los códigos de todo el mapa como CapaPorChunks.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._archivo = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ValueError(f"{path} está vacío.")
+
+        if len(self._mmap) < CABECERA.size:
+            self.cerrar()
+            raise ValueError(f"{path} no es un mapa binario.")
+        magia, version, self.tam_chunk, self.width, self.height, largo_meta = \
+            CABECERA.unpack_from(self._mmap)
+        if magia != MAGIA or version != VERSION:
+            self.cerrar()
+            raise ValueError(f"{path} no es un mapa binario (versión {VERSION}).")
+
+        meta = json.loads(self._mmap[CABECERA.size:CABECERA.size + largo_meta].decode("utf-8"))
+        self.legend = meta["legend"]
+        self.goal = meta.get("goal", 0)
+        self.version = meta.get("version", "1.0")
+
+        self.chunks_x = -(-self.width // self.tam_chunk)
+        self.chunks_y = -(-self.height // self.tam_chunk)
+        self.bytes_chunk = self.tam_chunk * self.tam_chunk
+        self._inicio = _inicio_chunks(largo_meta)
+        if len(self._mmap) < self._inicio + self.chunks_x * self.chunks_y * self.bytes_chunk:
+            self.cerrar()
+            raise ValueError(f"{path} está incompleto.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self._mmap.close()
+        self._archivo.close()
+
+    def _offset(self, cx, cy):
+        return self._inicio + (cy * self.chunks_x + cx) * self.bytes_chunk
+
+    def chunk(self, cx, cy):
+        """Códigos del chunk (cx, cy), tam_chunk x tam_chunk fila por fila."""
+        i = self._offset(cx, cy)
+        return self._mmap[i:i + self.bytes_chunk]
+
+    def codigo(self, x, y):
+        """Código de la casilla (x, y)."""
+        c = self.tam_chunk
+        return self._mmap[self._offset(x // c, y // c) + (y % c) * c + x % c]
+
+    def capa(self):
+        """Códigos de todo el mapa, leídos del archivo chunk por chunk al usarlos.
+
+        El mapa tiene que seguir abierto mientras se use la capa.
+        """
+        return CapaPorChunks(self.width, self.height, self.tam_chunk, self.chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convierte un mapa JSON al formato binario.")
+    parser.add_argument("entrada", help="mapa JSON (formato de Info_de_ciudad.json)")
+    parser.add_argument("salida", help="archivo binario a escribir")
+    parser.add_argument("--tam-chunk", type=int, default=TAM_CHUNK)
+    args = parser.parse_args(argv)
+    convertir(args.entrada, args.salida, args.tam_chunk)
+    print(f"{args.entrada} -> {args.salida} ({os.path.getsize(args.salida)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,9 @@ EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
 
-import pygame
-import json
-from collections import deque
 from datetime import datetime
-
-TILE_SIZE = 40
+from cercania import IndiceCercania
+import cache_datos
 
 class Order:
     """Clase que representa un pedido individual."""
@@ -26,78 +23,247 @@ class Order:
 
         self.status = "waiting"  
 
+    def fila(self):
+        """Datos del pedido en una tupla (así los guarda cache_datos)."""
+        return (self.id, self.pickup, self.dropoff, self.payout, self.deadline,
+                self.weight, self.priority, self.release_time)
+
+    @classmethod
+    def desde_fila(cls, fila):
+        """Pedido nuevo a partir de fila(), sin volver a convertir el deadline."""
+        order = cls.__new__(cls)
+        (order.id, order.pickup, order.dropoff, order.payout, order.deadline,
+         order.weight, order.priority, order.release_time) = fila
+        order.status = "waiting"
+        return order
 
     def __repr__(self):
         return f"<Order {self.id} prioridad={self.priority} peso={self.weight} estado={self.status}>"
 
 
 
+ESTADOS = ("pending", "waiting", "picked", "delivered", "expired")
+
+
 class OrderManager:
-    """Maneja la lista de pedidos disponibles y el inventario del jugador."""
+    """Maneja la lista de pedidos disponibles y el inventario del jugador.
 
-    def __init__(self, json_file="data/Pedidos.json"):
-        self.orders = []
-        self.inventory = deque()  
-        self._load_orders(json_file)
+    Además de la lista guarda índices por id, por casilla (pickup y dropoff)
+    y por estado, y dos índices de cercanía: pickups de los pedidos en
+    espera y dropoffs de los recogidos. Todo cambio de estado pasa por
+    cambiar_estado para que los índices sigan al día; nadie debe asignar
+    order.status directamente. El inventario es un diccionario id -> pedido
+    en el orden en que se recogieron.
+    """
 
-        self.pickup_image = pygame.image.load("assets/Paquete.png").convert_alpha()
-        self.pickup_image = pygame.transform.scale(self.pickup_image, (TILE_SIZE, TILE_SIZE))
+    def __init__(self, json_file="data/Pedidos.json", city=None, data=None):
+        """data: lista de pedidos con el formato del JSON (pedidos generados)."""
+        self.city = city
+        self.orders = []
+        self.inventory = {}
+        self.imposibles = set()
 
-        self.dropoff_image = pygame.image.load("assets/Depositar.png").convert_alpha()
-        self.dropoff_image = pygame.transform.scale(self.dropoff_image, (TILE_SIZE, TILE_SIZE))
+        self.por_id = {}
+        self.por_casilla = {}
+        self.por_estado = {estado: {} for estado in ESTADOS}
+        self.version = 0
+        self.orden_carga = {}
+        self.cerca_pickups = IndiceCercania()
+        self.cerca_dropoffs = IndiceCercania()
+        if data is None:
+            self._load_orders(json_file)
+        else:
+            for entry in data:
+                self._indexar(Order(entry))
+        if city is not None:
+            self._revisar_alcance()
 
     def _load_orders(self, json_file):
-        """Carga pedidos desde JSON."""
+        """Carga pedidos desde JSON (ya leídos si están en cache_datos)."""
         try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            entrada = cache_datos.Entrada(json_file, "pedidos")
         except FileNotFoundError:
             raise FileNotFoundError(f"No se encontró el archivo: {json_file}")
 
-        for entry in data:
-            self.orders.append(Order(entry))
+        filas = entrada.leer()
+        if filas is None:
+            filas = [Order(entry).fila() for entry in entrada.json()]
+            entrada.guardar(filas)
+        for fila in filas:
+            self._indexar(Order.desde_fila(fila))
 
-    def accept_order(self, order_id):
-        """Acepta un pedido y lo pasa al inventario."""
+    def _indexar(self, order):
+        """Agrega un pedido nuevo a la lista y a los índices."""
+        self.orden_carga[order.id] = len(self.orders)
+        self.orders.append(order)
+        self.por_id[order.id] = order
+        self.por_estado[order.status][order.id] = order
+        self._indexar_cercania(order, order.status, agregar=True)
+        self.por_casilla.setdefault(order.pickup, []).append(order)
+        if order.dropoff != order.pickup:
+            self.por_casilla.setdefault(order.dropoff, []).append(order)
+
+    def _indexar_cercania(self, order, status, agregar):
+        """Agrega o quita el pedido del índice de cercanía de ese estado."""
+        if status == "waiting":
+            indice, tile = self.cerca_pickups, order.pickup
+        elif status == "picked":
+            indice, tile = self.cerca_dropoffs, order.dropoff
+        else:
+            return
+        llave = self.orden_carga[order.id]
+        if agregar:
+            indice.agregar(llave, tile, order)
+        else:
+            indice.quitar(llave, tile)
+
+    def cambiar_estado(self, order, status):
+        """Único punto donde cambia el estado de un pedido.
+
+        Mueve el pedido entre los índices por estado y libera el campo de
+        distancias del destino que ya no hace falta.
+        """
+        anterior = order.status
+        if anterior == status:
+            return
+        del self.por_estado[anterior][order.id]
+        self.por_estado[status][order.id] = order
+        self._indexar_cercania(order, anterior, agregar=False)
+        self._indexar_cercania(order, status, agregar=True)
+        order.status = status
+        self.version += 1
+
+        if anterior == "waiting":
+            self.liberar_destino(order.pickup)
+        if status in ("delivered", "expired"):
+            self.liberar_destino(order.dropoff)
+
+    def reiniciar(self, estados):
+        """Devuelve los pedidos a estados (uno por pedido, en orden de carga).
+
+        Reusa los pedidos y sus índices en lugar de volver a cargar el
+        archivo. Los índices por estado se arman otra vez en orden de carga,
+        como quedan al cargar, para que la partida se repita igual.
+        """
+        for order, status in zip(self.orders, estados):
+            self.cambiar_estado(order, status)
+        self.inventory.clear()
+        for pedidos in self.por_estado.values():
+            pedidos.clear()
         for order in self.orders:
-            if order.id == order_id and order.status == "waiting":
-                order.status = "picked"
-                self.inventory.append(order)
+            self.por_estado[order.status][order.id] = order
+        self.version += 1
+
+    def contar(self, status):
+        """Cantidad de pedidos con ese estado, en O(1)."""
+        return len(self.por_estado[status])
+
+    def con_estado(self, status):
+        """Pedidos con ese estado, en el orden en que llegaron a él."""
+        return list(self.por_estado[status].values())
+
+    def pickup_mas_cercano(self, origin):
+        """Pedido en espera cuyo pickup queda más cerca caminando desde origin.
+
+        Pide candidatos al índice en orden de distancia Manhattan y para en
+        cuanto esa cota ya no puede mejorar la mejor distancia caminando.
+        Devuelve (pedido, distancia) o (None, None); a igual distancia gana
+        el que se cargó primero.
+        """
+        best, best_key = None, None
+        for cota, order in self.cerca_pickups.recorrer(origin):
+            if best_key is not None and cota > best_key[0]:
+                break
+            if not self.es_alcanzable(order, origin):
+                continue
+            if self.city is None:
+                dist = cota
+            else:
+                dist = self.city.walking_distance(origin, order.pickup)
+                if dist is None:
+                    continue
+            key = (dist, self.orden_carga[order.id])
+            if best_key is None or key < best_key:
+                best, best_key = order, key
+        if best is None:
+            return None, None
+        return best, best_key[0]
+
+    def pedido_en_espera(self, x, y):
+        """Primer pedido en espera con pickup en (x, y), o None."""
+        for order in self.por_casilla.get((x, y), ()):
+            if order.status == "waiting" and order.pickup == (x, y):
                 return order
         return None
 
+    def tomar_pedido_en(self, x, y):
+        """Pasa a "picked" el primer pedido en espera con pickup en (x, y) (para las CPU)."""
+        order = self.pedido_en_espera(x, y)
+        if order is not None:
+            self.cambiar_estado(order, "picked")
+        return order
+
+    def _revisar_alcance(self):
+        """Avisa cuántos pedidos nunca se pueden completar en la ciudad (ver imposibles)."""
+        for order in self.orders:
+            if not self.city.connected(order.pickup, order.dropoff):
+                self.imposibles.add(order.id)
+        if self.imposibles:
+            print(f"[Pedidos] Aviso: {len(self.imposibles)} pedidos no se pueden completar, "
+                  f"no hay camino entre su pickup y su dropoff.")
+
+    def es_alcanzable(self, order, origin):
+        """Indica en O(1) si desde origin se puede completar el pedido."""
+        if self.city is None:
+            return True
+        if order.status == "picked":
+            return self.city.connected(origin, order.dropoff)
+        return (self.city.connected(origin, order.pickup)
+                and self.city.connected(order.pickup, order.dropoff))
+
+    def accept_order(self, order_id):
+        """Acepta un pedido y lo pasa al inventario."""
+        order = self.por_id.get(order_id)
+        if order is None or order.status != "waiting":
+            return None
+        self.cambiar_estado(order, "picked")
+        self.inventory[order.id] = order
+        return order
+
     def deliver_order(self, order_id):
         """Marca un pedido como entregado si está en el inventario."""
-        for order in list(self.inventory):
-            if order.id == order_id:
-                order.status = "delivered"
-                self.inventory.remove(order)
-                return order
-        return None
+        order = self.por_id.get(order_id)
+        if order is None or order_id not in self.inventory:
+            return None
+        self.cambiar_estado(order, "delivered")
+        del self.inventory[order_id]
+        return order
+
+    def expire_order(self, order):
+        """Marca un pedido del inventario como vencido."""
+        self.cambiar_estado(order, "expired")
+        self.inventory.pop(order.id, None)
+
+    def liberar_destino(self, tile):
+        """Avisa a la ciudad que ya no se necesita el campo de distancias de tile."""
+        if self.city is not None:
+            self.city.evict_distance_field(tile)
 
     def list_available_orders(self):
         """Devuelve los pedidos en espera."""
-        return [o for o in self.orders if o.status == "waiting"]
+        return self.con_estado("waiting")
 
     def list_inventory(self):
         """Devuelve los pedidos en el inventario del jugador."""
-        return list(self.inventory)
-    
-    def draw_orders(self, surface):
-        """Dibuja pickups y dropoffs en el mapa."""
-        TILE_SIZE = 40
-
-        for order in self.orders:
-            if order.status == "waiting":
-                surface.blit(self.pickup_image, (order.pickup[0] * TILE_SIZE, order.pickup[1] * TILE_SIZE))
-            elif order.status == "picked":
-                surface.blit(self.dropoff_image, (order.dropoff[0] * TILE_SIZE, order.dropoff[1] * TILE_SIZE))
-
-
+        return list(self.inventory.values())
 
+    def en_inventario(self, order):
+        """Indica en O(1) si el jugador lleva el pedido."""
+        return order.id in self.inventory
+    
     def get_order_at(self, x, y):
         """Devuelve un pedido en pickup/dropoff según la posición del jugador."""
-        for order in self.orders:
+        for order in self.por_casilla.get((x, y), ()):
             if order.status == "waiting" and order.pickup == (x, y):
                 return order
             if order.status == "picked" and order.dropoff == (x, y):
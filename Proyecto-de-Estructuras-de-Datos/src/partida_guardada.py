@@ -0,0 +1,221 @@
+"""
+Courier Quest - Guardar y reanudar una partida en curso
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Formato del archivo:
+    cabecera: MAGIA, VERSION y la huella del archivo de pedidos (ids en
+        orden de carga), para no aplicar la partida a otros pedidos.
+    cuerpo: pickle con el reloj, el puntaje, el jugador, las CPU, el índice
+        de la ráfaga de clima y los pedidos.
+
+Los pedidos no se copian: se guardan solo los que cambiaron de estado
+respecto al inicio (índice en orden de carga y código de estado) y el
+inventario como índices. Donde el estado de una CPU nombra un pedido (ruta,
+cargados, path...) también queda su índice.
+
+La captura (capturar) copia lo necesario en el hilo del juego y cuesta poco;
+serializar y escribir el archivo va en otro hilo (guardar_en_segundo_plano).
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+import threading
+from array import array
+from collections import deque
+from order import ESTADOS, Order
+import costos
+
+MAGIA = b"CQSV"
+VERSION = 1
+CABECERA = struct.Struct("<4sH16s")
+
+# Cachés y planificadores de las CPU: se arman de nuevo al seguir jugando
+TRANSITORIOS = {"planners", "rutas", "tabla", "_base", "_limite", "_limites", "_nodos",
+                "_tope_nodos", "politica", "estatico", "version_pedidos", "changes_seen"}
+
+
+def huella(orders):
+    """Hash de los ids de los pedidos en orden de carga."""
+    ids = "\n".join(order.id for order in orders.orders)
+    return hashlib.blake2b(ids.encode("utf-8"), digest_size=16).digest()
+
+
+def _copiar(valor):
+    """Copia los contenedores mutables (los pedidos se guardan como índice)."""
+    if isinstance(valor, (list, deque, dict, set)):
+        return type(valor)(valor)
+    return valor
+
+
+def _estado_objeto(obj):
+    return {k: _copiar(v) for k, v in vars(obj).items() if k not in TRANSITORIOS}
+
+
+def capturar(sim):
+    """Estado de la partida listo para escribir, sin referencias que cambien después."""
+    orders = sim.orders
+    iniciales = sim._inicial[0]
+    indices, codigos = array("I"), bytearray()
+    for i, (order, inicial) in enumerate(zip(orders.orders, iniciales)):
+        if order.status != inicial:
+            indices.append(i)
+            codigos.append(ESTADOS.index(order.status))
+
+    return {
+        "huella": huella(orders),
+        "time": sim.time,
+        "money": sim.money,
+        "entregas": sim.entregas,
+        "vencidos": sim.vencidos,
+        "player": _estado_objeto(sim.player),
+        "cpus": [(type(cpu).__name__, _estado_objeto(cpu)) for cpu in sim.cpus],
+        "clima": (sim.weather.burst_index, sim.weather.start_time),
+        "cambios": (indices.tobytes(), bytes(codigos)),
+        "inventario": array("I", (orders.orden_carga[o.id] for o in orders.inventory.values())).tobytes(),
+        "orden_carga": orders.orden_carga,
+    }
+
+
+class _Pickler(pickle.Pickler):
+    """Escribe cada pedido como su índice en orden de carga."""
+
+    def __init__(self, f, orden_carga):
+        super().__init__(f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.orden_carga = orden_carga
+
+    def persistent_id(self, obj):
+        if isinstance(obj, Order):
+            return self.orden_carga[obj.id]
+        return None
+
+
+# Únicas clases que aparecen en el estado del jugador y de las CPU
+PERMITIDAS = {("collections", "deque"), ("builtins", "set"), ("builtins", "frozenset"),
+              ("datetime", "datetime"), ("datetime", "timedelta")}
+
+
+class _Unpickler(pickle.Unpickler):
+    """Cambia cada índice guardado por el pedido vivo.
+
+    Un archivo dañado no puede importar ni construir nada fuera de PERMITIDAS.
+    """
+
+    def __init__(self, f, orders):
+        super().__init__(f)
+        self.orders = orders
+
+    def persistent_load(self, pid):
+        return self.orders.orders[pid]
+
+    def find_class(self, module, name):
+        if (module, name) not in PERMITIDAS:
+            raise pickle.UnpicklingError(f"{module}.{name} no puede estar en una partida.")
+        return super().find_class(module, name)
+
+
+def escribir(path, estado):
+    """Escribe un estado de capturar() (en un temporal que luego se renombra)."""
+    estado = dict(estado)
+    orden_carga = estado.pop("orden_carga")
+    temporal = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(CABECERA.pack(MAGIA, VERSION, estado.pop("huella")))
+        _Pickler(f, orden_carga).dump(estado)
+    os.replace(temporal, path)
+
+
+def guardar(sim, path):
+    escribir(path, capturar(sim))
+
+
+def guardar_en_segundo_plano(sim, path, anterior=None):
+    """Captura ahora y escribe en un hilo; devuelve el hilo.
+
+    Si el guardado anterior (su hilo) aún no termina, no hace nada y lo
+    devuelve, así nunca se acumulan escrituras.
+    """
+    if anterior is not None and anterior.is_alive():
+        return anterior
+    estado = capturar(sim)
+    hilo = threading.Thread(target=escribir, args=(path, estado), name="guardado", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def _leer(sim, path):
+    """Estado guardado en path, ya revisado contra sim (ValueError si no sirve)."""
+    with open(path, "rb") as f:
+        cabecera = f.read(CABECERA.size)
+        if len(cabecera) < CABECERA.size:
+            raise ValueError(f"{path} no es una partida guardada.")
+        magia, version, huella_pedidos = CABECERA.unpack(cabecera)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"{path} no es una partida guardada (versión {VERSION}).")
+        if huella_pedidos != huella(sim.orders):
+            raise ValueError("La partida guardada es de otros pedidos.")
+        try:
+            estado = _Unpickler(f, sim.orders).load()
+            clases = [nombre for nombre, _ in estado["cpus"]]
+            indices, codigos = estado["cambios"]
+            indices, inventario = array("I", indices), array("I", estado["inventario"])
+            total = len(sim.orders.orders)
+            if (len(indices) != len(codigos) or any(i >= total for i in indices)
+                    or any(i >= total for i in inventario)
+                    or any(c >= len(ESTADOS) for c in codigos)):
+                raise ValueError("índices fuera de rango")
+            faltan = {"time", "money", "entregas", "vencidos", "player", "clima"} - estado.keys()
+            if faltan:
+                raise KeyError(", ".join(sorted(faltan)))
+            burst_index, _ = estado["clima"]
+            if sim.weather.bursts and not 0 <= burst_index < len(sim.weather.bursts):
+                raise ValueError("ráfaga de clima fuera de rango")
+        except Exception as e:
+            # Cuerpo truncado o dañado: pickle puede fallar con casi cualquier
+            # excepción (UnpicklingError, EOFError, IndexError, MemoryError...);
+            # no se toca la partida en curso
+            raise ValueError(f"{path} está dañada ({e}).") from e
+
+    if clases != [type(cpu).__name__ for cpu in sim.cpus]:
+        raise ValueError("La partida guardada es contra otra CPU.")
+    estado["cambios"] = (indices, codigos)
+    estado["inventario"] = inventario
+    return estado
+
+
+def cargar(sim, path):
+    """Reanuda en sim la partida guardada en path.
+
+    sim debe usar los mismos pedidos y la misma clase de CPU que la partida
+    guardada; si no, o si el archivo está dañado, lanza ValueError sin
+    cambiar sim.
+    """
+    estado = _leer(sim, path)
+
+    sim.reset()
+    sim.time = estado["time"]
+    sim.money = estado["money"]
+    sim.entregas = estado["entregas"]
+    sim.vencidos = estado["vencidos"]
+    vars(sim.player).update(estado["player"])
+    for cpu, (_, datos) in zip(sim.cpus, estado["cpus"]):
+        vars(cpu).update(datos)
+
+    orders = sim.orders
+    indices, codigos = estado["cambios"]
+    for i, codigo in zip(indices, codigos):
+        orders.cambiar_estado(orders.orders[i], ESTADOS[codigo])
+    for i in estado["inventario"]:
+        order = orders.orders[i]
+        orders.inventory[order.id] = order
+
+    # Quedan en la línea de tiempo solo los eventos que aún no ocurrieron
+    sim.eventos.descartar_hasta(sim.time)
+
+    burst_index, start_time = estado["clima"]
+    if sim.weather.bursts:
+        sim.weather._apply_burst(burst_index)
+    sim.weather.start_time = start_time
+    costos.cambiar_clima(sim.city, sim.weather.get_current_condition())
@@ -4,9 +4,10 @@ EIF-207 - Estructuras de Datos
 Autores: Fernando Durán Escobar y Alonso Durán Escobar
 """
 
-import pygame
 from weather import WEATHER_MULTIPLIERS
-TILE_SIZE = 40
+
+# Peso máximo que lleva un repartidor a la vez (lo revisa Simulacion al aceptar pedidos)
+PESO_MAXIMO = 10
 
 
 class Player:
@@ -27,9 +28,6 @@ class Player:
 
         self.time_still = 0.0
 
-        self.image = pygame.image.load("assets/Jugador.png").convert_alpha()
-        self.image = pygame.transform.scale(self.image, (TILE_SIZE, TILE_SIZE))
-
     def mover(self, dx, dy, city, clima=None):
         """
         Mueve al jugador
@@ -45,6 +43,10 @@ class Player:
                 self._consumir_resistencia(city, clima)
                 self.time_still = 0.0
 
+    def puede_cargar(self, order):
+        """Indica si el pedido cabe en lo que ya lleva (PESO_MAXIMO)."""
+        return self.peso_total + order.weight <= PESO_MAXIMO
+
     def _consumir_resistencia(self,city, clima=None):
         """Reduce la resistencia según peso y clima."""
         consumo = 0.5 
@@ -55,8 +57,7 @@ class Player:
         if clima and clima in WEATHER_MULTIPLIERS:
             consumo *= 1.0 / WEATHER_MULTIPLIERS[clima]
 
-        symbol = city.tiles[self.y][self.x]
-        surface_weight = city.legend[symbol].get("surface_weight", 1.0)
+        surface_weight = city.surface_weight(self.x, self.y)
         consumo *= 1.0 / surface_weight
 
         self.resistencia -= consumo
@@ -87,38 +88,3 @@ class Player:
             self.estado = "Cansado"
         else:
             self.estado = "Normal"
-
-    def draw(self, surface):
-        """Dibuja al jugador en pantalla (rectángulo azul)."""
-        player_rect = pygame.Rect(
-            self.x * TILE_SIZE,
-            self.y * TILE_SIZE,
-            TILE_SIZE,
-            TILE_SIZE,
-        )
-        surface.blit(self.image, player_rect)
-
-    def draw_stats(self, surface, offset_y=0):
-        """Dibuja barras de resistencia y reputación en el HUD."""
-        font = pygame.font.SysFont(None, 24)
-
-        res_bar_width = 200
-        res_ratio = self.resistencia / 100
-        pygame.draw.rect(surface, (150, 150, 150),
-            (10, offset_y, res_bar_width, 20))
-        pygame.draw.rect(surface, (0, 200, 0),
-            (10, offset_y, res_bar_width * res_ratio, 20))
-        res_text = font.render(f"Resistencia: {int(self.resistencia)}",
-            True, (255, 255, 255))
-        surface.blit(res_text, (10, offset_y + 25))
-
-
-        rep_bar_width = 200
-        rep_ratio = self.reputacion / 100
-        pygame.draw.rect(surface, (150, 150, 150),
-            (10, offset_y + 60, rep_bar_width, 20))
-        pygame.draw.rect(surface, (0, 0, 200),
-            (10, offset_y + 60, rep_bar_width * rep_ratio, 20))
-        rep_text = font.render(f"Reputación: {int(self.reputacion)}",
-            True, (255, 255, 255))
-        surface.blit(rep_text, (10, offset_y + 85))
@@ -0,0 +1,87 @@
+"""
+Courier Quest - Registro compartido de imágenes con precarga
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import threading
+import pygame
+from camara import TexturasPorZoom
+
+IMAGEN_CPU = "assets/CPUPlayer.png"
+
+# nombre -> (archivo, tiene transparencia)
+IMAGENES = {
+    "calle": ("assets/Calle.png", False),
+    "edificio": ("assets/Ciudad.png", False),
+    "parque": ("assets/Parque.png", False),
+    "jugador": ("assets/Jugador.png", True),
+    "pickup": ("assets/Paquete.png", True),
+    "dropoff": ("assets/Depositar.png", True),
+}
+
+
+class Recursos:
+    """Imágenes del juego decodificadas una sola vez por proceso.
+
+    Cada archivo se carga una vez y cada juego de imágenes (según la imagen
+    de la CPU) tiene un solo TexturasPorZoom, así que reiniciar la partida
+    o elegir otra dificultad no vuelve a leer ni escalar nada.
+
+    precargar() solo decodifica los archivos en un hilo mientras el selector
+    está en pantalla: convert, el escalado y los atlas usan el formato de la
+    ventana y SDL no permite llamarlos desde otro hilo, así que se hacen en
+    el hilo principal la primera vez que se usa cada imagen.
+    """
+
+    def __init__(self):
+        self.decodificadas = {}
+        self.imagenes = {}
+        self.juegos = {}
+        self.lock = threading.Lock()
+        self.hilo = None
+
+    def _decodificar(self, path):
+        """Surface del archivo tal como viene (sin convert); se puede llamar desde cualquier hilo."""
+        with self.lock:
+            image = self.decodificadas.get(path)
+        if image is None:
+            image = pygame.image.load(path)
+            with self.lock:
+                image = self.decodificadas.setdefault(path, image)
+        return image
+
+    def imagen(self, path, alpha=True):
+        """Surface convertida del archivo (solo desde el hilo principal)."""
+        image = self.imagenes.get(path)
+        if image is None:
+            image = self._decodificar(path)
+            image = image.convert_alpha() if alpha else image.convert()
+            self.imagenes[path] = image
+        return image
+
+    def texturas(self, cpu_image=IMAGEN_CPU):
+        """TexturasPorZoom con IMAGENES y la imagen de la CPU como "cpu" (hilo principal)."""
+        juego = self.juegos.get(cpu_image)
+        if juego is None:
+            originales = {nombre: self.imagen(path, alpha)
+                          for nombre, (path, alpha) in IMAGENES.items()}
+            originales["cpu"] = self.imagen(cpu_image)
+            juego = TexturasPorZoom(originales)
+            self.juegos[cpu_image] = juego
+        return juego
+
+    def precargar(self, cpu_image=IMAGEN_CPU):
+        """Decodifica en un hilo los archivos de texturas(cpu_image); devuelve el hilo."""
+        paths = [path for path, _ in IMAGENES.values()] + [cpu_image]
+
+        def trabajo():
+            for path in paths:
+                self._decodificar(path)
+
+        self.hilo = threading.Thread(target=trabajo, name="precarga-recursos", daemon=True)
+        self.hilo.start()
+        return self.hilo
+
+
+REGISTRO = Recursos()
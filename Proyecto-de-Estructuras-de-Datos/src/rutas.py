@@ -0,0 +1,212 @@
+"""
+Courier Quest - Optimizador de rutas con varios pedidos (peso y plazos)
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import time
+
+RECOGER = "pickup"
+ENTREGAR = "dropoff"
+
+# Rutas que puede evaluar cada optimizar (unos 2 ms en mapas chicos)
+MAX_EVALUACIONES = 200
+MAX_CANDIDATOS = 12
+# Pago que vale un segundo de viaje: a igual pago prefiere la ruta más corta
+COSTO_SEGUNDO = 0.05
+
+
+def casilla(parada):
+    """Casilla de una parada (tipo, pedido)."""
+    tipo, order = parada
+    return order.pickup if tipo == RECOGER else order.dropoff
+
+
+class MatrizDistancias:
+    """Distancias caminando entre casillas, guardadas al pedirlas.
+
+    Se vacía cuando cambian casillas de la ciudad (City.tile_changes).
+    """
+
+    def __init__(self, city):
+        self.city = city
+        self.distancias = {}
+        self.changes_seen = len(city.tile_changes)
+
+    def __call__(self, a, b):
+        if self.changes_seen != len(self.city.tile_changes):
+            self.distancias.clear()
+            self.changes_seen = len(self.city.tile_changes)
+        if a == b:
+            return 0
+        key = (a, b)
+        if key in self.distancias:
+            return self.distancias[key]
+        d = self.city.walking_distance(a, b)
+        self.distancias[key] = d
+        self.distancias[(b, a)] = d
+        return d
+
+
+class PlanificadorRutas:
+    """Elige qué pedidos llevar y en qué orden recogerlos y entregarlos.
+
+    Una ruta es una lista de paradas (RECOGER/ENTREGAR, pedido). Es válida si
+    cada pickup va antes de su dropoff, el peso cargado nunca pasa de
+    capacidad y cada pedido nuevo se entrega antes de su plazo; los pedidos
+    que ya se llevan se entregan aunque vayan tarde. El valor es la suma de
+    pagos menos COSTO_SEGUNDO por segundo de viaje.
+
+    optimizar() parte de la ruta anterior (así es incremental cuando se
+    liberan pedidos), inserta candidatos en la mejor posición y mejora con
+    búsqueda local (mover una parada, quitar un pedido) hasta evaluar
+    max_evaluaciones rutas.
+
+    presupuesto: tope opcional en segundos además de max_evaluaciones; con
+    él la ruta depende de la velocidad de la máquina, así que las partidas
+    con semilla (Simulacion, torneo) no lo usan.
+    """
+
+    def __init__(self, city, capacidad, segundos_por_paso, limite,
+                 max_evaluaciones=MAX_EVALUACIONES, presupuesto=None):
+        """limite: función pedido -> segundo de simulación de su plazo."""
+        self.distancia = MatrizDistancias(city)
+        self.capacidad = capacidad
+        self.segundos_por_paso = segundos_por_paso
+        self.limite = limite
+        self.max_evaluaciones = max_evaluaciones
+        self.presupuesto = presupuesto
+        self._evaluadas = 0
+        self._fin = None
+
+    def _agotado(self):
+        """Indica si ya se gastó el presupuesto de la optimización en curso."""
+        if self._evaluadas >= self.max_evaluaciones:
+            return True
+        return self._fin is not None and time.perf_counter() >= self._fin
+
+    def evaluar(self, origin, ahora, cargados, ruta):
+        """Valor de la ruta, o None si no es válida."""
+        self._evaluadas += 1
+        t = ahora
+        pos = origin
+        peso = sum(o.weight for o in cargados)
+        valor = 0
+        recogidos = set()
+        for tipo, order in ruta:
+            tile = order.pickup if tipo == RECOGER else order.dropoff
+            d = self.distancia(pos, tile)
+            if d is None:
+                return None
+            t += d * self.segundos_por_paso
+            pos = tile
+            if tipo == RECOGER:
+                peso += order.weight
+                if peso > self.capacidad:
+                    return None
+                recogidos.add(order.id)
+            else:
+                if order.id in recogidos:
+                    if t > self.limite(order):
+                        return None
+                elif order not in cargados:
+                    return None
+                peso -= order.weight
+                valor += order.payout
+        return valor - COSTO_SEGUNDO * (t - ahora)
+
+    def optimizar(self, origin, ahora, cargados, candidatos, ruta=()):
+        """Mejor ruta encontrada dentro del presupuesto: (ruta, valor)."""
+        self._evaluadas = 0
+        self._fin = None if self.presupuesto is None else time.perf_counter() + self.presupuesto
+        candidatos = list(candidatos)
+        disponibles = {o.id for o in candidatos}
+        cargados = list(cargados)
+
+        # De la ruta anterior quedan los pedidos aún disponibles y lo que ya se lleva
+        recoger = {p[1].id for p in ruta if p[0] == RECOGER and p[1].id in disponibles}
+        ruta = [p for p in ruta
+                if p[1].id in recoger or (p[0] == ENTREGAR and p[1] in cargados)]
+        for order in cargados:
+            if (ENTREGAR, order) not in ruta:
+                ruta.append((ENTREGAR, order))
+
+        valor = self.evaluar(origin, ahora, cargados, ruta)
+        if valor is None:
+            ruta = self._entregas_cercanas(origin, cargados)
+            valor = self.evaluar(origin, ahora, cargados, ruta)
+            if valor is None:
+                return ruta, 0
+
+        ruta, valor = self._insertar(origin, ahora, cargados, candidatos, ruta, valor)
+        ruta, valor = self._busqueda_local(origin, ahora, cargados, ruta, valor)
+        return ruta, valor
+
+    def _entregas_cercanas(self, origin, cargados):
+        """Entregas de lo que se lleva, siempre a la más cercana (ruta de respaldo)."""
+        ruta = []
+        pos = origin
+        pendientes = list(cargados)
+        while pendientes:
+            order = min(pendientes, key=lambda o: self.distancia(pos, o.dropoff) or 0)
+            pendientes.remove(order)
+            ruta.append((ENTREGAR, order))
+            pos = order.dropoff
+        return ruta
+
+    def _insertar(self, origin, ahora, cargados, candidatos, ruta, valor):
+        """Inserta el pedido que más sube el valor, mientras alguno lo suba."""
+        en_ruta = {p[1].id for p in ruta}
+        pendientes = [o for o in candidatos if o.id not in en_ruta]
+        while pendientes:
+            mejor = None
+            for order in pendientes:
+                for i in range(len(ruta) + 1):
+                    con_pickup = ruta[:i] + [(RECOGER, order)]
+                    for j in range(i, len(ruta) + 1):
+                        nueva = con_pickup + ruta[i:j] + [(ENTREGAR, order)] + ruta[j:]
+                        v = self.evaluar(origin, ahora, cargados, nueva)
+                        if v is not None and v > valor and (mejor is None or v > mejor[0]):
+                            mejor = (v, nueva, order)
+                    if self._agotado():
+                        break
+                if self._agotado():
+                    break
+            if mejor is None:
+                break
+            valor, ruta, order = mejor
+            pendientes.remove(order)
+            if self._agotado():
+                break
+        return ruta, valor
+
+    def _busqueda_local(self, origin, ahora, cargados, ruta, valor):
+        """Mueve paradas de lugar o quita pedidos no cargados mientras mejore."""
+        mejoro = True
+        while mejoro and not self._agotado():
+            mejoro = False
+            for i in range(len(ruta)):
+                parada = ruta[i]
+                resto = ruta[:i] + ruta[i + 1:]
+                for j in range(len(resto) + 1):
+                    if j == i:
+                        continue
+                    nueva = resto[:j] + [parada] + resto[j:]
+                    v = self.evaluar(origin, ahora, cargados, nueva)
+                    if v is not None and v > valor:
+                        ruta, valor, mejoro = nueva, v, True
+                        break
+                if mejoro or self._agotado():
+                    break
+            if mejoro:
+                continue
+
+            for parada in ruta:
+                if parada[0] != RECOGER:
+                    continue
+                nueva = [p for p in ruta if p[1] is not parada[1]]
+                v = self.evaluar(origin, ahora, cargados, nueva)
+                if v is not None and v > valor:
+                    ruta, valor, mejoro = nueva, v, True
+                    break
+        return ruta, valor
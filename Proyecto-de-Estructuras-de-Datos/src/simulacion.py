@@ -0,0 +1,201 @@
+"""
+Courier Quest - Núcleo de simulación sin ventana
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+import random
+from datetime import datetime, timedelta
+from city import City
+from player import Player
+from order import OrderManager
+from weather import Weather
+from CPUPlayer import CPUPlayer
+from eventos import Cronograma, LIBERAR, VENCER
+import costos
+
+DURATION = 15 * 60
+INICIO_JORNADA = datetime(2025, 9, 1, 6, 0, 0)
+
+MOVIMIENTOS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+
+class Simulacion:
+    """Reglas del juego sin pygame: ciudad, pedidos, clima, jugador, CPU y puntaje.
+
+    rivales: clases de CPU adicionales que compiten en la misma partida.
+
+    Acciones aceptadas por step:
+        "up", "down", "left", "right": mueve al jugador una casilla.
+        "interact": recoge o entrega en la casilla actual (tecla E).
+        "hold": el jugador mantiene una flecha presionada (no recupera).
+    """
+
+    def __init__(self, cpu_class=CPUPlayer, rivales=(),
+                 city_file="data/Info_de_ciudad.json",
+                 orders_file="data/Pedidos.json",
+                 weather_file="data/clima.json"):
+        self.cpu_class = cpu_class
+        self.rivales = list(rivales)
+        self.orders_file = orders_file
+        self.weather_file = weather_file
+
+        self.city = City(city_file)
+        self.start_time = INICIO_JORNADA
+        self._inicial = None
+        self.reset()
+
+    def reset(self, seed=None):
+        """Reinicia la partida. Con la misma semilla se repite la misma partida.
+
+        La primera vez carga pedidos y clima y guarda una instantánea del
+        estado inicial (estados de los pedidos y línea de tiempo); las
+        siguientes la restauran en el lugar, sin leer archivos ni crear
+        pedidos o índices nuevos.
+        """
+        random.seed(seed)
+
+        self.time = 0.0
+        self.money = 0
+        self.entregas = 0
+        self.vencidos = 0
+        self.score = 0
+        self.fin = False
+        self.victoria = False
+        self.motivo = ""
+
+        self.player = Player(start_x=1, start_y=1)
+        if self._inicial is None:
+            self.orders = OrderManager(self.orders_file, city=self.city)
+            self.eventos = self.programar_eventos()
+            self.weather = Weather(self.weather_file)
+            self._inicial = ([order.status for order in self.orders.orders],
+                             self.eventos.instantanea())
+        else:
+            estados, eventos = self._inicial
+            self.orders.reiniciar(estados)
+            self.eventos.restaurar(eventos)
+            self.weather.reiniciar()
+        costos.cambiar_clima(self.city, self.weather.get_current_condition())
+        self.cpu = self.cpu_class(start_x=1, start_y=1)
+        self.cpus = [self.cpu] + [rival(start_x=1, start_y=1) for rival in self.rivales]
+
+    def programar_eventos(self):
+        """Arma la línea de tiempo de liberaciones y vencimientos de los pedidos.
+
+        Los pedidos con release_time > 0 quedan "pending" hasta su segundo de
+        liberación. El vencimiento se programa en el primer segundo en que el
+        reloj (que cuenta segundos enteros) ya pasó el deadline.
+        """
+        eventos = Cronograma()
+        for order in self.orders.orders:
+            if order.release_time > 0:
+                self.orders.cambiar_estado(order, "pending")
+                eventos.agregar(order.release_time, LIBERAR, order)
+            limite = int((order.deadline - self.start_time).total_seconds()) + 1
+            eventos.agregar(limite, VENCER, order)
+        return eventos
+
+    def step(self, actions, dt):
+        """Aplica las acciones del jugador y avanza la simulación dt segundos.
+
+        Devuelve True cuando la partida terminó.
+        """
+        if self.fin:
+            return True
+
+        moving = False
+        for action in actions:
+            if action in MOVIMIENTOS:
+                dx, dy = MOVIMIENTOS[action]
+                self.player.mover(dx, dy, self.city, clima=self.weather.get_current_condition())
+                moving = True
+            elif action == "hold":
+                moving = True
+            elif action == "interact":
+                self.interact()
+
+        self.update(dt, moving)
+        return self.fin
+
+    def interact(self):
+        """Interacción del jugador con pickups o dropoffs."""
+        order = self.orders.get_order_at(self.player.x, self.player.y)
+        if not order:
+            return
+
+        if order.status == "waiting":
+            if not self.player.puede_cargar(order):
+                return
+            accepted = self.orders.accept_order(order.id)
+            if accepted:
+                self.player.peso_total += order.weight
+
+        elif order.status == "picked":
+            delivered = self.orders.deliver_order(order.id)
+            if delivered:
+                self.player.peso_total -= order.weight
+                self.player.reputacion += 3
+                if self.player.reputacion > 100:
+                    self.player.reputacion = 100
+                self.money += order.payout
+                self.entregas += 1
+
+    def update(self, dt, moving=False):
+        """Actualiza las reglas del juego."""
+        if self.time >= DURATION:
+            self.terminar("Tiempo agotado. No alcanzaste la meta.", victory=False)
+            return
+
+        if self.player.reputacion <= 20:
+            self.terminar("Tu reputación cayó demasiado. ¡Has sido despedido!", victory=False)
+            return
+
+        if self.money >= self.city.goal:
+            self.terminar("¡Has alcanzado la meta de ingresos!", victory=True)
+            return
+
+        self.time += dt
+
+        if not moving:
+            self.player.recuperar(dt)
+
+        if self.weather.update(self.time):
+            costos.cambiar_clima(self.city, self.weather.get_current_condition())
+
+        for tipo, order in self.eventos.ocurridos(self.time):
+            if tipo == LIBERAR:
+                if order.status == "pending":
+                    self.orders.cambiar_estado(order, "waiting")
+            elif order.status == "picked" and self.orders.en_inventario(order):
+                self.orders.expire_order(order)
+                self.vencidos += 1
+                self.player.reputacion -= 6
+                if self.player.reputacion < 0:
+                    self.player.reputacion = 0
+
+        for cpu in self.cpus:
+            cpu.update(dt, self.city, self.orders, self.weather.get_current_condition())
+
+    def terminar(self, reason, victory=False):
+        """Marca el fin de la partida y calcula el puntaje."""
+        self.fin = True
+        self.victoria = victory
+        self.motivo = reason
+
+        if victory:
+            tiempo_bonus = max(0, DURATION - int(self.time))
+            self.score = self.money + tiempo_bonus
+
+    def reloj(self):
+        """Hora simulada dentro de la jornada."""
+        return self.start_time + timedelta(seconds=int(self.time))
+
+    def tiempo_sobrante(self):
+        """Segundos que quedaban al terminar la partida."""
+        return max(0, DURATION - int(self.time))
@@ -0,0 +1,67 @@
+"""
+Courier Quest - Registro de fuentes y caché de textos renderizados
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+from collections import OrderedDict
+import pygame
+
+MAX_TEXTOS = 256
+
+_fuentes = {}
+
+
+def fuente(size, name=None):
+    """Devuelve la fuente del sistema de ese tamaño, creándola una sola vez."""
+    key = (name, size)
+    font = _fuentes.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _fuentes[key] = font
+    return font
+
+
+class CacheTextos:
+    """Superficies de texto ya renderizadas, con política LRU.
+
+    La llave es (tamaño, texto, color): si un valor del HUD no cambió entre
+    cuadros se reutiliza la superficie anterior en lugar de renderizarla.
+    """
+
+    def __init__(self, max_items=MAX_TEXTOS):
+        self.max_items = max_items
+        self.superficies = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, size, text, color):
+        """Superficie del texto (antialias) con la fuente de ese tamaño."""
+        key = (size, text, color)
+        surface = self.superficies.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.superficies.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = fuente(size).render(text, True, color)
+        self.superficies[key] = surface
+        if len(self.superficies) > self.max_items:
+            self.superficies.popitem(last=False)
+        return surface
+
+    def truncar(self, size, text, color, max_width):
+        """Como render, pero corta el texto con "..." si no cabe en max_width.
+
+        El ancho se mide con Font.size, así se renderiza una sola vez.
+        """
+        font = fuente(size)
+        if font.size(text)[0] > max_width:
+            while font.size(text + "...")[0] > max_width and len(text) > 5:
+                text = text[:-1]
+            text += "..."
+        return self.render(size, text, color)
+
+    def vaciar(self):
+        self.superficies.clear()
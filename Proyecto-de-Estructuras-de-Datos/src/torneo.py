@@ -0,0 +1,212 @@
+"""
+Courier Quest - Torneo de IAs en paralelo
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Uso (desde la carpeta del proyecto):
+    python src/torneo.py --partidas 50 --salida resultados/torneo.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+from CPUPlayer import CPUPlayer
+from CPUPlayer_medium import CPUPlayer_Medium
+from CPUPlayer_dificil import CPUPlayer_Dificil
+from jugador_scripted import JugadorScripted
+from simulacion import Simulacion
+
+try:
+    from CPUPlayer_entrenado import CPUPlayer_Entrenado
+except ImportError:
+    CPUPlayer_Entrenado = None
+
+ESTRATEGIAS = {
+    "facil": CPUPlayer,
+    "medio": CPUPlayer_Medium,
+    "dificil": CPUPlayer_Dificil,
+    "scripted": None,
+}
+
+if CPUPlayer_Entrenado is not None and CPUPlayer_Entrenado.disponible():
+    ESTRATEGIAS["entrenado"] = CPUPlayer_Entrenado
+
+METRICAS = ("money", "entregas", "vencidos", "tiempo_meta")
+
+_simulaciones = {}
+
+
+def _silenciar():
+    """Los CPU imprimen cada entrega; en los procesos del torneo solo estorba."""
+    sys.stdout = open(os.devnull, "w")
+
+
+def _simulacion(cpu_class, rivales):
+    """Reutiliza la misma simulación (y la ciudad ya cargada) dentro de cada proceso."""
+    key = (cpu_class, tuple(rivales))
+    if key not in _simulaciones:
+        _simulaciones[key] = Simulacion(cpu_class, rivales=rivales)
+    return _simulaciones[key]
+
+
+def _vencidos_cpu(sim, cpu):
+    """Las reglas no vencen pedidos de la CPU; se cuentan los que terminó llevando atrasados."""
+    cargados = getattr(cpu, "cargados", None)
+    if cargados is None:
+        cargados = [cpu.carrying_order] if cpu.carrying_order is not None else []
+    return sum(1 for order in cargados if sim.reloj() > order.deadline)
+
+
+def jugar_partida(job):
+    """Juega una partida con semilla fija y devuelve las métricas de cada estrategia."""
+    nombre_a, nombre_b, seed, dt = job
+
+    if "scripted" in (nombre_a, nombre_b):
+        rival = nombre_b if nombre_a == "scripted" else nombre_a
+        orden = [rival]
+        scripted = JugadorScripted()
+    else:
+        # El primer CPU actualiza primero y gana los empates por un pedido,
+        # por eso el orden se alterna según la semilla.
+        orden = [nombre_a, nombre_b] if seed % 2 == 0 else [nombre_b, nombre_a]
+        scripted = None
+
+    clases = [ESTRATEGIAS[nombre] for nombre in orden]
+    sim = _simulacion(clases[0], clases[1:])
+    sim.reset(seed)
+
+    competidores = dict(zip(orden, sim.cpus))
+    tiempo_meta = {nombre: None for nombre in (nombre_a, nombre_b)}
+
+    while not sim.fin:
+        acciones = scripted.acciones(sim, dt) if scripted else []
+        sim.step(acciones, dt)
+
+        for nombre in tiempo_meta:
+            if tiempo_meta[nombre] is not None:
+                continue
+            money = sim.money if nombre == "scripted" else competidores[nombre].money
+            if money >= sim.city.goal:
+                tiempo_meta[nombre] = round(sim.time, 2)
+
+        if all(t is not None for t in tiempo_meta.values()):
+            break
+
+    resultados = {}
+    for nombre in (nombre_a, nombre_b):
+        if nombre == "scripted":
+            resultados[nombre] = {
+                "money": sim.money,
+                "entregas": sim.entregas,
+                "vencidos": sim.vencidos,
+            }
+        else:
+            cpu = competidores[nombre]
+            resultados[nombre] = {
+                "money": cpu.money,
+                "entregas": cpu.entregas,
+                "vencidos": _vencidos_cpu(sim, cpu),
+            }
+        resultados[nombre]["tiempo_meta"] = tiempo_meta[nombre]
+
+    return {
+        "seed": seed,
+        "pareja": [nombre_a, nombre_b],
+        "duracion": round(sim.time, 2),
+        "resultados": resultados,
+    }
+
+
+def intervalo(valores, confianza=0.95):
+    """Media y semiancho del intervalo de confianza (aproximación normal)."""
+    if not valores:
+        return None, None
+    media = statistics.fmean(valores)
+    if len(valores) < 2:
+        return media, 0.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confianza / 2)
+    return media, z * statistics.stdev(valores) / math.sqrt(len(valores))
+
+
+def resumir(partidas):
+    """Agrupa las métricas por estrategia con su intervalo de confianza."""
+    datos = {}
+    totales = {}
+    for partida in partidas:
+        for nombre, res in partida["resultados"].items():
+            totales[nombre] = totales.get(nombre, 0) + 1
+            por_metrica = datos.setdefault(nombre, {m: [] for m in METRICAS})
+            for metrica in METRICAS:
+                if res[metrica] is not None:
+                    por_metrica[metrica].append(res[metrica])
+
+    resumen = {}
+    for nombre, por_metrica in datos.items():
+        resumen[nombre] = {"partidas": totales[nombre]}
+        for metrica in METRICAS:
+            media, ic = intervalo(por_metrica[metrica])
+            resumen[nombre][metrica] = {"media": media, "ic95": ic}
+        resumen[nombre]["meta_alcanzada"] = len(por_metrica["tiempo_meta"]) / totales[nombre]
+    return resumen
+
+
+def imprimir_resumen(resumen):
+    """Muestra una tabla con media ± IC 95 % por estrategia."""
+    print(f"{'estrategia':<10} {'partidas':>8} " +
+          " ".join(f"{m:>20}" for m in METRICAS) + f" {'% meta':>7}")
+    for nombre, res in sorted(resumen.items()):
+        celdas = []
+        for metrica in METRICAS:
+            media, ic = res[metrica]["media"], res[metrica]["ic95"]
+            celdas.append(f"{'-':>20}" if media is None else f"{media:>11.1f} ± {ic:<6.1f}")
+        print(f"{nombre:<10} {res['partidas']:>8} " + " ".join(celdas) +
+              f" {100 * res['meta_alcanzada']:>6.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneo de estrategias de Courier Quest.")
+    parser.add_argument("--partidas", type=int, default=20,
+                        help="partidas (semillas) por cada pareja de estrategias")
+    parser.add_argument("--estrategias", nargs="+", default=list(ESTRATEGIAS),
+                        choices=list(ESTRATEGIAS))
+    parser.add_argument("--dt", type=float, default=1 / 60,
+                        help="segundos simulados por step")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("--salida", default="resultados/torneo.jsonl")
+    args = parser.parse_args(argv)
+
+    jobs = [(a, b, seed, args.dt)
+            for a, b in itertools.combinations(args.estrategias, 2)
+            for seed in range(args.partidas)]
+
+    carpeta = os.path.dirname(args.salida)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+
+    inicio = time.perf_counter()
+    partidas = []
+    with open(args.salida, "w", encoding="utf-8") as f, \
+            Pool(args.procesos, initializer=_silenciar) as pool:
+        for i, partida in enumerate(pool.imap_unordered(jugar_partida, jobs), start=1):
+            f.write(json.dumps(partida, ensure_ascii=False) + "\n")
+            f.flush()
+            partidas.append(partida)
+            print(f"\r{i}/{len(jobs)} partidas", end="", flush=True)
+    print(f"\n{len(jobs)} partidas en {time.perf_counter() - inicio:.1f}s "
+          f"con {args.procesos} procesos -> {args.salida}")
+
+    resumen = resumir(partidas)
+    imprimir_resumen(resumen)
+
+    with open(os.path.splitext(args.salida)[0] + "_resumen.json", "w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-import json
 import random
+import cache_datos
 
 
 WEATHER_MULTIPLIERS = {
@@ -18,7 +18,8 @@ WEATHER_MULTIPLIERS = {
 class Weather:
     """Maneja el clima usando ráfagas definidas en un archivo JSON."""
 
-    def __init__(self, json_file="data/clima.json"):
+    def __init__(self, json_file="data/clima.json", bursts=None):
+        """bursts: lista de ráfagas en lugar de leer el archivo."""
         self.current_condition = "clear"
         self.intensity = 1.0
         self.duration = 60
@@ -26,13 +27,29 @@ class Weather:
 
         self.bursts = []
         self.burst_index = 0
+        if bursts is not None:
+            self.bursts = list(bursts)
+        else:
+            self._load_bursts(json_file)
+
+        if self.bursts:
+            self._apply_burst(0)
+
+    def _load_bursts(self, json_file):
+        """Lee las ráfagas del archivo JSON (una ráfaga despejada si no existe)."""
         try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.bursts = data.get("bursts", [])
+            entrada = cache_datos.Entrada(json_file, "clima")
         except FileNotFoundError:
             self.bursts = [{"duration_sec": 60, "condition": "clear", "intensity": 1.0}]
+            return
+        self.bursts = entrada.leer()
+        if self.bursts is None:
+            self.bursts = entrada.json().get("bursts", [])
+            entrada.guardar(self.bursts)
 
+    def reiniciar(self):
+        """Vuelve a la primera ráfaga, como al empezar la partida."""
+        self.start_time = 0
         if self.bursts:
             self._apply_burst(0)
 
@@ -49,12 +66,15 @@ class Weather:
         """
         Actualiza el clima según el tiempo de juego (segundos).
         game_time: tiempo total desde inicio de la partida.
+        Devuelve True cuando cambia de ráfaga.
         """
         elapsed = game_time - self.start_time
         if elapsed >= self.duration:
             next_index = (self.burst_index + 1) % len(self.bursts)
             self._apply_burst(next_index)
             self.start_time = game_time 
+            return True
+        return False
 
     def get_current_condition(self):
         """Devuelve el nombre de la condición climática actual."""
@@ -0,0 +1,215 @@
+"""
+Courier Quest - Zonas de calles conectadas, etiquetadas por chunks
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+"""
+
+from array import array
+from collections import deque
+from mapa_binario import CapaPorChunks, TAM_CHUNK
+
+
+class Zonas:
+    """Responde si dos casillas están en la misma zona sin recorrer todo el mapa.
+
+    El mapa se parte en chunks de tam_chunk x tam_chunk (los mismos de
+    mapa_binario). Cada chunk se etiqueta por separado con un flood-fill la
+    primera vez que se pregunta por una de sus casillas: etiquetas[n] tiene
+    la zona local de cada casilla (0 = bloqueada). Cada zona local es un nodo
+    de un union-find; los nodos se unen al revisar los bordes entre chunks.
+
+    Los bordes se revisan solo cuando hace falta: cada zona guarda los
+    chunks cuyos bordes faltan (pendientes) y connected() va ampliando las
+    dos zonas hasta que se juntan o una se completa (sin pendientes). Así una
+    consulta solo lee los chunks que hay entre las casillas, y lo revisado
+    sirve para las siguientes.
+
+    Cuando una casilla pasa de libre a bloqueada o al revés se vuelve a
+    etiquetar su chunk y se olvidan las uniones (un bloqueo puede partir una
+    zona); las etiquetas de los demás chunks se conservan.
+    """
+
+    def __init__(self, blocked, width, height):
+        """blocked: arreglo plano de City (bytearray o CapaPorChunks)."""
+        self.blocked = blocked
+        self.width = width
+        self.height = height
+        self.tam_chunk = blocked.tam_chunk if isinstance(blocked, CapaPorChunks) else TAM_CHUNK
+        c = self.tam_chunk
+        # Un chunk tiene a lo sumo c * c / 2 + 1 zonas (tablero de ajedrez)
+        self.tipo = "H" if c * c // 2 + 1 < 1 << 16 else "i"
+        self.chunks_x = -(-width // c)
+        total = self.chunks_x * -(-height // c)
+        self.etiquetas = [None] * total
+        self.base = [0] * total
+        self.borde_derecho = bytearray(total)
+        self.borde_inferior = bytearray(total)
+        self.parent = []
+        self.pendientes = []
+
+    def _libres(self, cx, cy):
+        """blocked del chunk, tam_chunk x tam_chunk fila por fila."""
+        if isinstance(self.blocked, CapaPorChunks):
+            return self.blocked.chunk(cx, cy)
+        c, width = self.tam_chunk, self.width
+        chunk = bytearray(c * c)
+        x0 = cx * c
+        ancho = min(c, width - x0)
+        for fy in range(min(c, self.height - cy * c)):
+            i = (cy * c + fy) * width + x0
+            chunk[fy * c:fy * c + ancho] = self.blocked[i:i + ancho]
+        return chunk
+
+    def _etiquetar(self, n):
+        """Flood-fill dentro del chunk n; agrega un nodo por zona local."""
+        c = self.tam_chunk
+        cy, cx = divmod(n, self.chunks_x)
+        ancho = min(c, self.width - cx * c)
+        alto = min(c, self.height - cy * c)
+        blocked = self._libres(cx, cy)
+        etiquetas = array(self.tipo, bytes(array(self.tipo).itemsize * c * c))
+
+        k = 0
+        for fy in range(alto):
+            for fx in range(ancho):
+                inicio = fy * c + fx
+                if blocked[inicio] or etiquetas[inicio]:
+                    continue
+                k += 1
+                etiquetas[inicio] = k
+                queue = deque([inicio])
+                while queue:
+                    j = queue.popleft()
+                    x = j % c
+                    for v, dentro in ((j - 1, x > 0), (j + 1, x < ancho - 1),
+                                      (j - c, j >= c), (j + c, j + c < alto * c)):
+                        if dentro and not blocked[v] and not etiquetas[v]:
+                            etiquetas[v] = k
+                            queue.append(v)
+
+        self.etiquetas[n] = etiquetas
+        self._nodos(n, k)
+        return etiquetas
+
+    def _nodos(self, n, k):
+        base = len(self.parent)
+        self.base[n] = base
+        self.parent.extend(range(base, base + k))
+        self.pendientes.extend([n] for _ in range(k))
+
+    def _find(self, nodo):
+        parent = self.parent
+        raiz = nodo
+        while parent[raiz] != raiz:
+            raiz = parent[raiz]
+        while parent[nodo] != raiz:
+            parent[nodo], nodo = raiz, parent[nodo]
+        return raiz
+
+    def _union(self, a, b):
+        """Une dos nodos; la zona que queda junta los chunks pendientes de ambas."""
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if len(self.pendientes[a]) < len(self.pendientes[b]):
+            a, b = b, a
+        self.parent[b] = a
+        self.pendientes[a].extend(self.pendientes[b])
+        self.pendientes[b] = None
+
+    def _chunk(self, n):
+        etiquetas = self.etiquetas[n]
+        return etiquetas if etiquetas is not None else self._etiquetar(n)
+
+    def _nodo(self, x, y):
+        """Nodo de la casilla (x, y), -1 si está bloqueada."""
+        c = self.tam_chunk
+        n = (y // c) * self.chunks_x + x // c
+        local = self._chunk(n)[(y % c) * c + x % c]
+        return self.base[n] + local - 1 if local else -1
+
+    def _unir_borde(self, a, b, vertical, largo):
+        """Une las zonas a ambos lados del borde entre a (izquierda o arriba) y b."""
+        etiquetas_a, etiquetas_b = self._chunk(a), self._chunk(b)
+        base_a, base_b = self.base[a] - 1, self.base[b] - 1
+        c = self.tam_chunk
+        if vertical:
+            pares = zip(etiquetas_a[c * c - c:c * c - c + largo], etiquetas_b[:largo])
+        else:
+            pares = zip(etiquetas_a[c - 1::c][:largo], etiquetas_b[::c][:largo])
+        for la, lb in pares:
+            if la and lb:
+                self._union(base_a + la, base_b + lb)
+
+    def _revisar_bordes(self, n):
+        """Une el chunk n con sus cuatro vecinos (los bordes ya revisados se saltan)."""
+        c = self.tam_chunk
+        chunks_x = self.chunks_x
+        cy, cx = divmod(n, chunks_x)
+        ancho = min(c, self.width - cx * c)
+        alto = min(c, self.height - cy * c)
+        if cx > 0 and not self.borde_derecho[n - 1]:
+            self.borde_derecho[n - 1] = 1
+            self._unir_borde(n - 1, n, False, alto)
+        if cx < chunks_x - 1 and not self.borde_derecho[n]:
+            self.borde_derecho[n] = 1
+            self._unir_borde(n, n + 1, False, alto)
+        if cy > 0 and not self.borde_inferior[n - chunks_x]:
+            self.borde_inferior[n - chunks_x] = 1
+            self._unir_borde(n - chunks_x, n, True, ancho)
+        if n + chunks_x < len(self.etiquetas) and not self.borde_inferior[n]:
+            self.borde_inferior[n] = 1
+            self._unir_borde(n, n + chunks_x, True, ancho)
+
+    def _ampliar(self, raiz):
+        """Revisa los bordes de un chunk pendiente de la zona."""
+        n = self.pendientes[raiz].pop()
+        self._revisar_bordes(n)
+
+    def _completa(self, raiz):
+        return not self.pendientes[raiz]
+
+    def component(self, x, y):
+        """Zona de (x, y), -1 si está bloqueada; la completa si hacía falta."""
+        nodo = self._nodo(x, y)
+        if nodo < 0:
+            return -1
+        raiz = self._find(nodo)
+        while not self._completa(raiz):
+            self._ampliar(raiz)
+            raiz = self._find(nodo)
+        return raiz
+
+    def connected(self, a, b):
+        """Indica si se puede caminar de a hasta b (ambas dentro del mapa)."""
+        na, nb = self._nodo(*a), self._nodo(*b)
+        if na < 0 or nb < 0:
+            return False
+        ra, rb = self._find(na), self._find(nb)
+        while ra != rb:
+            if self._completa(ra) or self._completa(rb):
+                return False
+            # Se amplía la que tiene menos pendientes: suele ser la más chica
+            self._ampliar(ra if len(self.pendientes[ra]) <= len(self.pendientes[rb]) else rb)
+            ra, rb = self._find(na), self._find(nb)
+        return True
+
+    def cambio(self, x, y):
+        """La casilla (x, y) cambió entre libre y bloqueada."""
+        c = self.tam_chunk
+        n = (y // c) * self.chunks_x + x // c
+        if self.etiquetas[n] is None:
+            return
+        self.etiquetas[n] = None
+        etiquetados = [m for m, etiquetas in enumerate(self.etiquetas) if etiquetas is not None]
+        cantidades = [max(self.etiquetas[m], default=0) for m in etiquetados]
+        self.parent = []
+        self.pendientes = []
+        self.borde_derecho = bytearray(len(self.etiquetas))
+        self.borde_inferior = bytearray(len(self.etiquetas))
+        for m, k in zip(etiquetados, cantidades):
+            self._nodos(m, k)
+
+    def cargados(self):
+        """Cantidad de chunks etiquetados hasta ahora."""
+        return sum(1 for etiquetas in self.etiquetas if etiquetas is not None)
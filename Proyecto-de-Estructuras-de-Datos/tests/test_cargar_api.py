@@ -0,0 +1,179 @@
+"""
+Courier Quest - Pruebas de la descarga de datos contra un servidor HTTP local
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Uso (desde la carpeta del proyecto):
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import Cargar_api  # noqa: E402
+
+
+class _Servidor(BaseHTTPRequestHandler):
+    """Contesta según RUTAS y anota los encabezados de cada pedido.
+
+    RUTAS: ruta -> {"status", "datos", "etag", "last_modified"}. Si el pedido
+    trae el ETag o el Last-Modified vigentes contesta 304 sin cuerpo.
+    """
+
+    RUTAS = {}
+    PEDIDOS = []
+
+    def do_GET(self):
+        self.PEDIDOS.append((self.path, dict(self.headers)))
+        ruta = self.RUTAS.get(self.path)
+        if ruta is None or ruta["status"] != 200:
+            self.send_response(ruta["status"] if ruta else 404)
+            self.end_headers()
+            return
+
+        etag, last_modified = ruta.get("etag"), ruta.get("last_modified")
+        if ((etag and self.headers.get("If-None-Match") == etag) or
+                (last_modified and self.headers.get("If-Modified-Since") == last_modified)):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        cuerpo = json.dumps(ruta["datos"]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        if etag:
+            self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class PruebasCargarApi(unittest.TestCase):
+
+    def setUp(self):
+        _Servidor.RUTAS = {
+            "/city": {"status": 200, "datos": {"width": 2}, "etag": '"c1"',
+                      "last_modified": "Mon, 01 Sep 2025 06:00:00 GMT"},
+            "/jobs": {"status": 200, "datos": [{"id": "P1"}], "etag": '"j1"'},
+            "/weather": {"status": 200, "datos": {"bursts": []},
+                         "last_modified": "Mon, 01 Sep 2025 06:00:00 GMT"},
+        }
+        _Servidor.PEDIDOS = []
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+        self.hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.hilo.start()
+        base = f"http://127.0.0.1:{self.servidor.server_address[1]}"
+
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.archivos = {ruta: os.path.join(self.carpeta.name, f"{ruta[1:]}.json")
+                         for ruta in _Servidor.RUTAS}
+        self.validadores = os.path.join(self.carpeta.name, "api_validadores.json")
+        descargas = [(base + ruta, archivo) for ruta, archivo in self.archivos.items()]
+        self.urls = {ruta: base + ruta for ruta in _Servidor.RUTAS}
+        for parche in (mock.patch.object(Cargar_api, "DESCARGAS", descargas),
+                       mock.patch.object(Cargar_api, "VALIDATORS_FILE", self.validadores)):
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.hilo.join()
+        self.carpeta.cleanup()
+
+    def _leer(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_200_guarda_datos_y_validadores(self):
+        cambiados = Cargar_api.fetch_all_data()
+
+        self.assertCountEqual(cambiados, self.archivos.values())
+        for ruta, archivo in self.archivos.items():
+            self.assertEqual(self._leer(archivo), _Servidor.RUTAS[ruta]["datos"])
+        validadores = self._leer(self.validadores)
+        self.assertEqual(validadores[self.urls["/city"]],
+                         {"etag": '"c1"', "last_modified": "Mon, 01 Sep 2025 06:00:00 GMT"})
+        self.assertEqual(validadores[self.urls["/jobs"]], {"etag": '"j1"', "last_modified": None})
+        self.assertEqual(validadores[self.urls["/weather"]],
+                         {"etag": None, "last_modified": "Mon, 01 Sep 2025 06:00:00 GMT"})
+
+    def test_304_reusa_la_copia_local(self):
+        Cargar_api.fetch_all_data()
+        antes = {archivo: os.stat(archivo).st_mtime_ns for archivo in self.archivos.values()}
+        _Servidor.PEDIDOS = []
+
+        cambiados = Cargar_api.fetch_all_data()
+
+        self.assertEqual(cambiados, [])
+        pedidos = dict(_Servidor.PEDIDOS)
+        self.assertEqual(pedidos["/city"].get("If-None-Match"), '"c1"')
+        self.assertEqual(pedidos["/weather"].get("If-Modified-Since"),
+                         "Mon, 01 Sep 2025 06:00:00 GMT")
+        for archivo, mtime in antes.items():
+            self.assertEqual(os.stat(archivo).st_mtime_ns, mtime)
+
+    def test_sin_copia_local_no_pide_condicional(self):
+        Cargar_api.fetch_all_data()
+        os.remove(self.archivos["/jobs"])
+        _Servidor.PEDIDOS = []
+
+        cambiados = Cargar_api.fetch_all_data()
+
+        self.assertEqual(cambiados, [self.archivos["/jobs"]])
+        self.assertNotIn("If-None-Match", dict(_Servidor.PEDIDOS)["/jobs"])
+
+    def test_falla_deja_el_archivo_anterior(self):
+        Cargar_api.fetch_all_data()
+        validador = self._leer(self.validadores)[self.urls["/city"]]
+        _Servidor.RUTAS["/city"] = {"status": 500}
+        _Servidor.RUTAS["/jobs"]["datos"] = [{"id": "P2"}]
+        _Servidor.RUTAS["/jobs"]["etag"] = '"j2"'
+
+        cambiados = Cargar_api.fetch_all_data()
+
+        self.assertEqual(cambiados, [self.archivos["/jobs"]])
+        self.assertEqual(self._leer(self.archivos["/city"]), {"width": 2})
+        self.assertEqual(self._leer(self.archivos["/jobs"]), [{"id": "P2"}])
+        validadores = self._leer(self.validadores)
+        self.assertEqual(validadores[self.urls["/city"]], validador)
+        self.assertEqual(validadores[self.urls["/jobs"]]["etag"], '"j2"')
+
+    def test_validadores_se_escriben_de_forma_atomica(self):
+        with open(self.validadores, "w", encoding="utf-8") as f:
+            json.dump({"viejo": {"etag": '"v"'}}, f)
+        reemplazos = []
+        reemplazar = os.replace
+
+        def espiar(temporal, destino):
+            # Al renombrar el temporal ya está completo y el destino sigue intacto
+            if destino == self.validadores:
+                reemplazos.append((self._leer(temporal), self._leer(destino)))
+            reemplazar(temporal, destino)
+
+        with mock.patch.object(Cargar_api.os, "replace", side_effect=espiar):
+            Cargar_api.fetch_all_data()
+
+        self.assertEqual(len(reemplazos), 1)
+        nuevo, anterior = reemplazos[0]
+        self.assertEqual(anterior, {"viejo": {"etag": '"v"'}})
+        self.assertIn(self.urls["/city"], nuevo)
+        self.assertEqual(self._leer(self.validadores), nuevo)
+        self.assertEqual([n for n in os.listdir(self.carpeta.name) if n.endswith(".tmp")], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
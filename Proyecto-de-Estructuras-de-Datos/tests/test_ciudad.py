@@ -0,0 +1,178 @@
+"""
+Courier Quest - Pruebas de las zonas conectadas y los planificadores de rutas
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Uso (desde la carpeta del proyecto):
+    python -m unittest discover tests
+"""
+
+import heapq
+import os
+import random
+import sys
+import unittest
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from benchmarks import sinteticos  # noqa: E402
+from city import City  # noqa: E402
+from dstar_lite import DStarLite  # noqa: E402
+import costos  # noqa: E402
+import hpa  # noqa: E402
+
+CALLE, EDIFICIO = "C", "B"
+
+
+def bfs(city, origen):
+    """Pasos caminando desde origen hasta cada casilla alcanzable."""
+    dist = {origen: 0}
+    queue = deque([origen])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if (0 <= nx < city.width and 0 <= ny < city.height and (nx, ny) not in dist
+                    and not city.is_blocked(nx, ny)):
+                dist[(nx, ny)] = dist[(x, y)] + 1
+                queue.append((nx, ny))
+    return dist
+
+
+def dijkstra(city, origen, destino, costo):
+    """Menor suma de costo(casilla) de las casillas pisadas (sin origen)."""
+    mejor = {origen: 0.0}
+    heap = [(0.0, origen)]
+    while heap:
+        d, (x, y) = heapq.heappop(heap)
+        if (x, y) == destino:
+            return d
+        if d > mejor[(x, y)]:
+            continue
+        for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= n[0] < city.width and 0 <= n[1] < city.height and not city.is_blocked(*n):
+                nd = d + costo(n)
+                if nd < mejor.get(n, float("inf")):
+                    mejor[n] = nd
+                    heapq.heappush(heap, (nd, n))
+    return None
+
+
+class PruebasBase(unittest.TestCase):
+
+    def assertRutaValida(self, city, origen, destino, ruta):
+        actual = origen
+        for paso in ruta:
+            self.assertEqual(abs(paso[0] - actual[0]) + abs(paso[1] - actual[1]), 1)
+            self.assertFalse(city.is_blocked(*paso))
+            actual = paso
+        self.assertEqual(actual, destino)
+
+    def pares(self, city, rng, n):
+        libres = sinteticos.casillas_libres(city)
+        return [(rng.choice(libres), rng.choice(libres)) for _ in range(n)]
+
+
+class PruebasZonas(PruebasBase):
+
+    def test_bloquear_parte_y_abrir_une(self):
+        city = City(data={"width": 7, "height": 3, "goal": 0,
+                          "legend": sinteticos.LEYENDA,
+                          "tiles": ["BBBBBBB", "CCCCCCC", "BBBBBBB"]})
+        self.assertTrue(city.connected((0, 1), (6, 1)))
+
+        city.set_tile(3, 1, EDIFICIO)
+        self.assertFalse(city.connected((0, 1), (6, 1)))
+        self.assertTrue(city.connected((0, 1), (2, 1)))
+        self.assertTrue(city.connected((4, 1), (6, 1)))
+        self.assertEqual(city.component(3, 1), -1)
+
+        city.set_tile(3, 1, CALLE)
+        self.assertTrue(city.connected((0, 1), (6, 1)))
+        self.assertEqual(city.component(0, 1), city.component(6, 1))
+
+    def test_coincide_con_bfs_tras_cambios(self):
+        # 70 x 70 cruza los bordes de los chunks de 64 casillas
+        rng = random.Random(11)
+        city = sinteticos.ciudad(70, 70, seed=11)
+        for i in range(600):
+            x, y = rng.randrange(city.width), rng.randrange(city.height)
+            city.set_tile(x, y, EDIFICIO if rng.random() < 0.7 else CALLE)
+            if i % 20:
+                continue
+            for origen in rng.sample(sinteticos.casillas_libres(city), 3):
+                alcanzables = bfs(city, origen)
+                for _ in range(10):
+                    destino = (rng.randrange(city.width), rng.randrange(city.height))
+                    self.assertEqual(city.connected(origen, destino), destino in alcanzables)
+
+    def test_fuera_del_mapa(self):
+        city = sinteticos.ciudad(10, 10, seed=1)
+        self.assertFalse(city.connected((0, 0), (10, 0)))
+        self.assertEqual(city.component(-1, 0), -1)
+
+
+class PruebasPlanificadores(PruebasBase):
+
+    def setUp(self):
+        self.rng = random.Random(5)
+        self.city = sinteticos.ciudad(40, 40, seed=5)
+
+    def cerrar_calles(self, n):
+        for _ in range(n):
+            x, y = self.rng.randrange(self.city.width), self.rng.randrange(self.city.height)
+            self.city.set_tile(x, y, EDIFICIO)
+
+    def test_dstar_lite_como_bfs(self):
+        pares = self.pares(self.city, self.rng, 10)
+        planificadores = [DStarLite(self.city, a, b) for a, b in pares]
+        for ronda in range(2):
+            for planner, (a, b) in zip(planificadores, pares):
+                if self.city.is_blocked(*a) or self.city.is_blocked(*b):
+                    continue
+                ruta = planner.path(a)
+                dist = bfs(self.city, a).get(b)
+                if dist is None:
+                    self.assertEqual(list(ruta), [])
+                    continue
+                self.assertEqual(len(ruta), dist)
+                self.assertRutaValida(self.city, a, b, ruta)
+            # La segunda ronda repara los mismos planificadores
+            self.cerrar_calles(60)
+
+    def test_dstar_lite_con_costos_como_dijkstra(self):
+        capa = costos.para_ciudad(self.city)
+        for ronda in range(2):
+            for a, b in self.pares(self.city, self.rng, 6):
+                planner = DStarLite(self.city, a, b, costos=capa.base,
+                                    escala_h=capa.base_minimo())
+                ruta = planner.path(a)
+                esperado = dijkstra(self.city, a, b,
+                                    lambda t: 1.0 / self.city.surface_weight(*t))
+                if esperado is None:
+                    self.assertEqual(list(ruta), [])
+                    continue
+                self.assertRutaValida(self.city, a, b, ruta)
+                self.assertAlmostEqual(costos.costo_ruta(self.city, ruta) / costos.factor("clear", 3),
+                                       esperado)
+            self.cerrar_calles(60)
+            capa.sincronizar()
+
+    def test_hpa_exacto_como_bfs(self):
+        planner = hpa.HierarchicalPathfinder(self.city, cluster_size=8, exacto=True)
+        for ronda in range(2):
+            for a, b in self.pares(self.city, self.rng, 15):
+                if self.city.is_blocked(*a) or self.city.is_blocked(*b) or a == b:
+                    continue
+                ruta = planner.find_path(a, b)
+                dist = bfs(self.city, a).get(b)
+                if dist is None:
+                    self.assertEqual(ruta, [])
+                    continue
+                self.assertEqual(len(ruta), dist)
+                self.assertRutaValida(self.city, a, b, ruta)
+            self.cerrar_calles(60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Courier Quest - Pruebas de los índices de OrderManager
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Uso (desde la carpeta del proyecto):
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from benchmarks import sinteticos  # noqa: E402
+from order import ESTADOS, OrderManager  # noqa: E402
+
+
+class PruebasIndices(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(3)
+        self.city = sinteticos.ciudad(30, 30, seed=3)
+        self.orders = OrderManager(data=sinteticos.pedidos(self.city, 40, seed=3), city=self.city)
+
+    def assertIndicesAlDia(self):
+        orders = self.orders
+        for estado in ESTADOS:
+            esperados = {o.id for o in orders.orders if o.status == estado}
+            self.assertEqual(set(orders.por_estado[estado]), esperados)
+            self.assertEqual(orders.contar(estado), len(esperados))
+        self.assertEqual(orders.por_id, {o.id: o for o in orders.orders})
+        for order in orders.orders:
+            self.assertIn(order, orders.por_casilla[order.pickup])
+            self.assertIn(order, orders.por_casilla[order.dropoff])
+
+        total = len(orders.orders)
+        pickups = orders.cerca_pickups.k_cercanos((0, 0), total)
+        self.assertEqual({o.id for _, o in pickups}, set(orders.por_estado["waiting"]))
+        self.assertEqual(len(orders.cerca_pickups), orders.contar("waiting"))
+        dropoffs = orders.cerca_dropoffs.k_cercanos((0, 0), total)
+        self.assertEqual({o.id for _, o in dropoffs}, set(orders.por_estado["picked"]))
+        self.assertEqual(len(orders.cerca_dropoffs), orders.contar("picked"))
+
+        for order in orders.inventory.values():
+            self.assertEqual(order.status, "picked")
+
+    def test_cambiar_estado_mantiene_los_indices(self):
+        version = self.orders.version
+        for _ in range(300):
+            order = self.rng.choice(self.orders.orders)
+            estado = self.rng.choice(ESTADOS)
+            cambia = order.status != estado
+            self.orders.cambiar_estado(order, estado)
+            self.assertEqual(order.status, estado)
+            if cambia:
+                version += 1
+            self.assertEqual(self.orders.version, version)
+            self.assertIndicesAlDia()
+
+    def test_aceptar_entregar_y_vencer(self):
+        a, b, c = self.orders.orders[:3]
+        self.assertIs(self.orders.accept_order(a.id), a)
+        self.assertIs(self.orders.accept_order(b.id), b)
+        self.assertIsNone(self.orders.accept_order(a.id))
+        self.assertEqual(self.orders.list_inventory(), [a, b])
+        self.assertTrue(self.orders.en_inventario(a))
+
+        self.assertIs(self.orders.deliver_order(a.id), a)
+        self.assertIsNone(self.orders.deliver_order(c.id))
+        self.orders.expire_order(b)
+        self.assertEqual(self.orders.list_inventory(), [])
+        self.assertEqual((a.status, b.status, c.status), ("delivered", "expired", "waiting"))
+        self.assertIndicesAlDia()
+
+    def test_reiniciar_vuelve_al_inicio(self):
+        iniciales = [o.status for o in self.orders.orders]
+        orden = list(self.orders.por_estado["waiting"])
+        for order in self.rng.sample(self.orders.orders, 15):
+            self.orders.accept_order(order.id)
+        for order in self.rng.sample(self.orders.orders, 5):
+            self.orders.cambiar_estado(order, "delivered")
+
+        self.orders.reiniciar(iniciales)
+
+        self.assertEqual([o.status for o in self.orders.orders], iniciales)
+        self.assertEqual(self.orders.inventory, {})
+        self.assertEqual(list(self.orders.por_estado["waiting"]), orden)
+        self.assertIndicesAlDia()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Courier Quest - Pruebas de la simulación: semillas y partidas guardadas
+EIF-207 - Estructuras de Datos
+Autores: Fernando Durán Escobar y Alonso Durán Escobar
+
+Uso (desde la carpeta del proyecto):
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from benchmarks import sinteticos  # noqa: E402
+from CPUPlayer import CPUPlayer  # noqa: E402
+from CPUPlayer_dificil import CPUPlayer_Dificil  # noqa: E402
+from jugador_scripted import JugadorScripted  # noqa: E402
+from simulacion import Simulacion  # noqa: E402
+import partida_guardada  # noqa: E402
+
+DT = 0.1
+
+
+def estado(sim):
+    """Lo que debe coincidir entre dos partidas iguales."""
+    return (sim.time, sim.money, sim.entregas, sim.vencidos, sim.fin,
+            (sim.player.x, sim.player.y, sim.player.resistencia, sim.player.peso_total),
+            tuple((cpu.x, cpu.y, cpu.money, cpu.resistencia) for cpu in sim.cpus),
+            sim.weather.burst_index, sim.weather.get_current_condition(),
+            tuple(o.status for o in sim.orders.orders), tuple(sim.orders.inventory))
+
+
+class PruebasSimulacion(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.carpeta = tempfile.TemporaryDirectory()
+        city = sinteticos.ciudad(30, 30, seed=2)
+        archivos = {
+            "city_file": {"version": "1.0", "width": city.width, "height": city.height,
+                          "tiles": city.tiles, "legend": city.legend, "goal": 100000},
+            "orders_file": sinteticos.pedidos(city, 25, seed=2),
+            "weather_file": {"bursts": sinteticos.rafagas(8, seed=2)},
+        }
+        cls.archivos = {}
+        for nombre, datos in archivos.items():
+            path = os.path.join(cls.carpeta.name, f"{nombre}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(datos, f)
+            cls.archivos[nombre] = path
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.carpeta.cleanup()
+
+    def nueva(self, cpu_class=CPUPlayer, rivales=()):
+        return Simulacion(cpu_class, rivales, **self.archivos)
+
+    def jugar(self, sim, pasos, seed=None):
+        """Juega pasos steps con el jugador de guion; devuelve el estado tras cada uno."""
+        if seed is not None:
+            sim.reset(seed)
+        jugador = JugadorScripted(move_delay=0.25)
+        traza = []
+        for _ in range(pasos):
+            sim.step(jugador.acciones(sim, DT), DT)
+            traza.append(estado(sim))
+        return traza
+
+    def assertMismaPartida(self, traza, esperada):
+        """Compara paso a paso; al fallar muestra solo el primer paso distinto."""
+        self.assertEqual(len(traza), len(esperada))
+        for paso, (a, b) in enumerate(zip(traza, esperada)):
+            self.assertEqual(a, b, f"la partida cambia en el paso {paso}")
+
+    def test_misma_semilla_misma_partida(self):
+        sim = self.nueva(rivales=[CPUPlayer_Dificil])
+        primera = self.jugar(sim, 2000, seed=7)
+        # Reiniciar la misma simulación o crear otra da la misma partida
+        self.assertMismaPartida(self.jugar(sim, 2000, seed=7), primera)
+        self.assertMismaPartida(self.jugar(self.nueva(rivales=[CPUPlayer_Dificil]), 2000, seed=7),
+                                primera)
+        self.assertNotEqual(self.jugar(sim, 2000, seed=8)[-1], primera[-1])
+
+    def test_guardar_y_cargar(self):
+        sim = self.nueva(CPUPlayer_Dificil)
+        self.jugar(sim, 1500, seed=1)
+        self.assertFalse(sim.fin)
+        self.assertTrue(sim.orders.contar("delivered") or sim.orders.inventory)
+        path = os.path.join(self.carpeta.name, "partida.sav")
+        partida_guardada.guardar(sim, path)
+
+        otra = self.nueva(CPUPlayer_Dificil)
+        partida_guardada.cargar(otra, path)
+
+        self.assertEqual(estado(otra), estado(sim))
+        self.assertEqual(otra.cpu.cargados, [otra.orders.por_id[o.id] for o in sim.cpu.cargados])
+        # La partida sigue desde ahí sin errores
+        self.jugar(otra, 500)
+        self.assertGreater(otra.time, sim.time)
+
+    def test_partida_danada_no_cambia_nada(self):
+        sim = self.nueva()
+        self.jugar(sim, 600, seed=3)
+        path = os.path.join(self.carpeta.name, "buena.sav")
+        partida_guardada.guardar(sim, path)
+        with open(path, "rb") as f:
+            contenido = f.read()
+
+        rng = random.Random(4)
+        danadas = [b"", contenido[:10], b"XXXX" + contenido[4:]]
+        danadas += [contenido[:rng.randrange(len(contenido))] for _ in range(20)]
+        for _ in range(40):
+            datos = bytearray(contenido)
+            for _ in range(rng.randint(1, 4)):
+                datos[rng.randrange(len(datos))] = rng.randrange(256)
+            danadas.append(bytes(datos))
+
+        otra = self.nueva()
+        self.jugar(otra, 100, seed=5)
+        antes = estado(otra)
+        path_danada = os.path.join(self.carpeta.name, "danada.sav")
+        for datos in danadas:
+            with open(path_danada, "wb") as f:
+                f.write(datos)
+            try:
+                partida_guardada.cargar(otra, path_danada)
+            except ValueError:
+                self.assertEqual(estado(otra), antes)
+            else:
+                # Un byte cambiado puede caer en un dato válido: la partida carga
+                self.jugar(otra, 100, seed=5)
+                antes = estado(otra)
+
+    def test_partida_de_otra_cpu(self):
+        sim = self.nueva(CPUPlayer_Dificil)
+        self.jugar(sim, 100, seed=1)
+        path = os.path.join(self.carpeta.name, "dificil.sav")
+        partida_guardada.guardar(sim, path)
+
+        otra = self.nueva()
+        with self.assertRaises(ValueError):
+            partida_guardada.cargar(otra, path)
+
+
+if __name__ == "__main__":
+    unittest.main()